@@ -1,33 +1,21 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
 import matplotlib.pyplot as plt
 
-file_path = "vietnam_data_with_meta.csv"
-
-# ==== 1. Đọc file CSV dạng raw để tách 2 phần ====
-with open(file_path, "r", encoding="utf-8") as f:
-    lines = f.readlines()
-
-# Xác định vị trí metadata
-meta_start = None
-for i, line in enumerate(lines):
-    if line.startswith("Code,License Type"):
-        meta_start = i
-        break
+# Shared WDI helpers (repo root)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from wdi.icor import icor_table
+from wdi.metadata import read_export
+from wdi.store import column_year, year_columns
 
-# Tách dữ liệu & metadata
-data_lines = lines[:meta_start-1]  # trừ dòng trống trước metadata
-meta_lines = lines[meta_start:]
-
-# Lưu tạm ra file riêng
-with open("data_only.csv", "w", encoding="utf-8") as f:
-    f.writelines(data_lines)
-
-with open("meta_only.csv", "w", encoding="utf-8") as f:
-    f.writelines(meta_lines)
+file_path = "vietnam_data_with_meta.csv"
 
-# ==== 2. Đọc 2 file này ====
-df_data = pd.read_csv("data_only.csv")
-df_meta = pd.read_csv("meta_only.csv")
+# ==== 1-2. Đọc file CSV (dữ liệu + metadata) trong một lần ====
+# Phần dữ liệu và phần metadata ('Code,License Type,...') được tách ngay khi đọc,
+# không cần ghi ra data_only.csv / meta_only.csv rồi đọc lại.
+df_data, meta = read_export(file_path)
 
 # ==== 3. Lọc 2 chỉ số ====
 indicators = [
@@ -37,21 +25,29 @@ indicators = [
 df_data = df_data[df_data["Series Name"].isin(indicators)]
 
 # ==== 4. Ghép metadata ====
-df = df_data.merge(
-    df_meta[["Indicator Name", "Long definition"]],
-    left_on="Series Name",
-    right_on="Indicator Name",
-    how="left"
-)
+# Tra cứu theo Series Code (tên chỉ số trong metadata có thể khác Series Name,
+# vd. 'GDP (annual % growth)'); chỉ lấy định nghĩa cho các chỉ số đã lọc
+df = meta.attach(df_data, ["Long definition"])
 
 # ==== 5. Chọn các cột năm ====
 years = ['2020 [YR2020]', '2021 [YR2021]', '2022 [YR2022]', '2023 [YR2023]', '2024 [YR2024]']
 df[years] = df[years].apply(pd.to_numeric, errors='coerce')
 
 # ==== 6. Tính ICOR ====
-gdp_growth = df[df["Series Name"] == "GDP growth (annual %)"][years].values.flatten()
-gfcf_growth = df[df["Series Name"] == "Gross fixed capital formation (annual % growth)"][years].values.flatten()
-icor = gfcf_growth / gdp_growth
+# Ma trận (năm x quốc gia) cho từng chỉ số; ICOR tính cho mọi quốc gia và mọi năm
+# của file trong một phép toán mảng (wdi/icor.py), sau đó lấy Việt Nam 2020–2024.
+GDP_CODE, GFCF_CODE = "NY.GDP.MKTP.KD.ZG", "NE.GDI.FTOT.KD.ZG"
+ycols = year_columns(df.columns)
+by_series = df.set_index(["Series Code", "Country Code"])[ycols]
+by_series.columns = [column_year(c) for c in ycols]
+gdp_matrix = by_series.loc[GDP_CODE].T
+gfcf_matrix = by_series.loc[GFCF_CODE].T
+icor_all = icor_table(gdp_matrix, gfcf_growth=gfcf_matrix, country_col="Country Code")
+
+year_nums = [column_year(y) for y in years]
+gdp_growth = gdp_matrix.loc[year_nums, "VNM"].to_numpy()
+gfcf_growth = gfcf_matrix.loc[year_nums, "VNM"].to_numpy()
+icor = icor_all[icor_all["Country Code"] == "VNM"].set_index("Year").loc[year_nums, "ICOR_growth"].to_numpy()
 
 # ==== 7. Vẽ biểu đồ ====
 plt.figure(figsize=(9, 5))
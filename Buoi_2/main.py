@@ -6,22 +6,30 @@ Full pipeline:
 - Export CSVs, plots, maps
 - Forecast next 5 years (2025-2029) for GDP growth and Gross capital formation
 - Print conclusions
+
+Every numbered section is a timing span (wdi/trace.py); the table is printed at
+the end. Set WDI_TRACE=trace.json to also save a Chrome trace of the run.
 """
 
-import os
+import sys
 import warnings
 warnings.filterwarnings("ignore")
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from pathlib import Path
 
-# Forecasting
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
-
-# Mapping
-import geopandas as gpd
+# Shared WDI helpers (repo root)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from wdi.cache import DiskCache
+from wdi.forecast import damped_ets, forecast_many
+from wdi.icor import ICOR_COLS, icor_table
+from wdi.maps import load_world
+from wdi.periods import Breakpoints, FixedBuckets, RollingBuckets, period_labels, summarize_periods
+from wdi.plotting import FigureSpec, render_all
+from wdi.refresh import artefacts_for
+from wdi.store import load_wide, source_digest
+from wdi.trace import print_report, set_rows, stage
 
 # -------------------------
 # CONFIG
@@ -37,6 +45,37 @@ IND_GCF = "Gross capital formation (% of GDP)"
 YEARS_FROM = 1986
 YEARS_TO = 2024
 FORECAST_HORIZON = 5  # dự báo 5 năm (2025-2029)
+# Số tiến trình dự báo song song (None = tất cả CPU, 1 = tuần tự). Chỉ áp dụng cho mô hình
+# ước lượng từng chuỗi (damped_ets); mô hình @batched như damped_ets_batch chạy trong tiến trình chính
+FORECAST_WORKERS = None
+FORECAST_TIMEOUT = 60    # giây cho mỗi (quốc gia, chỉ số), tính từ lúc bắt đầu ước lượng; quá hạn -> lặp lại giá trị cuối
+# Damped-trend ETS của statsmodels, ước lượng từng chuỗi trên pool tiến trình.
+# Tuỳ chọn: wdi.forecast.damped_ets_batch ước lượng mọi chuỗi cùng lúc (wdi/ets_batch.py);
+# nhanh hơn nhưng ở vài chuỗi tìm được cực tiểu SSE thấp hơn statsmodels nên dự báo khác
+FORECAST_MODEL = damped_ets
+# Kết quả dự báo lưu cache theo hash chuỗi + mô hình + số năm dự báo (LRU, tối đa 64 MB)
+FORECAST_CACHE = DiskCache("forecast", max_bytes=64 * 1024 * 1024)
+PLOT_WORKERS = None  # số tiến trình vẽ biểu đồ song song (None = $WDI_WORKERS hoặc tất cả CPU, 1 = tuần tự)
+
+# Period schemes summarised in one pass (section 4). The first one drives the
+# plots, map and conclusions below; each is saved as period_summary_<name>.csv.
+PERIOD_SCHEMES = [
+    FixedBuckets(5),                 # 1985-1989, 1990-1994, ...
+    FixedBuckets(10),
+    RollingBuckets(10, step=1),
+    # Đổi Mới phases: khởi đầu, ổn định, khủng hoảng châu Á, gia nhập WTO,
+    # khủng hoảng toàn cầu, tái cơ cấu, COVID-19 và phục hồi
+    Breakpoints((1986, 1991, 1996, 2001, 2008, 2012, 2020), name="doimoi"),
+]
+
+# period_summary metrics drawn as world maps (section 7) -> output file name
+MAP_METRICS = {
+    "ICOR_ratio": "map_icor_ratio_latest.png",
+    "gM": "map_gm_latest.png",
+    "(I/Y)_T": "map_iy_ratio_latest.png",
+}
+MAP_FRAMES_DIR = OUTPUT_DIR / "map_frames"  # one map per period (PNG sequence)
+ICOR_WINDOWS = (5, 10)  # rolling ICOR windows (years) in icor_annual.csv
 
 # -------------------------
 # Helpers
@@ -51,23 +90,23 @@ def ensure_cols_years(cols, start=YEARS_FROM, end=YEARS_TO):
                 break
     return years
 
-def period_5yr(year):
-    start = (int(year) // 5) * 5
-    return f"{start}-{start+4}"
-
-def safe_icor(i_y_pct, g_pct):
-    """ICOR approx = (I/Y) / g  where g as decimal (g_pct in %). Return np.nan when invalid."""
-    if pd.isna(i_y_pct) or pd.isna(g_pct):
-        return np.nan
-    if abs(g_pct) < 1e-6:
-        return np.nan
-    return (i_y_pct / 100.0) / (g_pct / 100.0)  # -> unitless
+def record_outputs(paths, countries=None):
+    """Register output files built from FILE_PATH (scope: `countries` codes or all,
+    the two indicators, YEARS_FROM-YEARS_TO) so refresh_data.py can list the
+    ones a data revision makes stale (wdi/refresh.py)."""
+    artefacts = artefacts_for(FILE_PATH)
+    digest = source_digest(FILE_PATH)
+    for path in paths:
+        artefacts.record(str(path), digest, countries=countries, series=SERIES_CODES,
+                         years=(YEARS_FROM, YEARS_TO))
 
 # -------------------------
 # 1) Read & identify year columns
 # -------------------------
+stage("1) read")
 print("1) Reading file:", FILE_PATH)
-df_raw = pd.read_excel(FILE_PATH)
+# Sheet "Data" is parsed once per workbook version and cached as Feather in .wdi_store
+df_raw = load_wide(FILE_PATH)
 
 # identify year-like columns present
 year_cols = ensure_cols_years(df_raw.columns, YEARS_FROM, YEARS_TO)
@@ -81,6 +120,9 @@ print(f"Detected {len(year_cols)} year columns from {YEARS_FROM} to {YEARS_TO} (
 
 # Keep only meta + year cols
 df = df_raw[meta_cols + year_cols].copy()
+set_rows(len(df))
+
+stage("1) melt")
 
 # Replace World Bank missing marker
 df.replace("..", np.nan, inplace=True)
@@ -92,16 +134,19 @@ df_long = df_long[(df_long["Year"] >= YEARS_FROM) & (df_long["Year"] <= YEARS_TO
 
 # numeric
 df_long["Value"] = pd.to_numeric(df_long["Value"], errors="coerce")
+set_rows(len(df_long))
 
 # -------------------------
 # 2) Extract the two indicators
 # -------------------------
+stage("2) filter")
 print("2) Filtering indicators...")
 mask_gdp = df_long["Series Name"].str.contains("GDP growth", case=False, na=False)
 mask_gcf = df_long["Series Name"].str.contains("Gross capital formation", case=False, na=False)
 
 df_gdp = df_long[mask_gdp].copy()
 df_gcf = df_long[mask_gcf].copy()
+SERIES_CODES = sorted(df_long.loc[mask_gdp | mask_gcf, "Series Code"].dropna().astype(str).unique())
 
 if df_gdp.empty or df_gcf.empty:
     raise SystemExit("Không tìm thấy một trong hai chỉ số GDP hoặc Gross capital formation. Kiểm tra tên 'Series Name' trong file.")
@@ -113,6 +158,7 @@ df_gcf = df_gcf.rename(columns={"Country Name": "Country", "Value": "GCF_percent
 # -------------------------
 # 3) Merge annual series and compute additional annual fields
 # -------------------------
+stage("3) merge")
 print("3) Merging annual series...")
 df_ann = pd.merge(df_gdp, df_gcf, on=["Country", "Country Code", "Year"], how="outer", validate="1:1")
 df_ann = df_ann.sort_values(["Country", "Year"]).reset_index(drop=True)
@@ -120,65 +166,60 @@ df_ann = df_ann.sort_values(["Country", "Year"]).reset_index(drop=True)
 # compute annual delta Investment & delta GDP for later incremental ICOR per country-year
 df_ann["Delta_GCF_pct"] = df_ann.groupby("Country")["GCF_percent"].diff()  # difference in % points
 df_ann["Delta_GDP_growth"] = df_ann.groupby("Country")["GDP_growth"].diff()  # difference in growth percentage points
+set_rows(len(df_ann))
 
 # -------------------------
-# 4) Aggregate to 5-year periods (period label e.g., 1990-1994)
+# 4) Aggregate to periods (5-year buckets e.g. 1990-1994, plus the other PERIOD_SCHEMES)
 # -------------------------
-print("4) Aggregating to 5-year periods...")
-df_ann["Period"] = df_ann["Year"].apply(period_5yr)
-
-# We'll compute per period: gM (mean of GDP_growth), gT (GDP growth in year max), (I/Y)_T (GCF_percent in year max)
-def compute_period_metrics(group):
-    # group is rows for a country & period (years in that 5-year bucket)
-    years = group["Year"].dropna().unique()
-    if len(group) == 0:
-        return pd.Series({
-            "gM": np.nan, "gT": np.nan, "(I/Y)_T": np.nan,
-            "gM_minus_gT": np.nan, "ICOR_ratio": np.nan, "ICOR_incremental": np.nan,
-            "n_obs": 0
-        })
-    gM = group["GDP_growth"].mean(skipna=True)
-    # pick gT and IY_T from the **latest available year** in the group
-    latest_idx = group["Year"].idxmax()
-    gT = group.loc[latest_idx, "GDP_growth"]
-    IyT = group.loc[latest_idx, "GCF_percent"]
-    gm_minus_gt = gM - gT
-    icor_ratio = safe_icor(IyT, gM)  # using period-average gM as denominator (common approach)
-    # incremental ICOR for the period: sum delta I over sum delta Y across period years (use group diffs)
-    # We'll compute: sum(ΔI) / sum(ΔY) where ΔI in absolute units approximated by %points * Y? Because we only have %GCF, use approximation:
-    # Here we use Δ(GCF%) / Δ(GDPgrowth) as a rough incremental metric (not perfect). We'll aggregate year diffs present in group.
-    deltaI = group["Delta_GCF_pct"].sum(skipna=True)
-    deltaY = group["Delta_GDP_growth"].sum(skipna=True)
-    icor_incremental = np.nan
-    if pd.notna(deltaI) and pd.notna(deltaY) and abs(deltaY) > 1e-6:
-        icor_incremental = (deltaI/100.0) / (deltaY/100.0)  # similar unitless ratio
-    return pd.Series({
-        "gM": gM,
-        "gT": gT,
-        "(I/Y)_T": IyT,
-        "gM_minus_gT": gm_minus_gt,
-        "ICOR_ratio": icor_ratio,
-        "ICOR_incremental": icor_incremental,
-        "n_obs": group["Year"].nunique()
-    })
-
-period_summary = df_ann.groupby(["Country", "Country Code", "Period"]).apply(compute_period_metrics).reset_index()
-
-# Save period summary
-period_summary.to_csv(OUTPUT_DIR / "period_summary_5yr.csv", index=False)
-print("Saved period_summary_5yr.csv")
+stage("4) aggregate")
+print("4) Aggregating to periods:", ", ".join(sc.name for sc in PERIOD_SCHEMES), "...")
+df_ann["Period"] = period_labels(df_ann["Year"], width=5).to_numpy()  # kept in the annual export
+
+# Per period: gM (mean of GDP_growth), gT / (I/Y)_T (values in the latest year of the period),
+# ICOR_ratio = (I/Y)_T / gM, ICOR_incremental = sum(ΔGCF%) / sum(ΔGDP growth), n_obs.
+# All schemes share one sort and one set of cumulative sums (see wdi/periods.py).
+summaries = summarize_periods(df_ann, PERIOD_SCHEMES, keys=["Country", "Country Code"])
+period_summary = summaries[PERIOD_SCHEMES[0].name]
+
+for name, summary in summaries.items():
+    summary.to_csv(OUTPUT_DIR / f"period_summary_{name}.csv", index=False)
+    print(f"Saved period_summary_{name}.csv")
+record_outputs(OUTPUT_DIR / f"period_summary_{name}.csv" for name in summaries)
+set_rows(sum(len(summary) for summary in summaries.values()))
 
 # -------------------------
 # 5) Export annual merged series too
 # -------------------------
+stage("5) annual export")
 df_ann.to_csv(OUTPUT_DIR / "annual_merged_series_1986_2024.csv", index=False)
+record_outputs([OUTPUT_DIR / "annual_merged_series_1986_2024.csv"])
 print("Saved annual_merged_series_1986_2024.csv")
 
+# Annual and rolling ICOR (ratio, incremental) for every country-year: year x country
+# matrices, whole-array operations (wdi/icor.py); rolling windows end in the given year.
+gdp_matrix = df_ann.pivot(index="Year", columns="Country", values="GDP_growth")
+gcf_matrix = df_ann.pivot(index="Year", columns="Country", values="GCF_percent")
+icor_annual = icor_table(gdp_matrix, gcf_matrix)
+for w in ICOR_WINDOWS:
+    rolling = icor_table(gdp_matrix, gcf_matrix, window=w)
+    icor_annual = icor_annual.merge(rolling.rename(columns={c: f"{c}_{w}yr" for c in ICOR_COLS}),
+                                    on=["Country", "Year"], how="left")
+icor_annual.to_csv(OUTPUT_DIR / "icor_annual.csv", index=False)
+record_outputs([OUTPUT_DIR / "icor_annual.csv"])
+set_rows(len(icor_annual))
+print("Saved icor_annual.csv")
+
 # -------------------------
 # 6) Plots per country: (a) annual series, (b) period summary line+bar
 # -------------------------
+stage("6) plots")
 print("6) Drawing plots per country...")
 countries = df_ann["Country"].unique()
+country_codes = df_ann.drop_duplicates("Country").set_index("Country")["Country Code"].astype(str).to_dict()
+country_of = {}  # figure path -> country name, for record_outputs()
+# Figures are only described here; render_all() draws the ones whose data or
+# style changed since the last run (manifest in OUTPUT_DIR/.wdi_store), in parallel.
+figures = []
 
 for c in countries:
     df_c_ann = df_ann[df_ann["Country"] == c].set_index("Year").sort_index()
@@ -188,98 +229,102 @@ for c in countries:
         continue
 
     # Annual timeseries plot
-    plt.figure(figsize=(10,6))
-    plt.plot(df_c_ann.index, df_c_ann["GDP_growth"], marker='o', label='GDP growth (%)')
-    plt.plot(df_c_ann.index, df_c_ann["GCF_percent"], marker='s', label='GCF (% GDP)')
-    plt.title(f"{c} — Annual GDP growth & GCF (1986-2024)")
-    plt.xlabel("Year")
-    plt.ylabel("Percent")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(OUTPUT_DIR / f"{c}_annual_series.png")
-    plt.close()
+    fig = FigureSpec(OUTPUT_DIR / f"{c}_annual_series.png", figsize=(10,6))
+    fig.plot(df_c_ann.index, df_c_ann["GDP_growth"], marker='o', label='GDP growth (%)')
+    fig.plot(df_c_ann.index, df_c_ann["GCF_percent"], marker='s', label='GCF (% GDP)')
+    fig.set_title(f"{c} — Annual GDP growth & GCF (1986-2024)")
+    fig.set_xlabel("Year")
+    fig.set_ylabel("Percent")
+    fig.legend()
+    fig.grid(True)
+    fig.tight_layout()
+    figures.append(fig)
+    country_of[fig.path] = c
 
     # Period summary plot
-    plt.figure(figsize=(10,6))
     if not df_c_per.empty:
-        plt.plot(df_c_per["Period"], df_c_per["gM"], marker='o', label='gM (avg 5y)')
-        plt.plot(df_c_per["Period"], df_c_per["gT"], marker='s', label='gT (last year of period)')
-        plt.bar(df_c_per["Period"], df_c_per["(I/Y)_T"], alpha=0.25, label='(I/Y)_T (%)')
-        plt.title(f"{c} — 5-year period summary")
-        plt.xlabel("Period")
-        plt.ylabel("Percent / Units")
-        plt.xticks(rotation=45)
-        plt.legend()
-        plt.tight_layout()
-        plt.savefig(OUTPUT_DIR / f"{c}_period_summary.png")
-    plt.close()
-
+        fig = FigureSpec(OUTPUT_DIR / f"{c}_period_summary.png", figsize=(10,6))
+        fig.plot(df_c_per["Period"], df_c_per["gM"], marker='o', label='gM (avg 5y)')
+        fig.plot(df_c_per["Period"], df_c_per["gT"], marker='s', label='gT (last year of period)')
+        fig.bar(df_c_per["Period"], df_c_per["(I/Y)_T"], alpha=0.25, label='(I/Y)_T (%)')
+        fig.set_title(f"{c} — 5-year period summary")
+        fig.set_xlabel("Period")
+        fig.set_ylabel("Percent / Units")
+        fig.tick_params(axis='x', labelrotation=45)
+        fig.legend()
+        fig.tight_layout()
+        figures.append(fig)
+        country_of[fig.path] = c
+
+set_rows(len(figures))
+render_all(figures, workers=PLOT_WORKERS)
 print("Plots saved to", OUTPUT_DIR)
+for fig in figures:
+    record_outputs([fig.path], countries=[country_codes[country_of[fig.path]]])
 
 # -------------------------
-# 7) Map: choropleth of latest ICOR_ratio by country
+# 7) Maps: choropleths of the latest period (MAP_METRICS) by country
 # -------------------------
-print("7) Drawing world map of latest ICOR_ratio for countries present...")
-# Prepare latest period per country
+stage("7) maps")
+print("7) Drawing world maps of the latest period per country:", ", ".join(MAP_METRICS), "...")
+# Latest period per country, keyed by Country Code (ISO3 / WB code; the map
+# resolves names and Natural Earth's '-99' codes through wdi.countries)
 latest_period_of_country = period_summary.sort_values("Period").groupby("Country").tail(1)
-# We need ISO3 codes to merge with geopandas world; use Country Code from file (usually ISO3)
-latest_period_of_country = latest_period_of_country.rename(columns={"Country Code": "ISO_A3"})
-
-# load geopandas world
-world = gpd.read_file(gpd.datasets.get_path('naturalearth_lowres'))
-
-# Some ISO codes in naturalearth are uppercase, ensure match
-latest_period_of_country["ISO_A3"] = latest_period_of_country["ISO_A3"].astype(str).str.upper()
-
-map_df = world.merge(latest_period_of_country, left_on="iso_a3", right_on="ISO_A3", how="right")
-
-# Plot choropleth
-if not map_df.empty:
-    fig, ax = plt.subplots(1, 1, figsize=(12,6))
-    map_df.plot(column="ICOR_ratio", ax=ax, legend=True, missing_kwds={"color": "lightgrey"}, cmap="RdYlBu")
-    ax.set_title("Latest ICOR_ratio by country (period latest available)")
-    ax.axis('off')
-    plt.tight_layout()
-    plt.savefig(OUTPUT_DIR / "map_icor_ratio_latest.png")
-    plt.close()
-    print("Map saved:", OUTPUT_DIR / "map_icor_ratio_latest.png")
-else:
-    print("No matching countries for map (ISO mismatch?) — check Country Code values.")
+latest_by_code = latest_period_of_country.set_index("Country Code")
+
+# Geometry is read from the bundled Natural Earth shapefile once and cached in
+# wdi/data/naturalearth_lowres/.wdi_store/maps (projected, simplified); later runs
+# only load the arrays.
+world = load_world()
+for metric, filename in MAP_METRICS.items():
+    values = latest_by_code[metric].dropna()
+    if values.empty:
+        print(f"No {metric} values for map — skipped.")
+        continue
+    out = world.choropleth(values, OUTPUT_DIR / filename, label=metric,
+                           title=f"Latest {metric} by country (period latest available)")
+    print("Map saved:", out)
+    record_outputs([out])
+
+# Every period, not only the latest: one PNG frame per period and metric in
+# MAP_FRAMES_DIR. The figure is drawn once per metric; frames only recolour it.
+for metric, filename in MAP_METRICS.items():
+    frames = {period: grp.set_index("Country Code")[metric].dropna()
+              for period, grp in period_summary.groupby("Period", sort=True)}
+    frames = {period: values for period, values in frames.items() if not values.empty}
+    paths = world.choropleth_frames(frames, MAP_FRAMES_DIR, prefix=Path(filename).stem.replace("_latest", ""),
+                                    title=f"{metric} by country, {{label}}", label=metric)
+    print(f"Map frames saved: {len(paths)} x {metric} in", MAP_FRAMES_DIR)
+    record_outputs(paths)
 
 # -------------------------
 # 8) Forecasting (annual) 2025-2029 for GDP_growth and GCF_percent per country
 #    We'll use ExponentialSmoothing (simple and robust); save forecasts and forecast plots
 # -------------------------
+stage("8) forecast")
 print("8) Forecasting next 5 years for each country (ExponentialSmoothing)...")
-forecast_rows = []
+# Collect every (country, indicator) series first, then fit the uncached ones in a process pool;
+# results come back in the same order, failed / timed-out fits fall back to the last value.
+forecast_countries = []
+forecast_inputs = []
 for c in countries:
     s_ann = df_ann[df_ann["Country"] == c].sort_values("Year")
     if s_ann["GDP_growth"].dropna().shape[0] < 10:
-        # too few points for stable forecast; skip or use naive mean
+        # too few points for stable forecast; skip
         continue
+    forecast_countries.append(c)
+    forecast_inputs.append(s_ann.set_index("Year")["GDP_growth"].astype(float))
+    forecast_inputs.append(s_ann.set_index("Year")["GCF_percent"].astype(float))
 
-    # GDP growth model
-    y_gdp = s_ann.set_index("Year")["GDP_growth"].astype(float)
-    y_gcf = s_ann.set_index("Year")["GCF_percent"].astype(float)
-
-    # fit model for GDP if at least 8 non-na values
-    try:
-        model_gdp = ExponentialSmoothing(y_gdp.dropna(), trend="add", seasonal=None, damped_trend=True)
-        fit_gdp = model_gdp.fit(optimized=True)
-        f_gdp = fit_gdp.forecast(FORECAST_HORIZON)
-    except Exception:
-        # fallback to last value repeated
-        last = y_gdp.dropna().iloc[-1]
-        f_gdp = pd.Series([last]*FORECAST_HORIZON, index=range(y_gdp.index.max()+1, y_gdp.index.max()+1+FORECAST_HORIZON))
-
-    try:
-        model_gcf = ExponentialSmoothing(y_gcf.dropna(), trend="add", seasonal=None, damped_trend=True)
-        fit_gcf = model_gcf.fit(optimized=True)
-        f_gcf = fit_gcf.forecast(FORECAST_HORIZON)
-    except Exception:
-        last = y_gcf.dropna().iloc[-1] if not y_gcf.dropna().empty else np.nan
-        f_gcf = pd.Series([last]*FORECAST_HORIZON, index=range(y_gcf.index.max()+1, y_gcf.index.max()+1+FORECAST_HORIZON))
+forecasts = forecast_many(forecast_inputs, FORECAST_HORIZON, model=FORECAST_MODEL, workers=FORECAST_WORKERS,
+                          timeout=FORECAST_TIMEOUT, cache=FORECAST_CACHE)
+set_rows(len(forecasts))
+
+forecast_rows = []
+forecast_figures = []
+for i, c in enumerate(forecast_countries):
+    y_gdp, y_gcf = forecast_inputs[2 * i], forecast_inputs[2 * i + 1]
+    f_gdp, f_gcf = forecasts[2 * i], forecasts[2 * i + 1]
 
     # save rows
     for yr, val_gdp in f_gdp.items():
@@ -292,34 +337,40 @@ for c in countries:
         })
 
     # plot forecast + historical
-    plt.figure(figsize=(10,6))
-    plt.plot(y_gdp.index, y_gdp.values, label="GDP_growth (hist)", marker='o')
-    plt.plot(f_gdp.index, f_gdp.values, label="GDP_growth (forecast)", marker='o', linestyle='--')
-    plt.title(f"{c} — GDP growth: historical + forecast")
-    plt.xlabel("Year"); plt.ylabel("%")
-    plt.legend(); plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(OUTPUT_DIR / f"{c}_forecast_gdp.png")
-    plt.close()
-
-    plt.figure(figsize=(10,6))
-    plt.plot(y_gcf.index, y_gcf.values, label="GCF% (hist)", marker='s')
-    plt.plot(f_gcf.index, f_gcf.values, label="GCF% (forecast)", marker='s', linestyle='--')
-    plt.title(f"{c} — Gross capital formation (% GDP): historical + forecast")
-    plt.xlabel("Year"); plt.ylabel("%")
-    plt.legend(); plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(OUTPUT_DIR / f"{c}_forecast_gcf.png")
-    plt.close()
+    fig = FigureSpec(OUTPUT_DIR / f"{c}_forecast_gdp.png", figsize=(10,6))
+    fig.plot(y_gdp.index, y_gdp.values, label="GDP_growth (hist)", marker='o')
+    fig.plot(f_gdp.index, f_gdp.values, label="GDP_growth (forecast)", marker='o', linestyle='--')
+    fig.set_title(f"{c} — GDP growth: historical + forecast")
+    fig.set_xlabel("Year"); fig.set_ylabel("%")
+    fig.legend(); fig.grid(True)
+    fig.tight_layout()
+    forecast_figures.append(fig)
+    country_of[fig.path] = c
+
+    fig = FigureSpec(OUTPUT_DIR / f"{c}_forecast_gcf.png", figsize=(10,6))
+    fig.plot(y_gcf.index, y_gcf.values, label="GCF% (hist)", marker='s')
+    fig.plot(f_gcf.index, f_gcf.values, label="GCF% (forecast)", marker='s', linestyle='--')
+    fig.set_title(f"{c} — Gross capital formation (% GDP): historical + forecast")
+    fig.set_xlabel("Year"); fig.set_ylabel("%")
+    fig.legend(); fig.grid(True)
+    fig.tight_layout()
+    forecast_figures.append(fig)
+    country_of[fig.path] = c
+
+render_all(forecast_figures, workers=PLOT_WORKERS)
+for fig in forecast_figures:
+    record_outputs([fig.path], countries=[country_codes[country_of[fig.path]]])
 
 # save forecast
 df_forecast = pd.DataFrame(forecast_rows)
 df_forecast.to_csv(OUTPUT_DIR / "forecast_annual_2025_2029.csv", index=False)
+record_outputs([OUTPUT_DIR / "forecast_annual_2025_2029.csv"])
 print("Saved forecast_annual_2025_2029.csv")
 
 # -------------------------
 # 9) Auto conclusions (simple heuristic)
 # -------------------------
+stage("9) conclusions")
 print("\n9) Generating automatic conclusions (heuristic):\n")
 summary_lines = []
 for c in countries:
@@ -350,21 +401,9 @@ print("Files of interest:")
 for p in sorted(OUTPUT_DIR.iterdir()):
     print(" -", p.name)
 
+print_report()
 
 
-# Link dữ liệu mới
-url = "https://www.naturalearthdata.com/http//www.naturalearthdata.com/download/110m/cultural/ne_110m_admin_0_countries.zip"
-
-# Đọc trực tiếp từ URL (GeoPandas hỗ trợ)
-world = gpd.read_file(url)
-
-world = world.merge(latest_icor_df, left_on='ADMIN', right_on='Country Name', how='left')
-fig, ax = plt.subplots(1, 1, figsize=(15, 8))
-world.plot(column='ICOR_ratio', cmap='coolwarm', linewidth=0.8, ax=ax, edgecolor='0.8', legend=True)
-plt.title("Bản đồ ICOR các nước", fontsize=16)
-plt.savefig("output_wdi_analysis/world_icor_map.png", dpi=300)
-plt.close()
-
 
 # growth in Viet Nam
 
@@ -0,0 +1,33 @@
+"""
+refresh_data.py
+Compare a new WDI export with the one main.py was last run on.
+
+Replace P_Data_Extract_From_World_Development_Indicators.xlsx with the new
+download and run this script: the changed (country, series, year) cells are
+written to a delta file in .wdi_store and the outputs main.py recorded whose
+scope contains them are listed as stale (wdi/refresh.py).
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from wdi.refresh import refresh
+
+FILE_PATH = Path(__file__).parent / "P_Data_Extract_From_World_Development_Indicators.xlsx"
+
+delta = refresh(FILE_PATH)
+
+if delta.baseline:
+    print(f"First run: stored a snapshot of {FILE_PATH.name} to compare later exports against.")
+elif delta.empty:
+    print("No data cell changed since the last refresh.")
+else:
+    print(f"{len(delta)} data cells changed (delta: {delta.path.name}).")
+    print(delta.summary().to_string())
+    print("\nYears with changes:", sorted(delta.cells["Year"].unique().tolist()))
+
+if delta.stale:
+    print("\nOutputs to re-run main.py for:")
+    for name in delta.stale:
+        print(" -", name)
@@ -1,16 +1,24 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 import os
+import sys
+from pathlib import Path
+
+# Shared WDI helpers (repo root)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from wdi.plotting import FigureSpec, render_all, show_figures
+from wdi.store import load_wide
 
 # ==============================
 # 1. Đọc dữ liệu
 # ==============================
 file_path = "NCKT_!.xlsx"
+SHOW = False  # True: mở cửa sổ xem biểu đồ sau khi lưu (như plt.show() trước đây)
 
 if not os.path.exists(file_path):
     raise FileNotFoundError(f"❌ Không tìm thấy file: {file_path}")
 
-df = pd.read_excel(file_path, sheet_name="Data")
+# Sheet Data chỉ được parse (openpyxl) một lần; các lần sau đọc cache Feather trong .wdi_store
+df = load_wide(file_path, sheet_name="Data")
 
 # ==============================
 # 2. Tiền xử lý
@@ -59,28 +67,29 @@ print(f"✅ Đã lưu dữ liệu: {out_csv}")
 # ==============================
 # 6. Vẽ biểu đồ
 # ==============================
-plt.figure(figsize=(14, 7))
+out_png = "other_countries_growth.png"
+fig = FigureSpec(out_png, figsize=(14, 7), dpi=300, bbox_inches="tight")
 
 # Vẽ 8 nước
 for c in countries:
     if c in data.columns:
-        plt.plot(data.index, data[c], linestyle="-", alpha=0.8, label=c)
+        fig.plot(data.index, data[c], linestyle="-", alpha=0.8, label=c)
 
 # Vẽ World & ASEAN nổi bật
 for c in special_entities:
     if c in data.columns:
-        plt.plot(data.index, data[c], linestyle="--", linewidth=2.5, label=c)
+        fig.plot(data.index, data[c], linestyle="--", linewidth=2.5, label=c)
 
-plt.title("GDP Growth Comparison (1985–2024) - Other Countries", fontsize=16, weight="bold")
-plt.xlabel("Year")
-plt.ylabel("GDP Growth (%)")
-plt.xticks(rotation=45)
-plt.legend(loc="best")
-plt.grid(True, linestyle="--", alpha=0.6)
+fig.set_title("GDP Growth Comparison (1985–2024) - Other Countries", fontsize=16, weight="bold")
+fig.set_xlabel("Year")
+fig.set_ylabel("GDP Growth (%)")
+fig.tick_params(axis="x", labelrotation=45)
+fig.legend(loc="best")
+fig.grid(True, linestyle="--", alpha=0.6)
 
-# Lưu ảnh
-out_png = "other_countries_growth.png"
-plt.savefig(out_png, dpi=300, bbox_inches="tight")
+# Lưu ảnh (chỉ vẽ lại khi dữ liệu/định dạng thay đổi so với lần chạy trước)
+render_all([fig])
 print(f"✅ Đã lưu biểu đồ: {out_png}")
+if SHOW:
+    show_figures([fig])
 
-plt.show()
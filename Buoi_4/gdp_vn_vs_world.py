@@ -1,19 +1,27 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 import os
+import sys
+from pathlib import Path
+
+# Shared WDI helpers (repo root)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from wdi.countries import COUNTRIES
+from wdi.plotting import FigureSpec, render_all, show_figures
+from wdi.store import load_wide, sheet_names
 
 # ==============================
 # 1. Đọc dữ liệu
 # ==============================
 file_path = "NCKT_!.xlsx"
+SHOW = False  # True: mở cửa sổ xem biểu đồ sau khi lưu (như plt.show() trước đây)
 
 if not os.path.exists(file_path):
     raise FileNotFoundError(f"❌ Không tìm thấy file: {file_path}")
 
-xls = pd.ExcelFile(file_path)
-print("📂 Sheets có trong file:", xls.sheet_names)
+print("📂 Sheets có trong file:", sheet_names(file_path))
 
-df = pd.read_excel(file_path, sheet_name="Data")
+# Sheet Data chỉ được parse (openpyxl) một lần; các lần sau đọc cache Feather trong .wdi_store
+df = load_wide(file_path, sheet_name="Data")
 print("📊 Kích thước sheet Data:", df.shape)
 
 # ==============================
@@ -35,9 +43,9 @@ countries = [
     "Japan", "Korea, Rep."
 ]
 
-# Chuẩn hóa: nếu "Vietnam" không có thì dùng "Viet Nam"
-if "Vietnam" not in df_gdp.index and "Viet Nam" in df_gdp.index:
-    countries[0] = "Viet Nam"
+# Chuẩn hóa tên theo cách viết trong file ("Vietnam" -> "Viet Nam", ...) qua bảng alias
+names_in_file = df_gdp.index.unique()
+countries = [COUNTRIES.find(c, names_in_file) or c for c in countries]
 
 special_entities = ["World", "ASEAN members"]  # Thêm World + ASEAN
 
@@ -67,31 +75,32 @@ print(f"✅ Đã lưu dữ liệu: {out_csv}")
 # ==============================
 # 5. Vẽ biểu đồ so sánh
 # ==============================
-plt.figure(figsize=(14, 7))
+out_png = "gdp_comparison.png"
+fig = FigureSpec(out_png, figsize=(14, 7), dpi=300, bbox_inches="tight")
 
 for c in countries:
     if c in data.columns:
-        plt.plot(data.index, data[c], linestyle="-", marker="", alpha=0.8, label=c)
+        fig.plot(data.index, data[c], linestyle="-", marker="", alpha=0.8, label=c)
 
 # Vẽ World & ASEAN nổi bật
 for c in special_entities:
     if c in data.columns:
-        plt.plot(data.index, data[c], linestyle="--", linewidth=2.5, label=c)
+        fig.plot(data.index, data[c], linestyle="--", linewidth=2.5, label=c)
 
 # Vẽ đường trung bình VN
 vn_avg = avg_growth[countries[0]]
-plt.axhline(vn_avg, color="r", linestyle=":", label=f"{countries[0]} Avg {vn_avg:.2f}%")
+fig.axhline(vn_avg, color="r", linestyle=":", label=f"{countries[0]} Avg {vn_avg:.2f}%")
 
-plt.title(f"GDP Growth Comparison (1985–2024)", fontsize=16, weight="bold")
-plt.xlabel("Year")
-plt.ylabel("GDP Growth (%)")
-plt.xticks(rotation=45)
-plt.legend(loc="best")
-plt.grid(True, linestyle="--", alpha=0.6)
+fig.set_title(f"GDP Growth Comparison (1985–2024)", fontsize=16, weight="bold")
+fig.set_xlabel("Year")
+fig.set_ylabel("GDP Growth (%)")
+fig.tick_params(axis="x", labelrotation=45)
+fig.legend(loc="best")
+fig.grid(True, linestyle="--", alpha=0.6)
 
-# Lưu ảnh
-out_png = "gdp_comparison.png"
-plt.savefig(out_png, dpi=300, bbox_inches="tight")
+# Lưu ảnh (chỉ vẽ lại khi dữ liệu/định dạng thay đổi so với lần chạy trước)
+render_all([fig])
 print(f"✅ Đã lưu biểu đồ: {out_png}")
+if SHOW:
+    show_figures([fig])
 
-plt.show()
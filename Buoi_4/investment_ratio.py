@@ -1,10 +1,18 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 import os
+import sys
+from pathlib import Path
+
+# Shared WDI helpers (repo root)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from wdi.countries import COUNTRIES
+from wdi.plotting import FigureSpec, render_all, show_figures
+from wdi.store import load_wide
 
 # === Đường dẫn file Excel ===
-file_path = r"D:\Code linh tinh\KINHTEPHATTRIEN\Kinh_Te_Phat_Trien\Buoi_4\NCKT_!.xlsx"
+file_path = Path(__file__).parent / "NCKT_!.xlsx"
 sheet_name = "Data"
+SHOW = False  # True: mở cửa sổ xem biểu đồ sau khi lưu (như plt.show() trước đây)
 
 # === Chỉ tiêu cần lấy ===
 target_indicators = {
@@ -14,12 +22,14 @@ target_indicators = {
 }
 
 # === Đọc dữ liệu ===
-df = pd.read_excel(file_path, sheet_name=sheet_name)
+# Sheet chỉ được parse (openpyxl) một lần; các lần sau đọc cache Feather trong .wdi_store
+df = load_wide(file_path, sheet_name=sheet_name)
 
 print("Các cột dữ liệu:", df.columns.tolist())
 
 # Lọc dữ liệu Việt Nam
-df_vn = df[df["Country Name"] == "Vietnam"]
+# (so khớp theo mã quốc gia chuẩn: file WDI ghi "Viet Nam", không phải "Vietnam")
+df_vn = df[df["Country Code"] == COUNTRIES.key("Vietnam")]
 
 # Chỉ giữ các chỉ tiêu quan tâm
 df_vn = df_vn[df_vn["Series Code"].isin(target_indicators.keys())]
@@ -51,20 +61,21 @@ df_pivot.to_csv(output_csv, encoding="utf-8-sig")
 print(f"Đã xuất dữ liệu ra {output_csv}")
 
 # === Vẽ biểu đồ ===
-plt.figure(figsize=(12, 6))
+output_png = "investment_ratio_vietnam.png"
+fig = FigureSpec(output_png, figsize=(12, 6), dpi=300)
 for col in df_pivot.columns:
-    plt.plot(df_pivot.index, df_pivot[col], marker="o", label=col)
+    fig.plot(df_pivot.index, df_pivot[col], marker="o", label=col)
 
-plt.title("Investment & Savings Indicators - Vietnam (1985-2024)", fontsize=14, weight="bold")
-plt.xlabel("Year")
-plt.ylabel("Value")
-plt.legend()
-plt.grid(True, linestyle="--", alpha=0.5)
-plt.tight_layout()
+fig.set_title("Investment & Savings Indicators - Vietnam (1985-2024)", fontsize=14, weight="bold")
+fig.set_xlabel("Year")
+fig.set_ylabel("Value")
+fig.legend()
+fig.grid(True, linestyle="--", alpha=0.5)
+fig.tight_layout()
 
-# Lưu ảnh
-output_png = "investment_ratio_vietnam.png"
-plt.savefig(output_png, dpi=300)
-plt.show()
+# Lưu ảnh (chỉ vẽ lại khi dữ liệu/định dạng thay đổi so với lần chạy trước)
+render_all([fig])
 
 print(f"Đã lưu biểu đồ ra {output_png}")
+if SHOW:
+    show_figures([fig])
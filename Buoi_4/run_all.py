@@ -0,0 +1,184 @@
+"""
+run_all.py
+All Buoi_4 analyses in one pass over the workbook:
+- vn_growth.csv / .png               (vn_growth.py)
+- other_countries_growth.csv / .png  (gdp_8countries.py)
+- countries_growth.csv / gdp_comparison.png  (gdp_vn_vs_world.py)
+- investment_ratio_vietnam.csv / .png        (investment_ratio.py)
+
+The Data sheet is loaded once (cached, see wdi.store.load_wide), the
+GDP-growth rows are turned into one year x country matrix, and every view is a
+column selection of that matrix instead of a per-script filter + loop. Output
+files are the same as running the four scripts one by one.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Shared WDI helpers (repo root)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from wdi.countries import COUNTRIES
+from wdi.plotting import FigureSpec, render_all, show_figures
+from wdi.store import load_wide
+
+# ==============================
+# 0. Cấu hình
+# ==============================
+HERE = Path(__file__).resolve().parent
+FILE_PATH = HERE / "NCKT_!.xlsx"
+OUT_DIR = HERE
+SHOW = False  # True: mở cửa sổ xem biểu đồ sau khi lưu (như plt.show() trước đây)
+
+OTHER_COUNTRIES = [
+    "China", "Thailand", "Indonesia", "Malaysia",
+    "Philippines", "Singapore", "Japan", "Korea, Rep."
+]
+SPECIAL_ENTITIES = ["World", "ASEAN members"]
+INVESTMENT_INDICATORS = {
+    "NE.GDI.TOTL.KD": "Gross capital formation (constant 2015 US$)",
+    "NE.GDI.TOTL.ZS": "Gross capital formation (% of GDP)",
+    "NY.GNS.ICTR.ZS": "Gross savings (% of GDP)"
+}
+
+
+def year_cols(columns, first=1960, last=2029):
+    prefixes = tuple(str(y) for y in range(first, last + 1))
+    return [c for c in columns if c.startswith(prefixes)]
+
+
+def growth_matrix(df, years):
+    """Year x country matrix of 'GDP growth' rows (first row per country)."""
+    rows = df[df["Series Name"].str.contains("GDP growth", case=False, na=False)]
+    rows = rows.drop_duplicates("Country Name").set_index("Country Name")
+    growth = rows[years].T
+    growth.columns.name = None
+    return growth
+
+
+def select(growth, entities):
+    """Columns of `growth` in the given order (names matched through the alias
+    index), warning about missing ones."""
+    found = []
+    for c in entities:
+        label = c if c in growth.columns else None
+        if label is None and COUNTRIES.get(c) is not None:
+            label = COUNTRIES.find(c, growth.columns)
+        if label is None:
+            print(f"⚠️ Không tìm thấy: {c}")
+        else:
+            found.append(label)
+    return growth[found]
+
+
+def comparison_figure(data, countries, path, title, avg_line=None):
+    fig = FigureSpec(path, figsize=(14, 7), dpi=300, bbox_inches="tight")
+    for c in countries:
+        if c in data.columns:
+            fig.plot(data.index, data[c], linestyle="-", alpha=0.8, label=c)
+    # World & ASEAN nổi bật
+    for c in SPECIAL_ENTITIES:
+        if c in data.columns:
+            fig.plot(data.index, data[c], linestyle="--", linewidth=2.5, label=c)
+    if avg_line is not None:
+        name, value = avg_line
+        fig.axhline(value, color="r", linestyle=":", label=f"{name} Avg {value:.2f}%")
+    fig.set_title(title, fontsize=16, weight="bold")
+    fig.set_xlabel("Year")
+    fig.set_ylabel("GDP Growth (%)")
+    fig.tick_params(axis="x", labelrotation=45)
+    fig.legend(loc="best")
+    fig.grid(True, linestyle="--", alpha=0.6)
+    return fig
+
+
+# ==============================
+# 1. Đọc dữ liệu (một lần)
+# ==============================
+if not os.path.exists(FILE_PATH):
+    raise FileNotFoundError(f"❌ Không tìm thấy file: {FILE_PATH}")
+
+df = load_wide(FILE_PATH, sheet_name="Data")
+COUNTRIES.learn(df)  # thêm cặp (mã, tên) của file vào bảng alias
+years = year_cols(df.columns)
+if not years:
+    raise ValueError("⚠️ Không tìm thấy cột năm!")
+
+growth = growth_matrix(df, years)
+vn_name = COUNTRIES.find("Vietnam", growth.columns)  # tên VN đúng như trong file
+if vn_name is None:
+    raise ValueError("⚠️ Không tìm thấy dữ liệu Việt Nam trong file!")
+figures = []
+
+# ==============================
+# 2. Việt Nam (vn_growth)
+# ==============================
+vn_data = growth[vn_name]
+vn_avg = vn_data.mean()
+print(f"\n🇻🇳 Tăng trưởng kinh tế trung bình Việt Nam (1985–2024): {vn_avg:.2f} %")
+vn_data.rename(None).to_csv(OUT_DIR / "vn_growth.csv", header=["GDP Growth (%)"])
+
+fig = FigureSpec(OUT_DIR / "vn_growth.png", figsize=(12, 6), dpi=300, bbox_inches="tight")
+fig.plot(vn_data.index, vn_data.values, marker="o", linestyle="-", color="b", label="Việt Nam")
+fig.axhline(vn_avg, color="r", linestyle="--", label=f"Trung bình {vn_avg:.2f}%")
+fig.set_title("GDP Growth of Vietnam (1985–2024)", fontsize=16, weight="bold")
+fig.set_xlabel("Năm")
+fig.set_ylabel("GDP Growth (%)")
+fig.tick_params(axis="x", labelrotation=45)
+fig.grid(True, linestyle="--", alpha=0.6)
+fig.legend()
+figures.append(fig)
+
+# ==============================
+# 3. 8 nước khác + World/ASEAN (gdp_8countries)
+# ==============================
+others = select(growth, OTHER_COUNTRIES + SPECIAL_ENTITIES)
+print("\n📊 Tăng trưởng trung bình - các nước khác (%):")
+print(others.mean().round(2))
+others.to_csv(OUT_DIR / "other_countries_growth.csv")
+figures.append(comparison_figure(others, OTHER_COUNTRIES, OUT_DIR / "other_countries_growth.png",
+                                 "GDP Growth Comparison (1985–2024) - Other Countries"))
+
+# ==============================
+# 4. Việt Nam vs các nước & Thế giới (gdp_vn_vs_world)
+# ==============================
+with_vn = [vn_name] + OTHER_COUNTRIES
+vs_world = select(growth, with_vn + SPECIAL_ENTITIES)
+avg_growth = vs_world.mean()
+print("\n📊 Tăng trưởng trung bình - Việt Nam vs Thế giới (%):")
+print(avg_growth.round(2))
+vs_world.to_csv(OUT_DIR / "countries_growth.csv")
+figures.append(comparison_figure(vs_world, with_vn, OUT_DIR / "gdp_comparison.png",
+                                 "GDP Growth Comparison (1985–2024)",
+                                 avg_line=(vn_name, avg_growth[vn_name])))
+
+# ==============================
+# 5. Tỷ lệ đầu tư & tiết kiệm Việt Nam (investment_ratio)
+# ==============================
+inv_rows = df[(df["Country Code"] == COUNTRIES.key(vn_name)) & df["Series Code"].isin(INVESTMENT_INDICATORS.keys())]
+inv_years = year_cols(df.columns, 1985, 2024)
+# wide -> (năm x chỉ tiêu) bằng một phép chuyển vị, giống pivot_table (mean, bỏ hàng/cột rỗng)
+df_pivot = inv_rows.groupby("Series Name")[inv_years].mean().T
+df_pivot.index = [int(c[:4]) for c in df_pivot.index]
+df_pivot = df_pivot.dropna(how="all").dropna(axis=1, how="all")
+df_pivot.index.name = "Year"
+df_pivot.to_csv(OUT_DIR / "investment_ratio_vietnam.csv", encoding="utf-8-sig")
+
+fig = FigureSpec(OUT_DIR / "investment_ratio_vietnam.png", figsize=(12, 6), dpi=300)
+for col in df_pivot.columns:
+    fig.plot(df_pivot.index, df_pivot[col], marker="o", label=col)
+fig.set_title("Investment & Savings Indicators - Vietnam (1985-2024)", fontsize=14, weight="bold")
+fig.set_xlabel("Year")
+fig.set_ylabel("Value")
+fig.legend()
+fig.grid(True, linestyle="--", alpha=0.5)
+fig.tight_layout()
+figures.append(fig)
+
+# ==============================
+# 6. Vẽ biểu đồ (chỉ những biểu đồ có dữ liệu/định dạng thay đổi)
+# ==============================
+render_all(figures)
+print(f"✅ Đã lưu 4 bộ CSV/PNG vào: {OUT_DIR}")
+if SHOW:
+    show_figures(figures)
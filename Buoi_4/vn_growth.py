@@ -1,16 +1,25 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 import os
+import sys
+from pathlib import Path
+
+# Shared WDI helpers (repo root)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from wdi.countries import COUNTRIES
+from wdi.plotting import FigureSpec, render_all, show_figures
+from wdi.store import load_wide
 
 # ==============================
 # 1. Đọc dữ liệu
 # ==============================
 file_path = "NCKT_!.xlsx"
+SHOW = False  # True: mở cửa sổ xem biểu đồ sau khi lưu (như plt.show() trước đây)
 
 if not os.path.exists(file_path):
     raise FileNotFoundError(f"❌ Không tìm thấy file: {file_path}")
 
-df = pd.read_excel(file_path, sheet_name="Data")
+# Sheet Data chỉ được parse (openpyxl) một lần; các lần sau đọc cache Feather trong .wdi_store
+df = load_wide(file_path, sheet_name="Data")
 
 # ==============================
 # 2. Tiền xử lý
@@ -23,11 +32,9 @@ df_gdp = df[df["Series Name"].str.contains("GDP growth", case=False, na=False)].
 df_gdp = df_gdp.set_index("Country Name")
 
 # Chuẩn hóa tên VN
-vn_name = "Vietnam"
-if vn_name not in df_gdp.index and "Viet Nam" in df_gdp.index:
-    vn_name = "Viet Nam"
+vn_name = COUNTRIES.find("Vietnam", df_gdp.index.unique())  # "Vietnam" / "Viet Nam" / "VNM"
 
-if vn_name not in df_gdp.index:
+if vn_name is None:
     raise ValueError("⚠️ Không tìm thấy dữ liệu Việt Nam trong file!")
 
 # ==============================
@@ -50,20 +57,21 @@ print(f"✅ Đã lưu dữ liệu: {out_csv}")
 # ==============================
 # 5. Vẽ biểu đồ
 # ==============================
-plt.figure(figsize=(12, 6))
-plt.plot(vn_data.index, vn_data.values, marker="o", linestyle="-", color="b", label="Việt Nam")
-plt.axhline(vn_avg, color="r", linestyle="--", label=f"Trung bình {vn_avg:.2f}%")
+out_png = "vn_growth.png"
+fig = FigureSpec(out_png, figsize=(12, 6), dpi=300, bbox_inches="tight")
+fig.plot(vn_data.index, vn_data.values, marker="o", linestyle="-", color="b", label="Việt Nam")
+fig.axhline(vn_avg, color="r", linestyle="--", label=f"Trung bình {vn_avg:.2f}%")
 
-plt.title("GDP Growth of Vietnam (1985–2024)", fontsize=16, weight="bold")
-plt.xlabel("Năm")
-plt.ylabel("GDP Growth (%)")
-plt.xticks(rotation=45)
-plt.grid(True, linestyle="--", alpha=0.6)
-plt.legend()
+fig.set_title("GDP Growth of Vietnam (1985–2024)", fontsize=16, weight="bold")
+fig.set_xlabel("Năm")
+fig.set_ylabel("GDP Growth (%)")
+fig.tick_params(axis="x", labelrotation=45)
+fig.grid(True, linestyle="--", alpha=0.6)
+fig.legend()
 
-# Lưu biểu đồ
-out_png = "vn_growth.png"
-plt.savefig(out_png, dpi=300, bbox_inches="tight")
+# Lưu biểu đồ (chỉ vẽ lại khi dữ liệu/định dạng thay đổi so với lần chạy trước)
+render_all([fig])
 print(f"✅ Đã lưu biểu đồ: {out_png}")
+if SHOW:
+    show_figures([fig])
 
-plt.show()
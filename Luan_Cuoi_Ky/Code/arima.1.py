@@ -3,38 +3,50 @@ import numpy as np
 import matplotlib.pyplot as plt
 import os
 from statsmodels.tsa.stattools import adfuller, kpss
-from statsmodels.tsa.arima.model import ARIMA
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
 from statsmodels.graphics.tsaplots import plot_acf, plot_pacf
 import warnings
 warnings.filterwarnings("ignore")
 
+from esg_data import load_esg_subset, record_output
+from wdi.arima_select import P_MAX, Q_MAX, select_order
+from wdi.cache import DiskCache, series_digest
+from wdi.ets import prediction_intervals
+from wdi.ets_batch import fit_ets
+from wdi.panel import Panel
+from wdi.trace import stage, traced
+
 # ============ Cấu hình ===================
-DATA_FILE = r"D:\UEH\Kinh_Te_Phat_Trien\Luan_Cuoi_Ky\P_Data_Extract_From_World_Development_Indicators\2e666c17-c1b6-45ef-99cc-0fa89d21f0ef_Data.csv"
 PLOT_DIR = "plots"
 os.makedirs(PLOT_DIR, exist_ok=True)
 
 FORECAST_END_YEAR = 2030
 MIN_OBS = 8  # số quan sát tối thiểu
+COUNTRY_CODE = "VNM"
+N_SIM_PATHS = 5000  # số đường mô phỏng sai số cho khoảng dự báo ETS
+SIM_SEED = 0
+
+# Cache kết quả dự báo theo hash (chuỗi đã làm sạch, phương pháp, bậc, năm dự báo cuối):
+# lần cập nhật WDI sau chỉ ước lượng lại các chuỗi có số liệu thay đổi.
+FORECAST_CACHE = DiskCache("forecast", max_bytes=64 * 1024 * 1024)
+
+indicators = {
+    "EG.FEC.RNEW.ZS": "Renewable Energy (%)",
+    "EN.ATM.CO2E.PC.ZG": "CO2 per Capita Change (%)",
+    "HD.HCI.OVRL": "Human Capital Index",
+    "SP.DYN.LE00.IN": "Life Expectancy"
+}
 
 # ================= Load dữ liệu ===================
+stage("load")
 print("Load data...")
-df_raw = pd.read_csv(DATA_FILE)
-df_cleaned = df_raw.dropna(subset=['Series Code', 'Country Code', 'Country Name'])
-year_columns = [c for c in df_cleaned.columns if '[YR' in c]
-
-df_long = pd.melt(df_cleaned, 
-                  id_vars=['Country Name','Country Code','Series Name','Series Code'], 
-                  value_vars=year_columns, 
-                  var_name='Year', value_name='Value')
-df_long['Value'] = pd.to_numeric(df_long['Value'].replace('..', np.nan), errors='coerce')
-df_long['Year'] = df_long['Year'].str.extract(r'(\d{4})').astype(float)
-df_long.dropna(subset=['Year'], inplace=True)
-df_long['Year'] = df_long['Year'].astype(int)
+# chỉ đọc các chỉ số cần dự báo của Việt Nam (lọc ngay khi đọc từng khối CSV)
+df_long = load_esg_subset(series_codes=list(indicators), country_codes=[COUNTRY_CODE])
+# khối (quốc gia x chỉ số x năm): mỗi chuỗi lấy ra bằng tra cứu chỉ số, không quét lại bảng
+panel = Panel.from_long(df_long)
 
 # ================= HÀM HỖ TRỢ ===================
 def check_stationarity(series, name=""):
-    """ADF & KPSS"""
+    """ADF & KPSS -> (series_clean, adf_p, kpss_p), None nếu không đủ dữ liệu"""
     series_clean = series.dropna()
     if len(series_clean) < MIN_OBS:
         print(f"Không đủ dữ liệu (ít hơn {MIN_OBS} quan sát) cho {name}. Bỏ qua.")
@@ -42,12 +54,12 @@ def check_stationarity(series, name=""):
     adf_res = adfuller(series_clean)
     kpss_res = kpss(series_clean, nlags="auto")
     print(f"{name} - ADF p-value: {adf_res[1]:.4f}, KPSS p-value: {kpss_res[1]:.4f}")
-    return series_clean
+    return series_clean, adf_res[1], kpss_res[1]
 
 def plot_series_and_acf(series, name):
     series_clean = series.dropna()
     if len(series_clean) < MIN_OBS:
-        return
+        return None
     lags = min(20, len(series_clean)//2)  # giới hạn lags ≤50% mẫu
     fig, axes = plt.subplots(1,2,figsize=(12,4))
     plot_acf(series_clean, ax=axes[0], lags=lags)
@@ -59,44 +71,63 @@ def plot_series_and_acf(series, name):
     fig.savefig(fn2)
     plt.close(fig)
     print(f"Đã lưu ACF/PACF: {fn2}")
+    return fn2
 
-def forecast_series(series, method="ETS"):
+@traced()
+def forecast_series(series, method="ETS", adf_p=None, kpss_p=None):
     series_clean = series.dropna()
-    last_year = series_clean.index[-1]
+    last_year = int(series_clean.index[-1])
     steps = FORECAST_END_YEAR - last_year
     if steps <= 0:
         print("Dữ liệu đã đến hoặc vượt quá năm dự báo.")
         return None
 
+    order_spec = ("auto", P_MAX, Q_MAX) if method.upper() == "ARIMA" else ("sim", N_SIM_PATHS, SIM_SEED, "batch")
+    cache_key = series_digest(series_clean.values, list(series_clean.index), method.upper(), order_spec, FORECAST_END_YEAR)
+    cached = FORECAST_CACHE.get(cache_key)
+    if cached is not None:
+        print("(Dùng kết quả dự báo đã lưu cache - chuỗi không thay đổi)")
+        return cached["forecast"]
+
+    # chỉ số vị trí (0..n-1): statsmodels không suy được tần suất từ index năm
+    y = pd.Series(series_clean.to_numpy(dtype=float))
     if method.upper() == "ARIMA":
-        model = ARIMA(series_clean, order=(1,1,0))
-        fit = model.fit()
-        forecast_values = fit.forecast(steps)
-        conf_int = fit.get_forecast(steps).conf_int()
-        lower = conf_int.iloc[:,0]
-        upper = conf_int.iloc[:,1]
+        # bậc (p,d,q) chọn theo AIC trên lưới đã thu hẹp bằng ADF/KPSS
+        fit, order_table = select_order(y, adf_p=adf_p, kpss_p=kpss_p, criterion="aic")
+        print(f"Bậc ARIMA chọn theo AIC: {order_table.loc[0, 'order']}")
+        pred = fit.get_forecast(steps)
+        ci90 = np.asarray(pred.conf_int(alpha=0.10))
+        ci95 = np.asarray(pred.conf_int(alpha=0.05))
+        bands = pd.DataFrame({"mean": np.asarray(pred.predicted_mean),
+                              "lower_90": ci90[:, 0], "upper_90": ci90[:, 1],
+                              "lower_95": ci95[:, 0], "upper_95": ci95[:, 1]})
     elif method.upper() == "ETS":
-        fit = ExponentialSmoothing(series_clean, trend=None, seasonal=None, initialization_method="estimated").fit()
-        forecast_values = fit.forecast(steps)
-        # ETS không có get_prediction, tạo CI ±10% giả định
-        lower = forecast_values*0.9
-        upper = forecast_values*1.1
+        # ETS đơn (không xu hướng), cùng mô hình và hàm mục tiêu với statsmodels
+        # ExponentialSmoothing(initialization_method="estimated") nhưng ước lượng vector hoá (wdi/ets_batch.py)
+        fit = fit_ets(y.to_numpy()[None, :], trend=None)[0]
+        # khoảng dự báo 90%/95% từ N_SIM_PATHS đường sai số mô phỏng (vector hoá, wdi/ets.py)
+        bands = prediction_intervals(fit, steps, n_paths=N_SIM_PATHS, seed=SIM_SEED)
     else:
         raise ValueError("Method must be ARIMA or ETS")
 
     forecast_df = pd.DataFrame({
         "Năm": range(last_year+1, FORECAST_END_YEAR+1),
-        "Dự báo (Mean)": forecast_values.values,
-        "Giới hạn Dưới 90%": lower.values,
-        "Giới hạn Trên 90%": upper.values
+        "Dự báo (Mean)": bands["mean"].values,
+        "Giới hạn Dưới 90%": bands["lower_90"].values,
+        "Giới hạn Trên 90%": bands["upper_90"].values,
+        "Giới hạn Dưới 95%": bands["lower_95"].values,
+        "Giới hạn Trên 95%": bands["upper_95"].values
     })
+    params = {k: float(v) for k, v in dict(fit.params).items() if np.ndim(v) == 0 and v is not None}
+    FORECAST_CACHE.put(cache_key, {"forecast": forecast_df, "params": params})
     return forecast_df
 
 def plot_forecast(series, forecast_df, name):
     plt.figure(figsize=(10,6))
     series.plot(marker='o', label='Lịch sử')
     plt.plot(forecast_df['Năm'], forecast_df['Dự báo (Mean)'], linestyle='--', marker='o', color='orange', label='Dự báo ETS')
-    plt.fill_between(forecast_df['Năm'], forecast_df['Giới hạn Dưới 90%'], forecast_df['Giới hạn Trên 90%'], color='grey', alpha=0.2, label='CI ±10%')
+    plt.fill_between(forecast_df['Năm'], forecast_df['Giới hạn Dưới 95%'], forecast_df['Giới hạn Trên 95%'], color='grey', alpha=0.15, label='Khoảng dự báo 95%')
+    plt.fill_between(forecast_df['Năm'], forecast_df['Giới hạn Dưới 90%'], forecast_df['Giới hạn Trên 90%'], color='grey', alpha=0.3, label='Khoảng dự báo 90%')
     plt.title(f"Dự báo {name} đến {FORECAST_END_YEAR}")
     plt.xlabel("Năm")
     plt.ylabel(name)
@@ -106,31 +137,30 @@ def plot_forecast(series, forecast_df, name):
     plt.savefig(fn)
     plt.close()
     print(f"Đã lưu biểu đồ dự báo: {fn}")
+    return fn
 
 # ================= XỬ LÝ CÁC CHỈ SỐ ===================
-indicators = {
-    "EG.FEC.RNEW.ZS": "Renewable Energy (%)",
-    "EN.ATM.CO2E.PC.ZG": "CO2 per Capita Change (%)",
-    "HD.HCI.OVRL": "Human Capital Index",
-    "SP.DYN.LE00.IN": "Life Expectancy"
-}
-
 for code, pretty in indicators.items():
+    stage(code)  # mỗi chỉ số là một span (kiểm định, ACF, dự báo, biểu đồ, Excel)
     print(f"\n=== XỬ LÝ: {code} ({pretty}) ===")
-    df_tmp = df_long[(df_long['Country Name']=='Viet Nam') & (df_long['Series Code']==code)].sort_values('Year')
-    if df_tmp.empty:
+    if not panel.has(COUNTRY_CODE, code):
         print(f"Không tìm thấy dữ liệu cho {pretty}")
         continue
-    ts_data = pd.Series(df_tmp['Value'].values, index=df_tmp['Year'])
-    series_clean = check_stationarity(ts_data, pretty)
-    if series_clean is None:
+    ts_data = panel.series(COUNTRY_CODE, code, dropna=False)
+    checked = check_stationarity(ts_data, pretty)
+    if checked is None:
         continue
-    plot_series_and_acf(series_clean, pretty)
-    forecast_df = forecast_series(series_clean, method="ETS")
+    series_clean, adf_p, kpss_p = checked
+    acf_fn = plot_series_and_acf(series_clean, pretty)
+    if acf_fn is not None:
+        record_output(acf_fn, countries=[COUNTRY_CODE], series=[code])
+    forecast_df = forecast_series(series_clean, method="ETS", adf_p=adf_p, kpss_p=kpss_p)
     if forecast_df is not None:
         print(forecast_df.to_markdown(index=False, floatfmt=".2f"))
-        plot_forecast(series_clean, forecast_df, pretty)
+        plot_fn = plot_forecast(series_clean, forecast_df, pretty)
+        record_output(plot_fn, countries=[COUNTRY_CODE], series=[code])
         # Xuất ra Excel
         excel_fn = os.path.join(PLOT_DIR, f"{pretty.replace(' ','_')}_forecast.xlsx")
         forecast_df.to_excel(excel_fn, index=False)
         print(f"Đã xuất Excel: {excel_fn}")
+        record_output(excel_fn, countries=[COUNTRY_CODE], series=[code])
@@ -1,60 +1,57 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 
-# Tên file dữ liệu thô (File gốc từ World Bank)
-file_data = "D:\\UEH\\Kinh_Te_Phat_Trien\\Luan_Cuoi_Ky\\P_Data_Extract_From_World_Development_Indicators\\2e666c17-c1b6-45ef-99cc-0fa89d21f0ef_Data.csv" 
-df_raw = pd.read_csv(file_data)
+from esg_data import load_esg_long, record_output
+from wdi.growth import growth_stats
+from wdi.panel import Panel
+from wdi.plotting import FigureSpec, render_all
+from wdi.trace import set_rows, stage
 
-# ============================= ============================
+# =========================================================
 # 1. CHUẨN HÓA DỮ LIỆU THÔ (Wide -> Long)
 # =========================================================
-df_cleaned = df_raw.dropna(subset=['Series Code', 'Country Code', 'Country Name']).copy()
-year_columns = [col for col in df_cleaned.columns if '[YR' in col]
-
-df_long = pd.melt(df_cleaned, 
-                  id_vars=['Country Name', 'Country Code', 'Series Name', 'Series Code'], 
-                  value_vars=year_columns, 
-                  var_name='Year', 
-                  value_name='Value')
+stage("1. đọc dữ liệu")
+# File gốc từ World Bank chỉ được chuẩn hóa một lần, các lần sau đọc lại từ .wdi_store
+df_long = load_esg_long()
+# khối (quốc gia x chỉ số x năm): tra cứu theo chỉ số thay vì lọc lại toàn bảng
+panel = Panel.from_long(df_long)
 
-df_long['Year'] = df_long['Year'].str.extract(r'(\d{4})').astype(int)
-df_long['Value'] = df_long['Value'].replace('..', np.nan)
-df_long['Value'] = pd.to_numeric(df_long['Value'], errors='coerce')
+GROWTH_FILE = 'esg_growth_stats.csv'  # thống kê tăng trưởng cho mọi quốc gia x chỉ số
 
 
 # =========================================================
 # 2. PHÂN TÍCH ĐỊNH LƯỢNG (CAGR & MEAN)
 # =========================================================
-def calculate_cagr(start_value, end_value, start_year, end_year):
-    if start_year >= end_year or start_value <= 0:
-        return np.nan
-    years = end_year - start_year
-    return ((end_value / start_value) ** (1 / years) - 1) * 100
+# CAGR, trung bình, độ biến động, giá trị/năm đầu-cuối cho MỌI cặp (quốc gia, chỉ số)
+# trong một lần tính trên khối panel (wdi/growth.py): năm đầu/cuối là năm có số liệu
+# của từng quốc gia, CAGR = NaN khi giá trị đầu/cuối <= 0.
+stage("2. thống kê tăng trưởng")
+growth = growth_stats(panel)
+set_rows(len(growth))
+growth.to_csv(GROWTH_FILE, index=False)
+record_output(GROWTH_FILE)
+growth_idx = growth.set_index(['Country Name', 'Series Code'])
 
 metrics = {}
 
 for code, name in {'EN.GHG.CO2.ZG.AR5': 'CO2 Emissions', 'EG.FEC.RNEW.ZS': 'Renewable Energy'}.items():
-    df_e = df_long[df_long['Series Code'] == code].dropna(subset=['Value']).copy()
-    
-    latest_year = df_e['Year'].max()
-    start_year = df_e['Year'].min()
+    df_e = panel.by_series(code).dropna(how='all').dropna(axis=1, how='all')  # Năm x Quốc gia
     
-    df_latest = df_e[df_e['Year'] == latest_year]
+    latest_year = int(df_e.index.max())
+    start_year = int(df_e.index.min())
     
-    # Tính CAGR cho Việt Nam
-    vn_latest = df_latest[df_latest['Country Name'] == 'Viet Nam']['Value'].iloc[0]
-    vn_start = df_e[(df_e['Country Name'] == 'Viet Nam') & (df_e['Year'] == start_year)]['Value'].iloc[0]
-    cagr = calculate_cagr(vn_start, vn_latest, start_year, latest_year)
+    # Giá trị mới nhất và CAGR của Việt Nam
+    vn_latest = panel.value('Viet Nam', code, latest_year)
+    cagr = growth_idx.loc[('Viet Nam', code), 'cagr'] if ('Viet Nam', code) in growth_idx.index else np.nan
     
     # Tính Trung bình ASEAN (trừ SG)
-    mean_asean = df_latest[df_latest['Country Name'] != 'Singapore']['Value'].mean()
+    mean_asean = df_e.loc[latest_year].drop('Singapore', errors='ignore').mean()
     
     metrics[code] = {
         'Name': name,
-        'VN Latest Value': round(vn_latest, 2),
-        'ASEAN Mean': round(mean_asean, 2),
-        'VN CAGR': round(cagr, 2),
+        'VN Latest Value': round(float(vn_latest), 2),
+        'ASEAN Mean': round(float(mean_asean), 2),
+        'VN CAGR': round(float(cagr), 2),
         'Year Range': f'{start_year}-{latest_year}',
         'Data': df_e # Lưu DataFrame cho plotting
     }
@@ -64,59 +61,64 @@ print(f"CO2 Emissions (VN Latest={metrics['EN.GHG.CO2.ZG.AR5']['VN Latest Value'
 print(f"CO2 Emissions CAGR (2015-2023): {metrics['EN.GHG.CO2.ZG.AR5']['VN CAGR']}%")
 print(f"Renewable Energy (VN Latest={metrics['EG.FEC.RNEW.ZS']['VN Latest Value']}%, ASEAN Mean={metrics['EG.FEC.RNEW.ZS']['ASEAN Mean']}%)")
 print(f"Renewable Energy CAGR (2015-2021): {metrics['EG.FEC.RNEW.ZS']['VN CAGR']}%")
+print(f"Bảng thống kê tăng trưởng ({len(growth)} cặp quốc gia x chỉ số): {GROWTH_FILE}")
 
 
 # =========================================================
 # 3. VẼ BIỂU ĐỒ (VISUALIZATION)
 # =========================================================
 
+stage("3. biểu đồ")
 # --- A. CO2 Emissions Trend Plot ---
-plt.figure(figsize=(12, 7))
+fig_co2 = FigureSpec('co2_emissions_trend.png', figsize=(12, 7))
 df_co2 = metrics['EN.GHG.CO2.ZG.AR5']['Data']
 
-for country in df_co2['Country Name'].unique():
-    df_country = df_co2[df_co2['Country Name'] == country].sort_values(by='Year')
+for country in df_co2.columns:
+    df_country = df_co2[country].dropna()
     
     if country == 'Viet Nam':
-        plt.plot(df_country['Year'], df_country['Value'], label=country, color='red', linewidth=3, marker='o')
-        last_value = df_country['Value'].iloc[-1] if not df_country.empty else np.nan
-        plt.text(df_country['Year'].max(), last_value, f'VN ({int(last_value)})', color='red', fontsize=10, ha='left', va='center')
+        fig_co2.plot(df_country.index, df_country.values, label=country, color='red', linewidth=3, marker='o')
+        last_value = df_country.iloc[-1] if not df_country.empty else np.nan
+        fig_co2.text(df_country.index.max(), last_value, f'VN ({int(last_value)})', color='red', fontsize=10, ha='left', va='center')
     else:
-        plt.plot(df_country['Year'], df_country['Value'], label=country, alpha=0.7)
+        fig_co2.plot(df_country.index, df_country.values, label=country, alpha=0.7)
 
-plt.title('Xu hướng Phát thải CO₂ (% thay đổi so với 1990) của Việt Nam và ASEAN', fontsize=14)
-plt.xlabel('Năm', fontsize=12)
-plt.ylabel('Phát thải CO₂ (% so với 1990)', fontsize=12)
-plt.xticks(df_co2['Year'].unique(), rotation=45)
-plt.legend(loc='upper left', bbox_to_anchor=(1, 1))
-plt.grid(axis='y', linestyle='--', alpha=0.5)
-plt.tight_layout()
-plt.savefig('co2_emissions_trend.png')
-plt.close()
+fig_co2.set_title('Xu hướng Phát thải CO₂ (% thay đổi so với 1990) của Việt Nam và ASEAN', fontsize=14)
+fig_co2.set_xlabel('Năm', fontsize=12)
+fig_co2.set_ylabel('Phát thải CO₂ (% so với 1990)', fontsize=12)
+fig_co2.set_xticks(df_co2.index)
+fig_co2.tick_params(axis='x', labelrotation=45)
+fig_co2.legend(loc='upper left', bbox_to_anchor=(1, 1))
+fig_co2.grid(axis='y', linestyle='--', alpha=0.5)
+fig_co2.tight_layout()
 
 
 # --- B. Renewable Energy Trend Plot ---
-plt.figure(figsize=(12, 7))
+fig_re = FigureSpec('renewable_energy_trend.png', figsize=(12, 7))
 df_re = metrics['EG.FEC.RNEW.ZS']['Data']
 
-for country in df_re['Country Name'].unique():
-    df_country = df_re[df_re['Country Name'] == country].sort_values(by='Year')
+for country in df_re.columns:
+    df_country = df_re[country].dropna()
     
     if country == 'Viet Nam':
-        plt.plot(df_country['Year'], df_country['Value'], label=country, color='red', linewidth=3, marker='o')
-        last_value_vn = df_country['Value'].iloc[-1] if not df_country.empty else np.nan
-        plt.text(df_country['Year'].max(), last_value_vn, f'VN ({last_value_vn:.1f}%)', color='red', fontsize=10, ha='left', va='center')
+        fig_re.plot(df_country.index, df_country.values, label=country, color='red', linewidth=3, marker='o')
+        last_value_vn = df_country.iloc[-1] if not df_country.empty else np.nan
+        fig_re.text(df_country.index.max(), last_value_vn, f'VN ({last_value_vn:.1f}%)', color='red', fontsize=10, ha='left', va='center')
     else:
-        plt.plot(df_country['Year'], df_country['Value'], label=country, alpha=0.7)
-
-plt.title('Xu hướng Tiêu thụ Năng lượng Tái tạo (% tổng tiêu thụ) của Việt Nam và ASEAN', fontsize=14)
-plt.xlabel('Năm', fontsize=12)
-plt.ylabel('Phần trăm (%)', fontsize=12)
-plt.xticks(df_re['Year'].unique(), rotation=45)
-plt.legend(loc='upper left', bbox_to_anchor=(1, 1))
-plt.grid(axis='y', linestyle='--', alpha=0.5)
-plt.tight_layout()
-plt.savefig('renewable_energy_trend.png')
-plt.close()
+        fig_re.plot(df_country.index, df_country.values, label=country, alpha=0.7)
+
+fig_re.set_title('Xu hướng Tiêu thụ Năng lượng Tái tạo (% tổng tiêu thụ) của Việt Nam và ASEAN', fontsize=14)
+fig_re.set_xlabel('Năm', fontsize=12)
+fig_re.set_ylabel('Phần trăm (%)', fontsize=12)
+fig_re.set_xticks(df_re.index)
+fig_re.tick_params(axis='x', labelrotation=45)
+fig_re.legend(loc='upper left', bbox_to_anchor=(1, 1))
+fig_re.grid(axis='y', linestyle='--', alpha=0.5)
+fig_re.tight_layout()
+
+# Chỉ vẽ lại biểu đồ có dữ liệu/định dạng thay đổi so với lần chạy trước
+render_all([fig_co2, fig_re])
+record_output('co2_emissions_trend.png', series=['EN.GHG.CO2.ZG.AR5'])
+record_output('renewable_energy_trend.png', series=['EG.FEC.RNEW.ZS'])
 
 print("\n🎉 Đã hoàn tất Mã Code 7. (Đầu ra: 2 Biểu đồ xu hướng và Số liệu thống kê).")
\ No newline at end of file
@@ -1,20 +1,9 @@
-import pandas as pd
-import numpy as np
+from esg_data import exact_values, load_esg_subset, record_output
+from wdi.countries import COUNTRIES, KEY_COL
+from wdi.trace import set_rows, stage
 
 # =========================================================
-# 1. FILE NGUỒN DỮ LIỆU
-# =========================================================
-file_data = r"D:\UEH\Kinh_Te_Phat_Trien\Luan_Cuoi_Ky\P_Data_Extract_From_World_Development_Indicators\2e666c17-c1b6-45ef-99cc-0fa89d21f0ef_Data.csv"
-
-df = pd.read_csv(file_data)
-
-# =========================================================
-# 2. LOẠI BỎ DÒNG KHÔNG ĐẦY ĐỦ METADATA
-# =========================================================
-df_cleaned = df.dropna(subset=['Series Code', 'Country Code', 'Country Name']).copy()
-
-# =========================================================
-# 3. CHỌN 6 QUỐC GIA ASEAN TRONG NGHIÊN CỨU
+# 1. CHỌN 6 QUỐC GIA ASEAN TRONG NGHIÊN CỨU
 # =========================================================
 asean6 = [
     'Vietnam',
@@ -25,10 +14,8 @@ asean6 = [
     'Singapore'
 ]
 
-df_cleaned = df_cleaned[df_cleaned['Country Name'].isin(asean6)]
-
 # =========================================================
-# 4. DANH SÁCH 22 BIẾN ESG CHUẨN (E, S, G)
+# 2. DANH SÁCH 22 BIẾN ESG CHUẨN (E, S, G)
 # =========================================================
 esg_series = [
     # ---- Governance ----
@@ -58,48 +45,35 @@ esg_series = [
     'SI.POV.LMIC.GP',     # Poverty $4.20/day
 ]
 
-# Bộ lọc series tồn tại trong file
-exist_series = df_cleaned['Series Code'].unique().tolist()
-final_series = [s for s in esg_series if s in exist_series]
-
-df_cleaned = df_cleaned[df_cleaned['Series Code'].isin(final_series)]
-
+stage("3. đọc dữ liệu")
 # =========================================================
-# 5. CHỌN CỘT NĂM (2010–2023 HOẶC >= 2015)
+# 3. ĐỌC DỮ LIỆU: CHỈ GIỮ CÁC BIẾN ESG VÀ NĂM >= 2015
 # =========================================================
-year_columns = [col for col in df_cleaned.columns if '[YR' in col]
-# lọc chỉ lấy năm >= 2015
-year_columns = [col for col in year_columns if int(col[:4]) >= 2015]
+# File CSV được đọc theo từng khối dòng, lọc Series Code và cột năm trước khi
+# chuyển Wide -> Long (dòng thiếu metadata bị loại, '..' -> NaN).
+df_long = load_esg_subset(series_codes=esg_series, years=(2015, None))
 
-# =========================================================
-# 6. CHUYỂN WIDE → LONG FORMAT
-# =========================================================
-df_long = pd.melt(
-    df_cleaned,
-    id_vars=['Country Name', 'Country Code', 'Series Name', 'Series Code'],
-    value_vars=year_columns,
-    var_name='Year',
-    value_name='Value'
-)
-
-# =========================================================
-# 7. LÀM SẠCH YEAR + VALUE
-# =========================================================
-df_long['Year'] = df_long['Year'].str.extract(r"(\d{4})").astype(int)
+# Lọc theo mã quốc gia chuẩn ('Vietnam' và 'Viet Nam' cùng là VNM); tên không nhận diện được sẽ báo lỗi
+df_long = df_long[df_long[KEY_COL].isin(COUNTRIES.keys_for(asean6))]
 
-df_long['Value'] = df_long['Value'].replace('..', np.nan)
-df_long['Value'] = pd.to_numeric(df_long['Value'], errors='coerce')
+# Bộ lọc series tồn tại trong file (tra cứu trong một set, không quét danh sách)
+present = set(df_long["Series Code"])
+final_series = [s for s in esg_series if s in present]
+set_rows(len(df_long))
 
 # =========================================================
-# 8. XOÁ DỮ LIỆU TRỐNG HOÀN TOÀN
+# 4. XOÁ DỮ LIỆU TRỐNG HOÀN TOÀN
 # =========================================================
 df_long = df_long.dropna(subset=['Value'])
 
+stage("4-5. lưu CSV", rows=len(df_long))
 # =========================================================
-# 9. LƯU FILE CHUẨN HÓA
+# 5. LƯU FILE CHUẨN HÓA
 # =========================================================
 output_file = "esg_asean6_2015_2023_clean.csv"
-df_long.to_csv(output_file, index=False)
+# giữ nguyên cấu trúc cột của file xuất; Value lấy lại dạng float64 từ file gốc
+df_long.drop(columns=KEY_COL).assign(Value=exact_values(df_long)).to_csv(output_file, index=False)
+record_output(output_file, countries=COUNTRIES.keys_for(asean6), series=esg_series, years=(2015, None))
 
 print("🎉 Dữ liệu ESG (ASEAN6 – 2015-2023) đã xử lý hoàn tất!")
 print(f"File lưu tại: {output_file}")
@@ -0,0 +1,68 @@
+"""
+esg_data.py
+Nguồn dữ liệu WDI dùng chung cho các script Luận cuối kỳ.
+
+File CSV gốc chỉ được đọc và chuyển Wide -> Long một lần; kết quả được lưu dạng
+Feather trong thư mục .wdi_store (cạnh file CSV) và các lần chạy sau chỉ cần
+memory-map lại (xem wdi/store.py). Với file bulk WDIData.csv nhiều GB, dùng
+load_esg_subset để đọc theo từng khối dòng và chỉ giữ các Series/Country cần thiết.
+
+Khi thay file CSV bằng bản tải mới, chạy refresh_data.py: chỉ các ô (quốc gia,
+chỉ số, năm) thay đổi được ghi ra delta và các file kết quả đã ghi nhận bằng
+record_output có phạm vi chứa các ô đó bị đánh dấu cần chạy lại (wdi/refresh.py).
+
+Việc nạp dữ liệu được đo thời gian / bộ nhớ (span "load", wdi/trace.py); đặt
+WDI_TRACE=trace.json để lưu trace của cả script.
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from wdi.countries import with_country_key  # noqa: E402
+from wdi.refresh import artefacts_for, refresh  # noqa: E402
+from wdi.store import load_filtered, load_long, source_digest, source_values  # noqa: E402
+from wdi.trace import span  # noqa: E402
+
+# Tên file dữ liệu thô (File gốc từ World Bank, có sẵn trong Phụ lục)
+DATA_FILE = (ROOT / "Luan_Cuoi_Ky" / "P_Data_Extract_From_World_Development_Indicators"
+             / "2e666c17-c1b6-45ef-99cc-0fa89d21f0ef_Data.csv")
+
+
+def load_esg_long(**kwargs):
+    """Long format: Country Name, Country Code, Series Name, Series Code, Year, Value,
+    Country Key (mã quốc gia chuẩn, categorical - xem wdi/countries.py)."""
+    with span("load_esg_long", cat="load") as sp:
+        df_long = with_country_key(load_long(DATA_FILE, **kwargs))
+        sp.rows = len(df_long)
+    return df_long
+
+
+def load_esg_subset(series_codes=None, country_codes=None, years=None):
+    """Như load_esg_long nhưng lọc Series Code / Country Code / năm ngay khi đọc từng khối CSV."""
+    with span("load_esg_subset", cat="load") as sp:
+        df_long = with_country_key(load_filtered(DATA_FILE, series_codes=series_codes,
+                                                 country_codes=country_codes, years=years))
+        sp.rows = len(df_long)
+    return df_long
+
+
+def refresh_esg():
+    """So sánh DATA_FILE hiện tại với bản đã nhận lần trước (xem wdi.refresh.refresh)."""
+    return refresh(DATA_FILE)
+
+
+def exact_values(df_long):
+    """Cột Value của df_long dạng float64 đúng như trong DATA_FILE (kho .wdi_store lưu
+    float32); dùng khi xuất CSV để giữ nguyên số liệu gốc (xem wdi.store.source_values)."""
+    return source_values(DATA_FILE, df_long)
+
+
+def record_output(name, countries=None, series=None, years=None):
+    """Ghi nhận file kết quả `name` vừa được tạo từ DATA_FILE hiện tại, cùng phạm vi
+    (mã quốc gia, mã chỉ số, (năm đầu, năm cuối)) mà nó sử dụng; None = toàn bộ."""
+    artefacts_for(DATA_FILE).record(name, source_digest(DATA_FILE), countries=countries,
+                                    series=series, years=years)
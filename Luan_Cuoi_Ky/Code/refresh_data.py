@@ -0,0 +1,22 @@
+from esg_data import DATA_FILE, refresh_esg
+from wdi.trace import stage
+
+# Cập nhật dữ liệu hằng năm: thay file CSV trong Phụ lục bằng bản tải mới rồi chạy script này.
+# Chỉ các ô (quốc gia, chỉ số, năm) thêm mới / bị xoá / được điều chỉnh được ghi ra file delta
+# trong .wdi_store; các file kết quả có phạm vi chứa những ô đó được đánh dấu cần chạy lại.
+stage("refresh")
+delta = refresh_esg()
+
+if delta.baseline:
+    print(f"Lần đầu: đã lưu bản dữ liệu gốc của {DATA_FILE.name} để so sánh cho các lần cập nhật sau.")
+elif delta.empty:
+    print("Không có ô dữ liệu nào thay đổi so với lần cập nhật trước.")
+else:
+    print(f"Có {len(delta)} ô dữ liệu thay đổi (delta: {delta.path.name}).")
+    print(delta.summary().to_string())
+    print("\nNăm có thay đổi:", sorted(delta.cells["Year"].unique().tolist()))
+
+if delta.stale:
+    print("\nCác file kết quả cần chạy lại:")
+    for name in delta.stale:
+        print(" -", name)
@@ -0,0 +1,45 @@
+"""
+run_pipeline.py
+Chạy toàn bộ các script của Luận cuối kỳ theo đồ thị phụ thuộc (wdi/pipeline.py).
+
+Mỗi stage khai báo file đầu vào / đầu ra; stage có script, dữ liệu đầu vào và
+các module dùng chung không đổi (và file đầu ra còn nguyên) sẽ được bỏ qua, các
+stage độc lập (ba mục chương 3, các mô hình dự báo) chạy song song.
+
+    python run_pipeline.py            # chỉ chạy các stage đã thay đổi
+    python run_pipeline.py --force    # chạy lại tất cả
+    python run_pipeline.py --trace    # kèm trace thời gian / bộ nhớ của từng script
+                                      # (.wdi_store/pipeline_trace.json, mở bằng ui.perfetto.dev)
+"""
+
+import sys
+from pathlib import Path
+
+from esg_data import DATA_FILE, ROOT
+from wdi.pipeline import Pipeline, Stage
+
+HERE = Path(__file__).resolve().parent
+TRACE_FILE = Path(".wdi_store") / "pipeline_trace.json"
+
+# Module dùng chung: sửa các file này thì mọi stage đều chạy lại
+SHARED = ["esg_data.py"] + sorted(str(p) for p in (ROOT / "wdi").glob("*.py"))
+
+STAGES = [
+    Stage("code", "code.py", inputs=[DATA_FILE], outputs=["esg_analysis_long.csv"]),
+    Stage("code2", "code2.py", inputs=[DATA_FILE], outputs=["esg_asean6_2015_2023_clean.csv"]),
+    Stage("chuong3.1", "chuong3.1.py", inputs=[DATA_FILE],
+          outputs=["co2_emissions_trend.png", "renewable_energy_trend.png", "esg_growth_stats.csv"]),
+    Stage("chuong3.2", "chuong3.2.py", inputs=[DATA_FILE],
+          outputs=["hci_comparison_v3.png", "life_expectancy_comparison_v3.png", "gini_comparison.png"]),
+    Stage("chuong3.3", "chuong3.3.py", inputs=[DATA_FILE],
+          outputs=["gov_effectiveness_comparison.png", "regulatory_quality_comparison.png",
+                   "control_corruption_comparison.png"]),
+    Stage("stationarity", "stationarity_panel.py", inputs=[DATA_FILE], outputs=["esg_stationarity_panel.csv"]),
+    Stage("arima", "arima.py", inputs=[DATA_FILE], outputs=["arima_forecast_renewable_energy.png"]),
+    Stage("arima.1", "arima.1.py", inputs=[DATA_FILE], outputs=["plots"]),
+]
+
+if __name__ == "__main__":
+    trace = TRACE_FILE if "--trace" in sys.argv[1:] else None
+    report = Pipeline(STAGES, workdir=HERE, shared=SHARED).run(force="--force" in sys.argv[1:], trace=trace)
+    sys.exit(1 if any(status == "failed" for status, _ in report.values()) else 0)
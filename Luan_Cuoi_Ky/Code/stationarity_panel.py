@@ -0,0 +1,32 @@
+from esg_data import load_esg_long, record_output
+from wdi.stationarity import MIN_OBS, panel_stationarity
+from wdi.trace import stage
+
+OUTPUT_FILE = "esg_stationarity_panel.csv"
+
+stage("1. đọc dữ liệu")
+# 1. Dữ liệu dạng Long (đọc lại từ .wdi_store nếu đã chuyển đổi)
+df_long = load_esg_long()
+
+# 2. Kiểm định ADF & KPSS cho mọi cặp (quốc gia, chỉ số), chạy song song trên nhiều tiến trình.
+# Chuỗi ít hơn MIN_OBS quan sát được đánh dấu "too_short"; kết quả cache theo hash chuỗi,
+# nên lần chạy sau chỉ kiểm định các chuỗi có số liệu thay đổi.
+stage("2. ADF & KPSS")
+results = panel_stationarity(df_long, min_obs=MIN_OBS)
+
+stage("3-4. lưu kết quả", rows=len(results))
+# 3. Lưu bảng kết quả (một dòng cho mỗi chuỗi)
+results.to_csv(OUTPUT_FILE, index=False)
+record_output(OUTPUT_FILE)
+
+tested = results[results["status"] != "too_short"]
+print(f"Đã kiểm định {len(tested)}/{len(results)} chuỗi (bỏ qua chuỗi < {MIN_OBS} quan sát).")
+print(results["status"].value_counts().to_string())
+
+# 4. Chỉ số cần lấy sai phân: tỷ lệ chuỗi có d gợi ý >= 1 theo từng chỉ số
+need_diff = (tested.assign(need_diff=tested["d_suggested"] >= 1)
+             .groupby("Series Name", observed=True)["need_diff"].mean()
+             .sort_values(ascending=False))
+print("\nTỷ lệ chuỗi cần lấy sai phân theo chỉ số:")
+print(need_diff.to_string(float_format=lambda x: f"{x:.0%}"))
+print(f"\nĐã lưu: {OUTPUT_FILE}")
@@ -0,0 +1,100 @@
+"""
+period_metrics.py
+Benchmark: Buoi_2 period summary, legacy groupby().apply(compute_period_metrics)
+versus the grouped-aggregation engine in wdi/periods.py.
+
+Usage (from the repo root):
+    python benchmarks/period_metrics.py --countries 260 --first 1960 --last 2024
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from wdi.periods import METRIC_COLS, period_labels, period_metrics  # noqa: E402
+
+
+# -------------------------
+# Legacy implementation (Buoi_2/main.py before the vectorised engine)
+# -------------------------
+def _safe_icor(i_y_pct, g_pct):
+    if pd.isna(i_y_pct) or pd.isna(g_pct):
+        return np.nan
+    if abs(g_pct) < 1e-6:
+        return np.nan
+    return (i_y_pct / 100.0) / (g_pct / 100.0)
+
+
+def compute_period_metrics(group):
+    gM = group["GDP_growth"].mean(skipna=True)
+    latest_idx = group["Year"].idxmax()
+    gT = group.loc[latest_idx, "GDP_growth"]
+    IyT = group.loc[latest_idx, "GCF_percent"]
+    deltaI = group["Delta_GCF_pct"].sum(skipna=True)
+    deltaY = group["Delta_GDP_growth"].sum(skipna=True)
+    icor_incremental = np.nan
+    if pd.notna(deltaI) and pd.notna(deltaY) and abs(deltaY) > 1e-6:
+        icor_incremental = (deltaI / 100.0) / (deltaY / 100.0)
+    return pd.Series({
+        "gM": gM, "gT": gT, "(I/Y)_T": IyT, "gM_minus_gT": gM - gT,
+        "ICOR_ratio": _safe_icor(IyT, gM), "ICOR_incremental": icor_incremental,
+        "n_obs": group["Year"].nunique(),
+    })
+
+
+# -------------------------
+# Synthetic annual panel shaped like df_ann in Buoi_2/main.py
+# -------------------------
+def synthetic_annual(n_countries, first, last, missing=0.1, seed=0):
+    rng = np.random.default_rng(seed)
+    years = np.arange(first, last + 1)
+    n = n_countries * len(years)
+    df = pd.DataFrame({
+        "Country": np.repeat([f"Country {i:03d}" for i in range(n_countries)], len(years)),
+        "Country Code": np.repeat([f"C{i:03d}" for i in range(n_countries)], len(years)),
+        "Year": np.tile(years, n_countries),
+        "GDP_growth": rng.normal(4.0, 3.0, n),
+        "GCF_percent": rng.normal(25.0, 6.0, n),
+    })
+    for col in ("GDP_growth", "GCF_percent"):
+        df.loc[rng.random(n) < missing, col] = np.nan
+    df["Delta_GCF_pct"] = df.groupby("Country")["GCF_percent"].diff()
+    df["Delta_GDP_growth"] = df.groupby("Country")["GDP_growth"].diff()
+    df["Period"] = period_labels(df["Year"], width=5).to_numpy()
+    return df
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    ap.add_argument("--countries", type=int, default=260)
+    ap.add_argument("--first", type=int, default=1960)
+    ap.add_argument("--last", type=int, default=2024)
+    args = ap.parse_args()
+
+    df_ann = synthetic_annual(args.countries, args.first, args.last)
+    keys = ["Country", "Country Code", "Period"]
+
+    t0 = time.perf_counter()
+    legacy = df_ann.groupby(keys).apply(compute_period_metrics).reset_index()
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    fast = period_metrics(df_ann, keys=keys)
+    t_fast = time.perf_counter() - t0
+
+    n_groups = len(fast)
+    same = np.allclose(legacy[METRIC_COLS].to_numpy(float), fast[METRIC_COLS].to_numpy(float),
+                       rtol=1e-12, atol=0, equal_nan=True)
+    print(f"panel: {len(df_ann):,} country-years, {n_groups:,} country-periods")
+    print(f"legacy apply : {t_legacy:8.3f} s  ({t_legacy / n_groups * 1e6:8.1f} µs / group)")
+    print(f"vectorised   : {t_fast:8.3f} s  ({t_fast / n_groups * 1e6:8.1f} µs / group)")
+    print(f"speed-up     : {t_legacy / t_fast:8.1f}x   identical metrics: {same}")
+
+
+if __name__ == "__main__":
+    main()
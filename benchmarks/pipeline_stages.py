@@ -0,0 +1,323 @@
+"""
+pipeline_stages.py
+Benchmark: stage timings of Buoi_2/main.py and the Luan_Cuoi_Ky scripts on synthetic WDI exports.
+
+A wide WDI-format file (Country Name, Country Code, Series Name, Series Code,
+'1986 [YR1986]', ... with '..' for missing cells and the usual footer lines)
+is generated at the requested size, written as CSV or XLSX, and run through
+the stages of both pipelines:
+
+    buoi2  load       pd.read_excel / read_csv of the export
+           melt       year columns, '..' -> NaN, melt, Year extraction (sections 1-2)
+           aggregate  annual merge + deltas, all period schemes, annual/rolling ICOR (3-5)
+           forecast   damped ETS for --forecast-countries countries x 2 indicators (8)
+           plot       annual-series figures for --plot-countries countries (6)
+    luan   load       read_wide of the export
+           melt       tidy_long (typed long table) and the Feather store write / read
+           aggregate  Panel cube + growth statistics for every country x series (chuong3.1)
+           forecast   simple ETS for --forecast-series series over 2015-2023 (arima.1)
+           plot       comparison bars for the first 3 series (chuong3.2 / 3.3)
+
+Each stage is a wdi.trace span and records wall time, CPU time (including
+the pool workers), peak resident memory above the level at stage start (pool
+workers are separate processes and not included) and the number of rows it
+produced; --trace saves the spans as a Chrome trace. Every run is appended
+to a JSON history (default .wdi_store/bench_history.json in the repo root)
+and compared with the last run of the same configuration; stages slower by
+more than --threshold are flagged.
+
+Usage (from the repo root):
+    python benchmarks/pipeline_stages.py --countries 260 --series 20 --first 1960 --last 2024
+    python benchmarks/pipeline_stages.py --format xlsx --countries 50 --track buoi2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from wdi.ets_batch import fit_ets_many  # noqa: E402
+from wdi.forecast import batched, damped_ets_batch, fit_record, forecast_many  # noqa: E402
+from wdi.growth import growth_stats  # noqa: E402
+from wdi.icor import icor_table  # noqa: E402
+from wdi.panel import Panel  # noqa: E402
+from wdi.periods import Breakpoints, FixedBuckets, RollingBuckets, period_labels, summarize_periods  # noqa: E402
+from wdi.plotting import FigureSpec, render_all  # noqa: E402
+from wdi.reports import BarSpec, comparison_bars  # noqa: E402
+from wdi.store import read_store, read_wide, tidy_long, write_store  # noqa: E402
+from wdi.trace import Tracer  # noqa: E402
+
+DEFAULT_HISTORY = ROOT / ".wdi_store" / "bench_history.json"
+GDP_NAME, GDP_CODE = "GDP growth (annual %)", "NY.GDP.MKTP.KD.ZG"
+GCF_NAME, GCF_CODE = "Gross capital formation (% of GDP)", "NE.GDI.TOTL.ZS"
+# same schemes as PERIOD_SCHEMES in Buoi_2/main.py
+PERIOD_SCHEMES = [FixedBuckets(5), FixedBuckets(10), RollingBuckets(10, step=1),
+                  Breakpoints((1986, 1991, 1996, 2001, 2008, 2012, 2020), name="doimoi")]
+ESG_YEARS = (2015, 2023)  # span of the Luan_Cuoi_Ky extract
+
+
+# -------------------------
+# Synthetic export
+# -------------------------
+def synthetic_wdi(n_countries, n_series, first, last, missing=0.15, seed=0):
+    """Wide WDI frame as downloaded: values are strings, '..' marks missing
+    cells. The first two series are GDP growth and GCF (% of GDP), which is
+    what Buoi_2 looks for."""
+    rng = np.random.default_rng(seed)
+    years = np.arange(first, last + 1)
+    n_rows = n_countries * n_series
+    names = [GDP_NAME, GCF_NAME] + [f"Synthetic indicator {k}" for k in range(2, n_series)]
+    codes = [GDP_CODE, GCF_CODE] + [f"SYN.IND.{k:03d}" for k in range(2, n_series)]
+    # a level and a trend per row around plausible magnitudes (growth ~4 %, GCF ~25 %)
+    level = np.repeat(np.r_[4.0, 25.0, rng.uniform(1, 100, max(n_series - 2, 0))][:n_series][None, :],
+                      n_countries, axis=0).reshape(-1)
+    trend = rng.normal(0, 0.05, n_rows)[:, None] * (years - first)[None, :]
+    values = level[:, None] * (1 + trend) + rng.normal(0, 0.1, (n_rows, len(years))) * level[:, None]
+    cells = np.char.mod("%.6g", values).astype(object)
+    cells[rng.random(values.shape) < missing] = ".."
+
+    df = pd.DataFrame({
+        "Country Name": np.repeat([f"Country {i:03d}" for i in range(n_countries)], n_series),
+        "Country Code": np.repeat([f"C{i:03d}" for i in range(n_countries)], n_series),
+        "Series Name": np.tile(names, n_countries),
+        "Series Code": np.tile(codes, n_countries),
+    })
+    df = df.join(pd.DataFrame(cells, columns=[f"{y} [YR{y}]" for y in years]))
+    footer = pd.DataFrame({"Country Name": [None, None, "Data from database: World Development Indicators",
+                                            "Last Updated: 01/01/2025"]})
+    return pd.concat([df, footer], ignore_index=True)
+
+
+def write_export(df, directory, fmt):
+    path = Path(directory) / f"synthetic_wdi.{fmt}"
+    if fmt == "xlsx":
+        df.to_excel(path, sheet_name="Data", index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+# -------------------------
+# Measurement (wdi/trace.py spans)
+# -------------------------
+def run_stages(tracer, track, stages):
+    """Run (name, func) pairs in order as spans of `tracer`, each func taking
+    the previous result; returns the result rows {track, stage, seconds, peak_mb, rows}."""
+    rows, result = [], None
+    for name, func in stages:
+        with tracer.span(f"{track} {name}", cat=track) as sp:
+            result, sp.rows = func(result)
+        rec = sp.record()
+        rows.append({"track": track, "stage": name, "seconds": round(rec["wall_s"], 4),
+                     "cpu_s": round(rec["cpu_s"] + rec["child_cpu_s"], 4),
+                     "peak_mb": round(rec["peak_delta_mb"], 1), "rows": int(sp.rows)})
+        print(f"  {track:<6} {name:<10} {rec['wall_s']:9.3f} s  {rec['peak_delta_mb']:8.1f} MB  {sp.rows:>12,} rows")
+    return rows
+
+
+# -------------------------
+# Buoi_2/main.py
+# -------------------------
+def buoi2_stages(src, args, tmp):
+    def load(_):
+        df_raw = read_wide(src)
+        return df_raw, len(df_raw)
+
+    def melt(df_raw):
+        year_cols = [c for c in df_raw.columns if "[YR" in str(c)]
+        meta_cols = [c for c in df_raw.columns if c not in year_cols]
+        df = df_raw[meta_cols + year_cols].replace("..", np.nan)
+        df_long = df.melt(id_vars=meta_cols, value_vars=year_cols, var_name="Year_raw", value_name="Value")
+        df_long = df_long.dropna(subset=["Series Name"])
+        df_long["Year"] = df_long["Year_raw"].astype(str).str.extract(r"(\d{4})").astype(float).astype(int)
+        df_long["Value"] = pd.to_numeric(df_long["Value"], errors="coerce")
+        return df_long, len(df_long)
+
+    def aggregate(df_long):
+        cols = ["Country", "Country Code", "Year"]
+        parts = []
+        for pattern, value in (("GDP growth", "GDP_growth"), ("Gross capital formation", "GCF_percent")):
+            part = df_long[df_long["Series Name"].str.contains(pattern, case=False, na=False)]
+            parts.append(part.rename(columns={"Country Name": "Country", "Value": value})[cols + [value]])
+        df_ann = pd.merge(*parts, on=cols, how="outer", validate="1:1").sort_values(["Country", "Year"])
+        df_ann = df_ann.reset_index(drop=True)
+        df_ann["Delta_GCF_pct"] = df_ann.groupby("Country")["GCF_percent"].diff()
+        df_ann["Delta_GDP_growth"] = df_ann.groupby("Country")["GDP_growth"].diff()
+        df_ann["Period"] = period_labels(df_ann["Year"], width=5).to_numpy()
+        summaries = summarize_periods(df_ann, PERIOD_SCHEMES, keys=["Country", "Country Code"])
+        gdp = df_ann.pivot(index="Year", columns="Country", values="GDP_growth")
+        gcf = df_ann.pivot(index="Year", columns="Country", values="GCF_percent")
+        icor = [icor_table(gdp, gcf, window=w) for w in (1, 5, 10)]
+        return df_ann, sum(len(s) for s in summaries.values()) + sum(len(t) for t in icor)
+
+    def forecast(df_ann):
+        inputs = []
+        for _, s_ann in list(df_ann.groupby("Country", sort=True))[:args.forecast_countries]:
+            s_ann = s_ann.set_index("Year")
+            inputs += [s_ann["GDP_growth"].astype(float), s_ann["GCF_percent"].astype(float)]
+        forecast_many(inputs, 5, model=damped_ets_batch, workers=args.workers, cache=None)
+        return df_ann, len(inputs)
+
+    def plot(df_ann):
+        figures = []
+        for c, df_c in list(df_ann.groupby("Country", sort=True))[:args.plot_countries]:
+            fig = FigureSpec(Path(tmp) / f"{c}_annual_series.png", figsize=(10, 6))
+            fig.plot(df_c["Year"], df_c["GDP_growth"], marker="o", label="GDP growth (%)")
+            fig.plot(df_c["Year"], df_c["GCF_percent"], marker="s", label="GCF (% GDP)")
+            fig.set_title(f"{c} — Annual GDP growth & GCF")
+            fig.legend()
+            fig.tight_layout()
+            figures.append(fig)
+        render_all(figures, manifest=Path(tmp) / "plot_manifest.json", workers=args.workers, force=True)
+        return None, len(figures)
+
+    return [("load", load), ("melt", melt), ("aggregate", aggregate), ("forecast", forecast), ("plot", plot)]
+
+
+# -------------------------
+# Luan_Cuoi_Ky scripts
+# -------------------------
+@batched
+def simple_ets(values_list, horizon):
+    """Forecasts of arima.1.py forecast_series (method='ETS'), fitted together."""
+    return [None if fit is None else fit_record(fit, horizon) for fit in fit_ets_many(values_list)]
+
+
+def luan_stages(src, args, tmp):
+    store = Path(tmp) / "long.feather"
+
+    def load(_):
+        df_wide = read_wide(src)
+        return df_wide, len(df_wide)
+
+    def melt(df_wide):
+        write_store(tidy_long(df_wide), store)
+        df_long = read_store(store)
+        return df_long, len(df_long)
+
+    def aggregate(df_long):
+        stats = growth_stats(Panel.from_long(df_long))
+        return df_long, len(stats)
+
+    def forecast(df_long):
+        esg = df_long[df_long["Year"].between(*ESG_YEARS)].dropna(subset=["Value"])
+        inputs = [g.set_index("Year")["Value"].astype(float)
+                  for _, g in esg.groupby(["Country Code", "Series Code"], observed=True, sort=True)
+                  if len(g) >= 5][:args.forecast_series]
+        forecast_many(inputs, 5, model=simple_ets, workers=args.workers, cache=None)
+        return df_long, len(inputs)
+
+    def plot(df_long):
+        codes = list(df_long["Series Code"].cat.categories[:3])
+        specs = [BarSpec(code, code, "Value", Path(tmp) / f"bar_{code}.png") for code in codes]
+        esg = df_long[df_long["Country Code"].isin(df_long["Country Code"].cat.categories[:6])]
+        with contextlib.redirect_stdout(io.StringIO()):  # comparison_bars prints each table
+            figures = comparison_bars(esg, specs, highlight="Country 000")
+        render_all(figures, manifest=Path(tmp) / "plot_manifest.json", workers=args.workers, force=True)
+        return None, len(figures)
+
+    return [("load", load), ("melt", melt), ("aggregate", aggregate), ("forecast", forecast), ("plot", plot)]
+
+
+# -------------------------
+# History
+# -------------------------
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_with_history(history, run, threshold):
+    """Print each stage against the last run with the same config; returns the regressions."""
+    previous = [h for h in history if h["config"] == run["config"]]
+    if not previous:
+        print("\nNo earlier run with this configuration in the history.")
+        return []
+    last = {(s["track"], s["stage"]): s for s in previous[-1]["stages"]}
+    print(f"\nCompared with {previous[-1]['timestamp']} (rev {previous[-1]['revision']}):")
+    regressions = []
+    for s in run["stages"]:
+        old = last.get((s["track"], s["stage"]))
+        if old is None or old["seconds"] <= 0:
+            continue
+        change = s["seconds"] / old["seconds"] - 1
+        flag = "  <-- slower" if change > threshold else ""
+        if flag:
+            regressions.append(s)
+        print(f"  {s['track']:<6} {s['stage']:<10} {old['seconds']:9.3f} s -> {s['seconds']:9.3f} s  "
+              f"{change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    ap.add_argument("--countries", type=int, default=260)
+    ap.add_argument("--series", type=int, default=20, help="series per country (>= 2)")
+    ap.add_argument("--first", type=int, default=1960)
+    ap.add_argument("--last", type=int, default=2024)
+    ap.add_argument("--missing", type=float, default=0.15, help="share of '..' cells")
+    ap.add_argument("--format", choices=("csv", "xlsx"), default="csv")
+    ap.add_argument("--track", choices=("buoi2", "luan", "all"), default="all")
+    ap.add_argument("--forecast-countries", type=int, default=20)
+    ap.add_argument("--forecast-series", type=int, default=100)
+    ap.add_argument("--plot-countries", type=int, default=10)
+    ap.add_argument("--workers", type=int, default=None, help="process pool size (default: $WDI_WORKERS / all CPUs)")
+    ap.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    ap.add_argument("--threshold", type=float, default=0.2, help="flag stages slower than this fraction")
+    ap.add_argument("--trace", type=Path, default=None, help="also write the stage spans as a Chrome trace")
+    args = ap.parse_args()
+    if args.series < 2:
+        ap.error("--series must be at least 2 (GDP growth and GCF)")
+
+    import matplotlib.figure  # noqa: F401  (import cost kept out of the first plot stage)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        src = write_export(synthetic_wdi(args.countries, args.series, args.first, args.last, args.missing),
+                           tmp, args.format)
+        print(f"export: {args.countries} countries x {args.series} series x {args.first}-{args.last}, "
+              f"{src.stat().st_size / 2**20:.1f} MB {args.format} ({time.perf_counter() - t0:.1f} s to generate)")
+
+        tracer = Tracer("benchmark")
+        stages = []
+        if args.track in ("buoi2", "all"):
+            stages += run_stages(tracer, "buoi2", buoi2_stages(src, args, tmp))
+        if args.track in ("luan", "all"):
+            stages += run_stages(tracer, "luan", luan_stages(src, args, tmp))
+        if args.trace is not None:
+            print("trace:", tracer.export(args.trace))
+
+    config = {k: getattr(args, k) for k in ("countries", "series", "first", "last", "missing", "format",
+                                            "forecast_countries", "forecast_series", "plot_countries", "workers")}
+    run = {"timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"), "revision": _git_revision(),
+           "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+           "cpus": os.cpu_count(), "config": config, "stages": stages}
+
+    history = json.loads(args.history.read_text(encoding="utf-8")) if args.history.exists() else []
+    regressions = compare_with_history(history, run, args.threshold)
+    history.append(run)
+    args.history.parent.mkdir(parents=True, exist_ok=True)
+    args.history.write_text(json.dumps(history, indent=1), encoding="utf-8")
+    print(f"\nHistory: {args.history} ({len(history)} runs)")
+    if regressions:
+        print(f"{len(regressions)} stage(s) slower than +{args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
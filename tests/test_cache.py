@@ -0,0 +1,34 @@
+"""Size-bounded LRU eviction of wdi.cache.DiskCache."""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from wdi.cache import LOW_WATER, DiskCache
+
+ENTRY = bytes(1000)
+
+
+def _size(cache):
+    return sum(p.stat().st_size for p in cache.directory.glob("*/*.pkl"))
+
+
+def test_bounded_and_counted_in_memory(tmp_path):
+    cache = DiskCache("t", directory=tmp_path, max_bytes=10_000)
+    for i in range(50):
+        cache.put(f"{i:04x}" * 16, ENTRY)
+        assert cache._size == _size(cache) <= 10_000
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = DiskCache("t", directory=tmp_path, max_bytes=10_000)
+    keys = [f"{i:04x}" * 16 for i in range(9)]
+    for i, key in enumerate(keys):
+        cache.put(key, ENTRY)
+        os.utime(cache._path(key), ns=(i * 10**9, i * 10**9))
+    assert cache.get(keys[0]) == ENTRY  # now the most recently used
+    cache.put("ffff" * 16, ENTRY)       # over budget: back down to LOW_WATER
+    assert _size(cache) <= LOW_WATER * 10_000
+    assert cache.get(keys[0]) == ENTRY
+    assert cache.get(keys[1]) is None
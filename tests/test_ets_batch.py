@@ -0,0 +1,64 @@
+"""Parity of wdi.ets_batch with statsmodels' ExponentialSmoothing."""
+
+import sys
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from wdi.ets_batch import fit_ets, fit_ets_many
+
+SSE_RTOL = 1e-6        # batch SSE may not exceed statsmodels' by more than this
+FORECAST_TOL = 1e-3    # forecast difference at the same optimum, in units of the series' std
+HORIZON = 5
+MODELS = [(None, False), ("add", False), ("add", True)]
+
+
+def _panel(n_obs, n_series=60, seed=0):
+    rng = np.random.default_rng(seed)
+    walk = np.cumsum(rng.normal(0.3, 1.0, (n_series, n_obs)), axis=1)
+    return 20 + walk + rng.normal(0, 0.5, (n_series, n_obs))
+
+
+def _statsmodels(y, trend, damped):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        fit = ExponentialSmoothing(pd.Series(y), trend=trend, damped_trend=damped,
+                                   initialization_method="estimated").fit()
+    return fit.sse, np.asarray(fit.forecast(HORIZON)), fit.params
+
+
+@pytest.mark.parametrize("n_obs", [9, 25, 39])
+@pytest.mark.parametrize("trend,damped", MODELS)
+def test_matches_statsmodels(n_obs, trend, damped):
+    Y = _panel(n_obs, seed=n_obs)
+    fits = fit_ets(Y, trend=trend, damped=damped)
+    forecasts = fits.forecast(HORIZON)
+    for i, y in enumerate(Y):
+        sse, forecast, params = _statsmodels(y, trend, damped)
+        # never a worse optimum than statsmodels ...
+        assert fits.sse[i] <= sse * (1 + SSE_RTOL), (i, fits.sse[i], sse)
+        # ... and the same forecasts wherever both reach the same one
+        if fits.sse[i] >= sse * (1 - SSE_RTOL):
+            np.testing.assert_allclose(forecasts[i], forecast, rtol=0, atol=FORECAST_TOL * y.std())
+            assert abs(fits.alpha[i] - params["smoothing_level"]) < 1e-2
+
+
+@pytest.mark.parametrize("trend,damped", MODELS)
+def test_unequal_lengths_in_one_batch(trend, damped):
+    Y = _panel(30, n_series=12, seed=1)
+    values = [y[i:] for i, y in enumerate(Y)]  # lengths 30 .. 19
+    batch = fit_ets_many(values, trend=trend, damped=damped)
+    for v, fit in zip(values, batch):
+        alone = fit_ets(v[None, :], trend=trend, damped=damped)
+        np.testing.assert_allclose(fit.forecast(HORIZON), alone.forecast(HORIZON)[0], rtol=1e-9, atol=1e-9)
+        assert len(fit.resid) == len(v)
+
+
+def test_too_short_series_are_skipped():
+    fits = fit_ets_many([[1.0, 2.0], [1.0, 2.0, 4.0, 3.0, 5.0, 6.0]], trend="add", damped=True)
+    assert fits[0] is None and fits[1] is not None
@@ -0,0 +1,69 @@
+"""Per-task timeouts of wdi.parallel.run_parallel."""
+
+import signal
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from wdi import parallel
+from wdi.parallel import TaskTimeout, run_parallel
+
+pytestmark = pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="needs SIGALRM")
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def _sleep_ignoring_alarm(seconds):
+    signal.pthread_sigmask(signal.SIG_BLOCK, [signal.SIGALRM])  # as if stuck in C code
+    time.sleep(seconds)
+    return seconds
+
+
+def _failed(seconds):
+    return -1
+
+
+def _swallowing(seconds):
+    try:
+        time.sleep(seconds)
+    except Exception:
+        pass
+    return seconds
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_deadline_counts_from_task_start(workers):
+    # a 0.6 s task queued behind two 3 s ones must not inherit their time,
+    # and the timed-out workers must be free for it straight away
+    t0 = time.monotonic()
+    out = run_parallel(_sleep, [(3,), (3,), (0.6,)], workers=workers, timeout=1, fallback=_failed)
+    assert out == [-1, -1, 0.6]
+    assert time.monotonic() - t0 < 3
+
+
+def test_timeout_without_fallback_raises():
+    with pytest.raises(TaskTimeout):
+        run_parallel(_sleep, [(2,)], workers=1, timeout=0.3)
+
+
+def test_broad_except_in_task_cannot_swallow_timeout():
+    assert run_parallel(_swallowing, [(2,), (0.1,)], workers=2, timeout=0.3, fallback=_failed) == [-1, 0.1]
+
+
+def test_worker_ignoring_the_alarm_is_replaced(monkeypatch):
+    monkeypatch.setattr(parallel, "GRACE", 0.3)
+    t0 = time.monotonic()
+    out = run_parallel(_sleep_ignoring_alarm, [(30,), (0.2,), (0.2,), (0.2,)], workers=2, timeout=0.5,
+                       fallback=_failed)
+    assert out == [-1, 0.2, 0.2, 0.2]
+    assert time.monotonic() - t0 < 5
+
+
+def test_no_timeout_keeps_order():
+    assert run_parallel(_sleep, [(0.3,), (0.0,), (0.1,)], workers=3) == [0.3, 0.0, 0.1]
@@ -0,0 +1,50 @@
+"""wdi.store: exports reproduce the source numbers; file_lock keeps concurrent
+Artefacts records."""
+
+import multiprocessing as mp
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from wdi.refresh import Artefacts
+from wdi.store import load_long, source_values
+
+CSV = """Country Name,Country Code,Series Name,Series Code,2015 [YR2015],2016 [YR2016]
+Viet Nam,VNM,GDP growth,NY.GDP.MKTP.KD.ZG,679.445923805237,..
+Thailand,THA,GDP growth,NY.GDP.MKTP.KD.ZG,36.6666679382324,3.1
+"""
+
+
+def test_source_values_are_float64_source_numbers(tmp_path):
+    src = tmp_path / "data.csv"
+    src.write_text(CSV, encoding="utf-8")
+    df_long = load_long(src)
+    assert df_long["Value"].dtype == np.float32
+    rows = df_long.iloc[::-1]  # any row order / subset
+    values = source_values(src, rows)
+    expected = {("VNM", 2015): 679.445923805237, ("VNM", 2016): np.nan,
+                ("THA", 2015): 36.6666679382324, ("THA", 2016): 3.1}
+    got = dict(zip(zip(rows["Country Code"].astype(str), rows["Year"].astype(int)), values))
+    assert got.keys() == expected.keys()
+    for key, value in expected.items():
+        assert got[key] == value or (np.isnan(value) and np.isnan(got[key]))
+    assert "679.445923805237" in rows.assign(Value=values).to_csv(index=False)
+
+
+def _record_many(path, worker, n):
+    for i in range(n):
+        Artefacts(path).record(f"{worker}-{i}", "digest")
+
+
+def test_concurrent_records_are_not_lost(tmp_path):
+    path = tmp_path / "data.csv.artefacts.json"
+    ctx = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else mp.get_context()
+    procs = [ctx.Process(target=_record_many, args=(path, w, 20)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert len(Artefacts(path).entries) == 80
+    assert not Path(f"{path}.lock").exists()
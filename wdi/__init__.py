@@ -0,0 +1,5 @@
+"""
+wdi
+Shared helpers for the World Development Indicators (WDI) analysis scripts
+(Buoi_2, Buoi_4, Luan_Cuoi_Ky).
+"""
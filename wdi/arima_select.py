@@ -0,0 +1,103 @@
+"""
+arima_select.py
+ARIMA(p, d, q) order search by AIC/BIC.
+
+The grid is pruned before anything is fitted:
+- d comes from the ADF / KPSS p-values already computed by check_stationarity
+  (both say stationary -> d = 0, both say unit root -> d in {1, 2},
+  the tests disagree -> d in {0, 1});
+- orders that leave fewer than MIN_DOF residual degrees of freedom are dropped
+  (annual WDI series are short).
+The remaining candidates are fitted in a process pool, and every fitted model is
+cached under (series digest, order), so re-runs only fit new orders / changed
+series.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+
+from wdi.cache import DiskCache, series_digest
+from wdi.parallel import run_parallel
+
+ALPHA = 0.05
+MIN_DOF = 3
+P_MAX = 3
+Q_MAX = 3
+
+
+def candidate_d(adf_p=None, kpss_p=None, d_max=2):
+    """Differencing orders worth trying given the stationarity tests."""
+    if adf_p is None or kpss_p is None or np.isnan(adf_p) or np.isnan(kpss_p):
+        return list(range(d_max + 1))
+    adf_stationary = adf_p < ALPHA    # ADF rejects the unit root
+    kpss_stationary = kpss_p >= ALPHA  # KPSS does not reject stationarity
+    if adf_stationary and kpss_stationary:
+        return [0]
+    if not adf_stationary and not kpss_stationary:
+        return [d for d in (1, 2) if d <= d_max]
+    return [0, 1]
+
+
+def candidate_orders(n_obs, d_values, p_max=P_MAX, q_max=Q_MAX):
+    orders = []
+    for d in d_values:
+        for p in range(p_max + 1):
+            for q in range(q_max + 1):
+                if n_obs - d - (p + q + 1) >= MIN_DOF:
+                    orders.append((p, d, q))
+    return orders
+
+
+def _fit_order(values, order):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        fit = ARIMA(pd.Series(values), order=order).fit()
+    return {"aic": float(fit.aic), "bic": float(fit.bic), "llf": float(fit.llf), "fit": fit}
+
+
+def _failed_fit(values, order):
+    return {"aic": np.inf, "bic": np.inf, "llf": np.nan, "fit": None}
+
+
+def select_order(series, adf_p=None, kpss_p=None, criterion="aic", p_max=P_MAX, q_max=Q_MAX,
+                 d_max=2, workers=None, cache=None):
+    """Best ARIMA order for `series` (NaNs dropped).
+
+    Returns (best_fit, table): the fitted statsmodels results of the winning
+    order and a DataFrame with order, aic, bic, llf and rank for every
+    candidate, best first. `cache` is a DiskCache (None = the default
+    "arima" cache; pass False to disable).
+    """
+    values = series.dropna().to_numpy(dtype=float)
+    orders = candidate_orders(len(values), candidate_d(adf_p, kpss_p, d_max), p_max, q_max)
+    if not orders:
+        raise ValueError(f"Không đủ quan sát ({len(values)}) để ước lượng ARIMA.")
+    if cache is None:
+        cache = DiskCache("arima")
+    digest = series_digest(values)
+
+    results = {}
+    todo = []
+    for order in orders:
+        hit = cache.get(f"{digest}-{order}") if cache else None
+        if hit is not None:
+            results[order] = hit
+        else:
+            todo.append(order)
+    fitted = run_parallel(_fit_order, [(values, o) for o in todo], workers=workers, fallback=_failed_fit)
+    for order, res in zip(todo, fitted):
+        results[order] = res
+        if cache and res["fit"] is not None:
+            cache.put(f"{digest}-{order}", res)
+
+    table = pd.DataFrame([{"order": o, "aic": r["aic"], "bic": r["bic"], "llf": r["llf"]}
+                          for o, r in results.items()])
+    table = table.sort_values([criterion, "order"], kind="mergesort").reset_index(drop=True)
+    table["rank"] = np.arange(1, len(table) + 1)
+    best = results[table.loc[0, "order"]]["fit"]
+    if best is None:
+        raise RuntimeError("Không ước lượng được mô hình ARIMA nào trong lưới ứng viên.")
+    return best, table
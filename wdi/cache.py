@@ -0,0 +1,109 @@
+"""
+cache.py
+Content-addressed result cache for model fits and tests.
+
+Keys are sha256 digests of the cleaned series values plus whatever else the
+result depends on (method, order, horizon, ...); values are pickled into
+`<directory>/<key[:2]>/<key>.pkl`, so a re-run after a WDI refresh only recomputes
+series whose numbers actually changed.
+
+With `max_bytes` set the cache is size-bounded LRU: a hit refreshes the entry's
+mtime, and a write that takes the directory past the budget deletes the least
+recently used entries down to LOW_WATER of it. The directory size is counted
+once and then kept up to date in memory, so it is only scanned again when an
+eviction is due, not on every write.
+
+Without an explicit directory a cache lives in `.wdi_store/cache` next to the
+running script (wdi.store likewise keeps its store next to the source data),
+so a script shares one warm cache whichever directory it is started from.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+
+CACHE_SUBDIR = Path(".wdi_store") / "cache"
+LOW_WATER = 0.9  # an eviction frees space down to this fraction of max_bytes
+
+
+def default_dir():
+    """CACHE_SUBDIR next to the running script; under the current directory
+    when there is no script file (interactive sessions, python -c)."""
+    main = getattr(sys.modules.get("__main__"), "__file__", None)
+    base = Path(main).resolve().parent if main else Path.cwd()
+    return base / CACHE_SUBDIR
+
+
+def series_digest(values, *parts):
+    """sha256 of the float64 values followed by the repr of each extra key part."""
+    h = hashlib.sha256(np.ascontiguousarray(np.asarray(values, dtype=np.float64)).tobytes())
+    for part in parts:
+        h.update(b"\0" + repr(part).encode("utf-8"))
+    return h.hexdigest()
+
+
+class DiskCache:
+    """Pickle-per-key cache under `directory` (default_dir()/<namespace> by
+    default), LRU-evicted down to `max_bytes` when given."""
+
+    def __init__(self, namespace, directory=None, max_bytes=None):
+        self.directory = Path(directory) if directory is not None else default_dir() / namespace
+        self.max_bytes = max_bytes
+        self._size = None  # bytes in the directory, counted on the first bounded put()
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.pkl"
+
+    def get(self, key, default=None):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return default
+        if self.max_bytes is not None:
+            os.utime(path)  # mark as recently used
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        if self.max_bytes is not None and self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+        if self.max_bytes is not None:
+            self._size += path.stat().st_size - replaced
+            if self._size > self.max_bytes:
+                self._size = self.evict(int(self.max_bytes * LOW_WATER))
+
+    def _entries(self):
+        """(mtime_ns, size, path) of every cached entry."""
+        for path in self.directory.glob("*/*.pkl"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            yield st.st_mtime_ns, st.st_size, path
+
+    def evict(self, max_bytes):
+        """Delete least recently used entries until the cache holds <= max_bytes;
+        returns the bytes left."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        return total
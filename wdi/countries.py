@@ -0,0 +1,230 @@
+"""
+countries.py
+Country-name normalisation and alias index.
+
+The same economy shows up as 'Viet Nam' (WDI), 'Vietnam' (hand-written lists,
+Natural Earth ADMIN), 'VN' / 'VNM' (ISO codes) ... and a plain string filter
+silently drops whichever spelling it does not match. AliasIndex maps every known
+spelling to one canonical key, the World Bank country code (ISO3 for
+countries, WB codes such as WLD / EAS for aggregates):
+
+- names are normalised before lookup: accents stripped, case folded, '&' read
+  as 'and', punctuation and spaces removed ('Korea, Rep.' -> 'korearep',
+  'Viet Nam' and 'Vietnam' -> 'vietnam');
+- the built-in table below covers the economies used in the course scripts and
+  the names that differ between WDI, ISO and Natural Earth; every WDI frame
+  loaded through `with_country_key` also teaches the index its own
+  (Country Code, Country Name) pairs;
+- `with_country_key` adds a categorical 'Country Key' column, so filters and
+  joins compare small integer codes instead of strings;
+- explicit lookups (`key`, `keys_for`) raise on unknown names instead of
+  returning nothing.
+"""
+
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+KEY_COL = "Country Key"
+
+# ISO3/WB code | ISO2 | WDI name | other spellings (WB, ISO, Natural Earth ADMIN, common)
+_BUILTIN = """
+VNM|VN|Viet Nam|Vietnam;Socialist Republic of Viet Nam;Việt Nam
+THA|TH|Thailand|Kingdom of Thailand
+MYS|MY|Malaysia|
+IDN|ID|Indonesia|Republic of Indonesia
+PHL|PH|Philippines|The Philippines
+SGP|SG|Singapore|Republic of Singapore
+BRN|BN|Brunei Darussalam|Brunei
+KHM|KH|Cambodia|Kampuchea
+LAO|LA|Lao PDR|Laos;Lao People's Democratic Republic
+MMR|MM|Myanmar|Burma
+TLS|TL|Timor-Leste|East Timor
+CHN|CN|China|People's Republic of China;PRC
+JPN|JP|Japan|
+KOR|KR|Korea, Rep.|South Korea;Republic of Korea
+PRK|KP|Korea, Dem. People's Rep.|North Korea;Democratic People's Republic of Korea
+HKG|HK|Hong Kong SAR, China|Hong Kong;Hong Kong S.A.R.
+MAC|MO|Macao SAR, China|Macao;Macau;Macao S.A.R
+MNG|MN|Mongolia|
+IND|IN|India|
+PAK|PK|Pakistan|
+BGD|BD|Bangladesh|
+LKA|LK|Sri Lanka|
+NPL|NP|Nepal|
+AUS|AU|Australia|
+NZL|NZ|New Zealand|
+USA|US|United States|United States of America;US;U.S.
+CAN|CA|Canada|
+MEX|MX|Mexico|
+BRA|BR|Brazil|
+ARG|AR|Argentina|
+CHL|CL|Chile|
+COL|CO|Colombia|
+PER|PE|Peru|
+VEN|VE|Venezuela, RB|Venezuela;Bolivarian Republic of Venezuela
+BOL|BO|Bolivia|Plurinational State of Bolivia
+GBR|GB|United Kingdom|UK;Great Britain;Britain
+FRA|FR|France|
+DEU|DE|Germany|
+ITA|IT|Italy|
+ESP|ES|Spain|
+NLD|NL|Netherlands|The Netherlands;Holland
+CHE|CH|Switzerland|
+SWE|SE|Sweden|
+NOR|NO|Norway|
+POL|PL|Poland|
+CZE|CZ|Czechia|Czech Republic
+SVK|SK|Slovak Republic|Slovakia
+RUS|RU|Russian Federation|Russia
+TUR|TR|Turkiye|Turkey;Türkiye
+IRN|IR|Iran, Islamic Rep.|Iran
+EGY|EG|Egypt, Arab Rep.|Egypt
+SYR|SY|Syrian Arab Republic|Syria
+YEM|YE|Yemen, Rep.|Yemen
+SAU|SA|Saudi Arabia|
+ZAF|ZA|South Africa|
+NGA|NG|Nigeria|
+KEN|KE|Kenya|
+ETH|ET|Ethiopia|
+TZA|TZ|Tanzania|United Republic of Tanzania
+COD|CD|Congo, Dem. Rep.|Democratic Republic of the Congo;DR Congo;DRC
+COG|CG|Congo, Rep.|Republic of the Congo;Republic of Congo
+CIV|CI|Cote d'Ivoire|Ivory Coast;Côte d'Ivoire
+GMB|GM|Gambia, The|Gambia
+BHS|BS|Bahamas, The|Bahamas
+SWZ|SZ|Eswatini|eSwatini;Swaziland
+CPV|CV|Cabo Verde|Cape Verde
+KGZ|KG|Kyrgyz Republic|Kyrgyzstan
+MDA|MD|Moldova|Republic of Moldova
+MKD|MK|North Macedonia|Macedonia
+SRB|RS|Serbia|Republic of Serbia
+XKX|XK|Kosovo|
+FSM|FM|Micronesia, Fed. Sts.|Micronesia;Federated States of Micronesia
+PSE|PS|West Bank and Gaza|Palestine
+LCA|LC|St. Lucia|Saint Lucia
+VCT|VC|St. Vincent and the Grenadines|Saint Vincent and the Grenadines
+KNA|KN|St. Kitts and Nevis|Saint Kitts and Nevis
+STP|ST|Sao Tome and Principe|São Tomé and Principe
+WLD||World|
+EAS||East Asia & Pacific|East Asia and Pacific
+EAP||East Asia & Pacific (excluding high income)|
+TEA||East Asia & Pacific (IDA & IBRD countries)|
+"""
+
+
+def normalize_name(value):
+    """Lookup form of a name or code: 'Korea, Rep.' -> 'korearep'."""
+    text = unicodedata.normalize("NFKD", str(value))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.replace("đ", "d").replace("Đ", "D").replace("&", " and ")
+    text = re.sub(r"[^0-9a-z]+", " ", text.casefold()).strip()
+    if text.startswith("the "):
+        text = text[4:]
+    return text.replace(" ", "")
+
+
+class AliasIndex:
+    """Names / ISO2 / ISO3 / WB codes -> canonical key (position in `keys`)."""
+
+    def __init__(self):
+        self.keys = []
+        self.names = []
+        self._pos = {}
+        self._alias = {}
+
+    def add(self, key, name=None, aliases=()):
+        """Register `key` with its display name and aliases (key and name are
+        aliases too). An alias already bound to another key raises ValueError."""
+        key = str(key).upper()
+        if key not in self._pos:
+            self._pos[key] = len(self.keys)
+            self.keys.append(key)
+            self.names.append(name or key)
+        pos = self._pos[key]
+        for alias in (key, name, *aliases):
+            if alias is None or alias == "" or (isinstance(alias, float) and np.isnan(alias)):
+                continue
+            norm = normalize_name(alias)
+            if not norm:
+                continue
+            other = self._alias.setdefault(norm, pos)
+            if other != pos:
+                raise ValueError(f"Tên '{alias}' đã gắn với {self.keys[other]}, không thể gắn thêm với {key}")
+        return pos
+
+    def learn(self, df, name_col="Country Name", code_col="Country Code"):
+        """Add the (code, name) pairs of a WDI frame; footer rows without a code are skipped."""
+        pairs = df[[code_col, name_col]].dropna(subset=[code_col]).drop_duplicates()
+        for code, name in pairs.itertuples(index=False):
+            self.add(code, None if pd.isna(name) else str(name), (name,))
+        return self
+
+    def get(self, value, default=None):
+        pos = self._alias.get(normalize_name(value))
+        return default if pos is None else self.keys[pos]
+
+    def key(self, value):
+        key = self.get(value)
+        if key is None:
+            raise KeyError(f"Không nhận diện được quốc gia '{value}'")
+        return key
+
+    def keys_for(self, values):
+        """Canonical keys for a list of names/codes; all unknown names are reported at once."""
+        keys = [self.get(v) for v in values]
+        unknown = [v for v, k in zip(values, keys) if k is None]
+        if unknown:
+            raise KeyError(f"Không nhận diện được quốc gia: {unknown}")
+        return keys
+
+    def name(self, key):
+        return self.names[self._pos[str(key).upper()]]
+
+    def codes(self, values, strict=False):
+        """Integer key codes for a column of names/codes (-1 = unknown). Only the
+        distinct values are normalised."""
+        uniques_codes, uniques = pd.factorize(pd.Series(values).astype(object), use_na_sentinel=True)
+        mapped = np.array([self._alias.get(normalize_name(u), -1) for u in uniques], dtype=np.int32)
+        if strict and (mapped < 0).any():
+            raise KeyError(f"Không nhận diện được quốc gia: {list(uniques[mapped < 0])}")
+        out = np.full(len(uniques_codes), -1, dtype=np.int32)
+        ok = uniques_codes >= 0
+        out[ok] = mapped[uniques_codes[ok]]
+        return out
+
+    def categorical(self, values, strict=False):
+        return pd.Categorical.from_codes(self.codes(values, strict=strict), categories=list(self.keys))
+
+    def find(self, value, labels):
+        """The entry of `labels` that denotes the same country as `value` (None if absent)."""
+        key = self.key(value)
+        for label in labels:
+            if self.get(label) == key:
+                return label
+        return None
+
+
+def _builtin_index():
+    index = AliasIndex()
+    for line in _BUILTIN.strip().splitlines():
+        iso3, iso2, name, aliases = line.split("|")
+        index.add(iso3, name, [iso2] + [a for a in aliases.split(";") if a])
+    return index
+
+
+COUNTRIES = _builtin_index()
+
+
+def with_country_key(df, index=None, code_col="Country Code", name_col="Country Name"):
+    """`df` with a categorical KEY_COL column (canonical country key). The
+    frame's own code/name pairs are learned first; rows are keyed by their code
+    when present, else by their name."""
+    index = COUNTRIES if index is None else index
+    index.learn(df, name_col=name_col, code_col=code_col)
+    source = df[code_col].astype(object).where(df[code_col].notna(), df[name_col].astype(object))
+    out = df.copy()
+    out[KEY_COL] = index.categorical(source)
+    return out
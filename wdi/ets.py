@@ -0,0 +1,82 @@
+"""
+ets.py
+Simulation-based prediction intervals for additive exponential smoothing fits.
+
+statsmodels' Holt-Winters results only give point forecasts, so the ETS path in
+arima.1.py used to draw a fake ±10% band. For the additive-error models used
+here (level, optional (damped) additive trend, no seasonality) the h-step
+simulated value is a linear function of the future errors:
+
+    y[T+h] = mean[h] + e[h] + sum_{j=1..h-1} c[j] * e[h-j]
+    c[j]   = alpha * (1 + beta * (phi + phi^2 + ... + phi^j))
+
+so every path and every horizon is one matrix product of an (n_paths, steps)
+error array with a lower-triangular Toeplitz matrix of the c[j] — no Python loop
+per path or per step. Errors are N(0, sigma^2) with sigma from the in-sample
+residuals (degrees-of-freedom corrected, as in statsmodels' own `simulate`), or
+resampled residuals with errors="bootstrap".
+"""
+
+import numpy as np
+import pandas as pd
+
+N_PATHS = 5000
+LEVELS = (0.90, 0.95)
+
+
+def _param(params, name, default):
+    v = params.get(name)
+    if v is None or not np.isfinite(v):
+        return default
+    return float(v)
+
+
+def error_weights(alpha, beta=0.0, phi=1.0, steps=1):
+    """Lower-triangular (steps, steps) matrix W with y_sim = mean + e @ W.T."""
+    j = np.arange(steps)
+    damp = np.cumsum(phi ** j) - 1.0  # phi + ... + phi^j  (0 for j = 0)
+    c = alpha * (1.0 + beta * damp)
+    c[0] = 1.0
+    lag = j[:, None] - j[None, :]
+    return np.where(lag >= 0, c[np.clip(lag, 0, None)], 0.0)
+
+
+def simulate_paths(fit, steps, n_paths=N_PATHS, errors="normal", seed=None):
+    """(n_paths, steps) array of simulated future values for a Holt-Winters fit."""
+    params = dict(fit.params)
+    alpha = _param(params, "smoothing_level", 0.0)
+    # statsmodels' trend smoothing acts on the level change: b' = phi*b + alpha*beta*e
+    beta = _param(params, "smoothing_trend", 0.0)
+    phi = _param(params, "damping_trend", 1.0)
+
+    resid = np.asarray(fit.resid, dtype=float)
+    resid = resid[np.isfinite(resid)]
+    rng = np.random.default_rng(seed)
+    if errors == "bootstrap":
+        e = rng.choice(resid - resid.mean(), size=(n_paths, steps), replace=True)
+    elif errors == "normal":
+        n_params = 2 + 2 * bool(fit.model.has_trend) + bool(fit.model.damped_trend)
+        sigma = np.sqrt(np.sum(resid ** 2) / max(len(resid) - n_params, 1))
+        e = rng.normal(0.0, sigma, size=(n_paths, steps))
+    else:
+        raise ValueError("errors must be 'normal' or 'bootstrap'")
+
+    mean = np.asarray(fit.forecast(steps), dtype=float)
+    return mean + e @ error_weights(alpha, beta, phi, steps).T
+
+
+def prediction_intervals(fit, steps, levels=LEVELS, n_paths=N_PATHS, errors="normal", seed=None):
+    """DataFrame with mean and lower_<pct> / upper_<pct> columns for each level
+    (e.g. lower_90, upper_90), one row per forecast step."""
+    paths = simulate_paths(fit, steps, n_paths=n_paths, errors=errors, seed=seed)
+    qs = []
+    for level in levels:
+        tail = (1.0 - level) / 2.0
+        qs += [tail, 1.0 - tail]
+    bounds = np.quantile(paths, qs, axis=0)  # all levels and horizons at once
+    out = {"mean": np.asarray(fit.forecast(steps), dtype=float)}
+    for i, level in enumerate(levels):
+        pct = int(round(level * 100))
+        out[f"lower_{pct}"] = bounds[2 * i]
+        out[f"upper_{pct}"] = bounds[2 * i + 1]
+    return pd.DataFrame(out)
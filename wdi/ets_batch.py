@@ -0,0 +1,369 @@
+"""
+ets_batch.py
+Simple, Holt and damped-trend exponential smoothing fitted for many series at once.
+
+statsmodels' ExponentialSmoothing(...).fit() costs a few milliseconds per
+series, almost all of it Python overhead around a 9-40 point recursion. Here
+the series are stacked into an (n_series, n_obs) array (shorter ones
+right-aligned behind leading NaNs, which the recursions step over) and
+fitted together, with the same model and objective as statsmodels
+(initialization_method="estimated": minimise the in-sample SSE over the
+smoothing parameters and the initial level / trend):
+
+    yhat[t]  = l[t] + phi * b[t]
+    l[t+1]   = alpha * y[t] + (1 - alpha) * (l[t] + phi * b[t])
+    b[t+1]   = beta * (l[t+1] - l[t]) + (1 - beta) * phi * b[t]
+    forecast = l[n] + (phi + ... + phi^h) * b[n]
+
+with 0 < alpha < 1, 0 <= beta <= alpha and 0.8 <= phi <= 0.995 (statsmodels'
+bounds; phi = 1 without damping, no b for simple smoothing).
+
+For fixed (alpha, beta, phi) the residuals are linear in (l[0], b[0]): one
+recursion driven by y from a zero state and one unit-response recursion per
+initial state give them in closed form (2x2 least squares), so the optimiser
+only searches (alpha, beta / alpha, phi), for every series at once: a
+pattern search over all neighbours of the current point that halves its step
+where none improves and doubles it (up to STEP) after a move. Every
+evaluation is one vectorised recursion over (series x candidates); there is
+no Python loop per series.
+
+The SSE surface of a short series often has several local minima (alpha or
+beta near 0, phi at either bound), and statsmodels' L-BFGS-B only descends
+from the best point of its brute-force grid. The search therefore runs from
+several starts per series: statsmodels' own start, the next best grid points
+and the best point with each parameter at either bound; lanes of one series
+that meet are merged, and the lowest SSE wins. tests/test_ets_batch.py checks
+that the fit is never worse than statsmodels' and that the forecasts agree
+wherever both reach the same minimum; where the batch finds a lower SSE they
+differ. A series whose best lane has not converged after MAX_ITER steps is
+refitted with statsmodels (ETSFits.fallback marks them).
+
+    fits = fit_ets(Y, trend="add", damped=True)   # Y: (n_series, n_obs)
+    fits.forecast(5)                              # (n_series, 5)
+    prediction_intervals(fits[0], 5)              # wdi.ets works on one series of the batch
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+LOWER_BOUND = np.sqrt(np.finfo(float).eps)  # alpha in [LOWER_BOUND, 1 - LOWER_BOUND], as statsmodels
+PHI_BOUNDS = (0.8, 0.995)
+PHI_START = 0.99
+STEP = 0.05  # first pattern-search step (unit-free parameters)
+TOL = 1e-5   # smallest step
+MAX_ITER = 200
+N_STARTS = 2  # brute-force grid points the search starts from
+
+
+def _recursions(Y, M, alpha, beta, phi, n_states):
+    """Residual components for lanes (series x candidates).
+
+    Y, M are (n, T) values (0 where missing) and the 0/1 mask of observed
+    steps; alpha, beta, phi are (n, k). The residual of a lane is
+    ec + E @ x0 with x0 = (l[0], b[0]); ec comes from the recursion driven by y
+    from a zero state, the columns of E from unit initial states with y = 0.
+    Returns the sums C = ec.ec (n, k), T = E'ec (n, k, s) and S = E'E (n, k, s, s).
+    """
+    Y, M = Y[:, :, None], M[:, :, None]
+    ab = alpha * beta
+    zeros = np.zeros(alpha.shape)
+    lc, l1 = zeros, zeros + 1.0
+    C, T1, S11 = zeros, zeros, zeros
+    if n_states == 1:
+        for t in range(Y.shape[1]):
+            m = M[:, t]
+            ec = m * (Y[:, t] - lc)
+            e1 = -m * l1
+            C = C + ec * ec
+            T1 = T1 + e1 * ec
+            S11 = S11 + e1 * e1
+            lc = lc + alpha * ec
+            l1 = l1 + alpha * e1
+        return C, T1[..., None], S11[..., None, None]
+
+    bc, b1, l2, b2 = zeros, zeros, zeros, zeros + 1.0
+    T2, S12, S22 = zeros, zeros, zeros
+    for t in range(Y.shape[1]):
+        m = M[:, t]
+        dc, d1, d2 = phi * bc, phi * b1, phi * b2
+        ec = m * (Y[:, t] - lc - dc)
+        e1 = -m * (l1 + d1)
+        e2 = -m * (l2 + d2)
+        C = C + ec * ec
+        T1 = T1 + e1 * ec
+        T2 = T2 + e2 * ec
+        S11 = S11 + e1 * e1
+        S12 = S12 + e1 * e2
+        S22 = S22 + e2 * e2
+        lc, l1, l2 = lc + m * dc + alpha * ec, l1 + m * d1 + alpha * e1, l2 + m * d2 + alpha * e2
+        bc = bc + m * (dc - bc) + ab * ec
+        b1 = b1 + m * (d1 - b1) + ab * e1
+        b2 = b2 + m * (d2 - b2) + ab * e2
+    T = np.stack([T1, T2], axis=-1)
+    S = np.stack([np.stack([S11, S12], axis=-1), np.stack([S12, S22], axis=-1)], axis=-2)
+    return C, T, S
+
+
+def _sse_at(C, T, S, x):
+    """SSE of each lane with initial states x."""
+    return C + 2 * (T * x).sum(-1) + np.einsum("...i,...ij,...j->...", x, S, x)
+
+
+def _solve(C, T, S):
+    """(sse, x0) of min ||ec + E x0||^2 for every lane; near-singular systems
+    keep the initial trend at 0."""
+    if T.shape[-1] == 1:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = np.where(S[..., 0, 0] > 0, -T[..., 0] / S[..., 0, 0], 0.0)[..., None]
+    else:
+        a, b, d = S[..., 0, 0], S[..., 0, 1], S[..., 1, 1]
+        det = a * d - b * b
+        ok = det > 1e-12 * np.maximum(a * d, 1e-300)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x1 = np.where(ok, (-d * T[..., 0] + b * T[..., 1]) / det,
+                          np.where(a > 0, -T[..., 0] / a, 0.0))
+            x2 = np.where(ok, (b * T[..., 0] - a * T[..., 1]) / det, 0.0)
+        x = np.stack([x1, x2], axis=-1)
+    return np.maximum(_sse_at(C, T, S, x), 0.0), x
+
+
+def _sse_fixed(Y, M, alpha, beta, phi, x0):
+    """SSE of lanes (n, k) started from the initial states x0 (n, s)."""
+    lvl = np.broadcast_to(x0[:, :1], alpha.shape)
+    trd = np.broadcast_to(x0[:, 1:2], alpha.shape) if x0.shape[1] == 2 else np.zeros(alpha.shape)
+    ab = alpha * beta
+    sse = np.zeros(alpha.shape)
+    for t in range(Y.shape[1]):
+        m = M[:, t, None]
+        d = phi * trd
+        e = m * (Y[:, t, None] - lvl - d)
+        sse = sse + e * e
+        lvl = lvl + m * d + alpha * e
+        trd = trd + m * (d - trd) + ab * e
+    return sse
+
+
+def _params(u, trend, damped):
+    """Unit cube (alpha, beta / alpha, phi) -> (alpha, beta, phi)."""
+    alpha = LOWER_BOUND + u[..., 0] * (1 - 2 * LOWER_BOUND)
+    beta = alpha * u[..., 1] if trend else np.zeros_like(alpha)
+    phi = (PHI_BOUNDS[0] + u[..., 2] * (PHI_BOUNDS[1] - PHI_BOUNDS[0])) if damped else np.ones_like(alpha)
+    return alpha, beta, phi
+
+
+def _evaluate(Y, M, u, trend, damped):
+    alpha, beta, phi = _params(u, trend, damped)
+    sse, x = _solve(*_recursions(Y, M, alpha, beta, phi, 2 if trend else 1))
+    return np.where(np.isfinite(sse), sse, np.inf), x
+
+
+def initial_states(Y, n_valid, trend):
+    """statsmodels' starting (l0, b0) for initialization_method="estimated",
+    per row of right-aligned Y: the first value / first difference below 10
+    observations, else the intercept and slope of a line through the first 10
+    (Hyndman et al. 2.6)."""
+    rows = np.arange(len(Y))
+    first = Y.shape[1] - n_valid
+    level = Y[rows, first]
+    slope = Y[rows, np.minimum(first + 1, Y.shape[1] - 1)] - level
+    long = n_valid >= 10
+    if long.any():
+        window = Y[rows[long, None], first[long, None] + np.arange(10)]
+        level[long], slope[long] = np.linalg.pinv(np.c_[np.ones(10), np.arange(1, 11)]) @ window.T
+    return np.stack([level, slope], axis=1) if trend else level[:, None]
+
+
+def _brute_points(trend, damped):
+    """statsmodels' brute-force start grid over (alpha, beta <= alpha), as
+    unit-cube points with phi at PHI_START."""
+    ns = 87 // (2 if trend else 1)
+    alphas = np.linspace(0.005, 0.995, ns)
+    if trend:
+        points = np.vstack([np.c_[np.full(k, a), np.linspace(0, 1, k), np.zeros(k)]
+                            for a in alphas for k in [int(np.ceil(ns * np.sqrt(a)))]])
+    else:
+        points = np.c_[alphas, np.zeros((ns, 2))]
+    if damped:
+        points[:, 2] = (PHI_START - PHI_BOUNDS[0]) / (PHI_BOUNDS[1] - PHI_BOUNDS[0])
+    return points
+
+
+class ETSFits:
+    """Fitted parameters, states and residuals of a batch (row i = series i)."""
+
+    def __init__(self, y, mask, trend, damped, alpha, beta, phi, x0, sse):
+        self.y = y
+        self.mask = mask
+        self.trend = trend
+        self.damped = damped
+        self.alpha, self.beta, self.phi = alpha, beta, phi
+        self.initial_level = x0[:, 0]
+        self.initial_trend = x0[:, 1] if trend else np.full(len(y), np.nan)
+        self.sse = sse
+        self.fallback = np.zeros(len(y), dtype=bool)  # set by fit_ets: refitted with statsmodels
+        # one pass with the fitted initial states: fitted values and final states
+        Y, M = np.where(mask, y, 0.0), mask.astype(float)
+        lvl = self.initial_level.copy()
+        trd = np.nan_to_num(self.initial_trend)
+        fitted = np.full(y.shape, np.nan)
+        for t in range(y.shape[1]):
+            m = M[:, t]
+            d = phi * trd
+            fitted[:, t] = np.where(mask[:, t], lvl + d, np.nan)
+            e = m * (Y[:, t] - lvl - d)
+            lvl = lvl + m * d + alpha * e
+            trd = trd + m * (d - trd) + alpha * beta * e
+        self.fittedvalues = fitted
+        self.resid = y - fitted
+        self.level, self.slope = lvl, trd
+
+    def __len__(self):
+        return len(self.y)
+
+    def forecast(self, horizon):
+        """(n_series, horizon) point forecasts."""
+        damp = np.cumsum(self.phi[:, None] ** np.arange(1, horizon + 1)[None, :], axis=1)
+        return self.level[:, None] + damp * self.slope[:, None]
+
+    @property
+    def params(self):
+        """statsmodels' parameter names -> (n_series,) arrays (NaN where unused)."""
+        nan = np.full(len(self), np.nan)
+        return {"smoothing_level": self.alpha,
+                "smoothing_trend": self.beta if self.trend else nan,
+                "smoothing_seasonal": nan,
+                "damping_trend": self.phi if self.damped else nan,
+                "initial_level": self.initial_level,
+                "initial_trend": self.initial_trend}
+
+    def __getitem__(self, i):
+        """Series i as a single fit with the attributes wdi.ets uses
+        (params, resid, forecast, model.has_trend / damped_trend)."""
+        fits = self
+        keep = self.mask[i]
+        return SimpleNamespace(
+            params={k: float(v[i]) for k, v in self.params.items()},
+            resid=self.resid[i, keep], fittedvalues=self.fittedvalues[i, keep], sse=float(self.sse[i]),
+            model=SimpleNamespace(has_trend=self.trend, damped_trend=self.damped),
+            forecast=lambda horizon: fits.forecast(horizon)[i])
+
+
+def fit_ets(Y, trend=None, damped=False):
+    """Fit every row of `Y` (n_series, n_obs) with additive `trend` ("add" or
+    None), damped if `damped`. A row may start with NaNs (a shorter series,
+    right-aligned); it must have no gaps after its first value. Returns ETSFits."""
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    mask = np.isfinite(Y)
+    if (np.diff(mask.astype(np.int8), axis=1) < 0).any():
+        raise ValueError("fit_ets: mỗi chuỗi phải liên tục (NaN chỉ được ở đầu chuỗi)")
+    trend = trend in ("add", "additive", True)
+    damped = bool(damped) and trend
+    n_states = 2 if trend else 1
+    n_valid = mask.sum(axis=1)
+    if (n_valid < n_states + 1).any():
+        raise ValueError(f"fit_ets: mỗi chuỗi cần ít nhất {n_states + 1} quan sát")
+    n = len(Y)
+    M = mask.astype(float)
+    Yz = np.where(mask, Y, 0.0)
+
+    # 1) starts: the N_STARTS best points of statsmodels' brute-force grid (its
+    #    own start first) with the heuristic initial states and phi held at
+    #    PHI_START, and the best point with each parameter moved to either
+    #    bound, where the SSE surface often has a second minimum (alpha -> 0,
+    #    beta -> 0, phi at 0.8 or 0.995) the grid does not reach
+    dims = [0] + [1] * trend + [2] * damped
+    grid = _brute_points(trend, damped)
+    alpha, beta, phi = _params(np.broadcast_to(grid, (n,) + grid.shape), trend, damped)
+    fixed = _sse_fixed(Yz, M, alpha, beta, phi, initial_states(Yz, n_valid, trend))
+    order = np.argsort(np.where(np.isfinite(fixed), fixed, np.inf), axis=1, kind="stable")
+    starts = grid[order[:, :N_STARTS]]
+    bounds = np.repeat(starts[:, :1], 2 * len(dims), axis=1)
+    for k, d in enumerate(dims):
+        bounds[:, 2 * k:2 * k + 2, d] = [0.0, 1.0]
+    starts = np.concatenate([starts, bounds], axis=1)
+    n_starts = starts.shape[1]
+    lane = np.repeat(np.arange(n), n_starts)  # one search lane per (series, start)
+    u = starts.reshape(-1, 3).copy()
+    best = _evaluate(Yz[lane], M[lane], u[:, None, :], trend, damped)[0][:, 0]
+
+    # 2) pattern search over all 3^d - 1 neighbours (diagonals follow the
+    #    alpha-beta ridges); a lane leaves the batch once its step is below TOL
+    step = np.zeros((len(lane), 3))
+    step[:, dims] = STEP
+    moves = np.zeros((3 ** len(dims), 3))
+    moves[:, dims] = np.stack(np.meshgrid(*[[-1, 0, 1]] * len(dims), indexing="ij"), axis=-1).reshape(-1, len(dims))
+    moves = moves[np.abs(moves).sum(axis=1) > 0]
+    for _ in range(MAX_ITER):
+        rows = np.flatnonzero(step.max(axis=1) > TOL)
+        if not len(rows):
+            break
+        cand = np.clip(u[rows, None, :] + moves[None, :, :] * step[rows, None, :], 0.0, 1.0)
+        c_sse = _evaluate(Yz[lane[rows]], M[lane[rows]], cand, trend, damped)[0]
+        j = np.argmin(c_sse, axis=1)
+        c_best = c_sse[np.arange(len(rows)), j]
+        better = c_best < best[rows] * (1 - 1e-12)
+        u[rows[better]] = cand[better, j[better]]
+        best[rows[better]] = c_best[better]
+        step[rows[better]] = np.minimum(step[rows[better]] * 2, STEP)
+        step[rows[~better]] /= 2
+        # lanes of a series that meet share a basin: keep searching the best one
+        U, B = u.reshape(n, n_starts, 3), best.reshape(n, n_starts)
+        reach = 2 * step.max(axis=1).reshape(n, n_starts)
+        near = np.abs(U[:, :, None, :] - U[:, None, :, :]).max(axis=-1) <= reach[:, None, :]
+        ahead = (B[:, :, None] < B[:, None, :]) | ((B[:, :, None] == B[:, None, :]) & np.tri(n_starts, k=-1, dtype=bool).T)
+        step[(near & ahead & (reach[:, :, None] > 0)).any(axis=1).reshape(-1)] = 0.0
+
+    # 3) lowest SSE over the starts of each series
+    pick = np.argmin(best.reshape(n, n_starts), axis=1)
+    chosen = np.arange(n) * n_starts + pick
+    u = u[chosen]
+    alpha, beta, phi = _params(u, trend, damped)
+    sse, x0 = _solve(*_recursions(Yz, M, alpha[:, None], beta[:, None], phi[:, None], n_states))
+    sse, x0 = sse[:, 0], x0[:, 0]
+
+    # 4) statsmodels for the series whose best lane did not converge
+    fallback = (step[chosen].max(axis=1) > TOL) | ~np.isfinite(sse)
+    for i in np.flatnonzero(fallback):
+        alpha[i], beta[i], phi[i], x0[i], sse[i] = _statsmodels_fit(Y[i, mask[i]], trend, damped)
+    fits = ETSFits(Y, mask, trend, damped, alpha, beta, phi, x0, sse)
+    fits.fallback = fallback
+    return fits
+
+
+def _statsmodels_fit(y, trend, damped):
+    """(alpha, beta, phi, x0, sse) of statsmodels' ExponentialSmoothing on one series."""
+    import pandas as pd
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+    fit = ExponentialSmoothing(pd.Series(y), trend="add" if trend else None, damped_trend=damped,
+                               initialization_method="estimated").fit()
+    p = fit.params
+    x0 = [p["initial_level"], p["initial_trend"]] if trend else [p["initial_level"]]
+    return (p["smoothing_level"], p["smoothing_trend"] if trend else 0.0,
+            p["damping_trend"] if damped else 1.0, x0, fit.sse)
+
+
+def fit_ets_many(values_list, trend=None, damped=False, min_obs=None):
+    """fit_ets over series of any length (NaNs dropped), in one batch.
+    Returns a list with, per input, a single-series fit (see
+    ETSFits.__getitem__) or None when it has fewer than `min_obs` values
+    (default: number of estimated parameters + 1) or the fit is not finite."""
+    values = [np.asarray(v, dtype=float) for v in values_list]
+    values = [v[np.isfinite(v)] for v in values]
+    has_trend = trend in ("add", "additive", True)
+    if min_obs is None:
+        min_obs = 3 + 2 * has_trend + (bool(damped) and has_trend)
+    idx = [i for i, v in enumerate(values) if len(v) >= max(min_obs, 2 + has_trend)]
+    out = [None] * len(values)
+    if not idx:
+        return out
+    width = max(len(values[i]) for i in idx)
+    Y = np.full((len(idx), width), np.nan)
+    for row, i in enumerate(idx):
+        Y[row, width - len(values[i]):] = values[i]
+    fits = fit_ets(Y, trend=trend, damped=damped)
+    for row, i in enumerate(idx):
+        if np.isfinite(fits.sse[row]) and np.isfinite(fits.level[row]):
+            out[i] = fits[row]
+    return out
@@ -0,0 +1,104 @@
+"""
+forecast.py
+Annual forecasts for many (country, indicator) series at once.
+
+Each series is fitted independently with a damped additive-trend
+ExponentialSmoothing model; the fits are distributed over a process pool
+(wdi/parallel.py). When a fit fails or exceeds the per-task timeout the last
+observed value is repeated over the horizon, as Buoi_2/main.py always did.
+Successful fits can be kept in a DiskCache keyed by the series content, model
+and horizon, so a refresh only refits series whose data changed. A model
+returns, and the cache keeps, a {"forecast", "params"} record per series (the
+format arima.1.py caches); forecast_many puts the params in the returned
+series' `attrs["params"]`.
+
+A model marked with @batched (damped_ets_batch) takes the whole list of
+uncached series and fits them together in-process (wdi/ets_batch.py), which
+for short annual series is much faster than a pool of statsmodels fits.
+"""
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+from wdi.cache import series_digest
+from wdi.ets_batch import fit_ets_many
+from wdi.parallel import run_parallel
+
+TASK_TIMEOUT = 60  # seconds per fit
+RECORD_FORMAT = 2  # part of the cache key; format 1 cached the bare forecast array
+
+
+def fit_record(fit, horizon):
+    """{"forecast": h-step forecast, "params": scalar parameters} of a fitted model."""
+    params = {k: float(v) for k, v in dict(fit.params).items() if np.ndim(v) == 0 and v is not None}
+    return {"forecast": np.asarray(fit.forecast(horizon), dtype=float), "params": params}
+
+
+def damped_ets(values, horizon):
+    """h-step forecast record of a clean (NaN-free) series with damped-trend ETS."""
+    y = pd.Series(np.asarray(values, dtype=float))  # positional index: no date/freq inference
+    fit = ExponentialSmoothing(y, trend="add", seasonal=None, damped_trend=True).fit(optimized=True)
+    return fit_record(fit, horizon)
+
+
+def batched(model):
+    """Mark `model(values_list, horizon) -> [record or None, ...]` as a batch model."""
+    model.batched = True
+    return model
+
+
+@batched
+def damped_ets_batch(values_list, horizon):
+    """damped_ets for a list of clean series, fitted together (None where a fit fails)."""
+    fits = fit_ets_many(values_list, trend="add", damped=True)
+    return [None if fit is None else fit_record(fit, horizon) for fit in fits]
+
+
+def last_value(values, horizon):
+    """Fallback: repeat the last observation (NaN for an empty series); no params."""
+    last = values[-1] if len(values) else np.nan
+    return {"forecast": np.full(horizon, last, dtype=float), "params": None}
+
+
+def forecast_years(series, horizon):
+    """The `horizon` years after the last year in the series index."""
+    start = int(series.index.max()) + 1
+    return range(start, start + horizon)
+
+
+def _no_result(values, horizon):
+    return None
+
+
+def forecast_many(series_list, horizon, model=damped_ets, workers=None, timeout=TASK_TIMEOUT, cache=None):
+    """Forecast every year-indexed series in `series_list`.
+
+    Returns a list of pd.Series (index = forecast years) in the same order as
+    the input, each with the fitted parameters in `attrs["params"]` (None for
+    a last-value fallback). `workers` = None uses all cores, 1 runs in-process
+    (batch models always run in-process). With a DiskCache only uncached
+    series are fitted; last-value fallbacks are not cached.
+    """
+    tasks = [(s.dropna().to_numpy(dtype=float), horizon) for s in series_list]
+    keys = [series_digest(t[0], list(s.dropna().index), model.__name__, horizon, RECORD_FORMAT)
+            for s, t in zip(series_list, tasks)]
+    values = [cache.get(k) if cache is not None else None for k in keys]
+
+    todo = [i for i, v in enumerate(values) if v is None]
+    if getattr(model, "batched", False):
+        fitted = model([tasks[i][0] for i in todo], horizon) if todo else []
+    else:
+        fitted = run_parallel(model, [tasks[i] for i in todo], workers=workers, timeout=timeout, fallback=_no_result)
+    for i, v in zip(todo, fitted):
+        if v is None:
+            v = last_value(*tasks[i])
+        elif cache is not None:
+            cache.put(keys[i], v)
+        values[i] = v
+    out = []
+    for s, v in zip(series_list, values):
+        f = pd.Series(v["forecast"], index=forecast_years(s, horizon))
+        f.attrs["params"] = v["params"]
+        out.append(f)
+    return out
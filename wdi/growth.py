@@ -0,0 +1,110 @@
+"""
+growth.py
+Growth statistics for every (country, series) pair of a Panel in one pass.
+
+chuong3.1 computed a CAGR for one country at a time from `.iloc`/`value`
+lookups at the first and last year of the whole table, which gives NaN as
+soon as that country has a gap at either end. Here the cube is viewed as a
+(pairs x years) matrix and every statistic is a row-wise array operation:
+
+    n_obs                       number of non-missing years
+    first_year, first_value     first / last non-missing observation
+    last_year,  last_value
+    mean, std                   level mean and standard deviation (ddof=1)
+    cagr                        ((last / first) ** (1 / (last_year - first_year)) - 1) * 100
+    log_growth                  (ln last - ln first) / (last_year - first_year) * 100
+    volatility                  std (ddof=1) of the annualised log changes between
+                                consecutive observations, in %
+
+Gaps are bridged: the change between two observations k years apart counts as
+k years. CAGR / log growth need positive first and last values and at least
+two observations; volatility needs three positive, consecutive observations.
+Otherwise the statistic is NaN (series such as '% change vs 1990' can be
+negative, so a growth rate is undefined there).
+"""
+
+import numpy as np
+import pandas as pd
+
+STAT_COLS = ["n_obs", "first_year", "first_value", "last_year", "last_value",
+             "mean", "std", "cagr", "log_growth", "volatility"]
+
+
+def _row_std(values, mask):
+    """Per-row sample std of `values` where `mask` (NaN below 2 points)."""
+    n = mask.sum(axis=1)
+    x = np.where(mask, values, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = x.sum(axis=1) / n
+        dev = np.where(mask, values - mean[:, None], 0.0)
+        var = (dev * dev).sum(axis=1) / (n - 1)
+    return np.where(n >= 2, np.sqrt(var), np.nan), np.where(n >= 1, mean, np.nan)
+
+
+def growth_matrix(values, years):
+    """Statistics (dict of arrays, keys STAT_COLS) for each row of a
+    (rows x years) matrix; NaN marks missing years."""
+    values = np.asarray(values, dtype=np.float64)
+    years = np.asarray(years, dtype=np.float64)
+    n_rows, n_years = values.shape
+    valid = np.isfinite(values)
+    n_obs = valid.sum(axis=1)
+    has = n_obs > 0
+    rows = np.arange(n_rows)
+
+    first = np.argmax(valid, axis=1)
+    last = n_years - 1 - np.argmax(valid[:, ::-1], axis=1)
+    first_year = np.where(has, years[first], np.nan)
+    last_year = np.where(has, years[last], np.nan)
+    first_value = np.where(has, values[rows, first], np.nan)
+    last_value = np.where(has, values[rows, last], np.nan)
+    std, mean = _row_std(values, valid)
+
+    span = last_year - first_year
+    ok = (n_obs >= 2) & (span > 0) & (first_value > 0) & (last_value > 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        log_growth = np.where(ok, np.log(np.where(ok, last_value / first_value, 1.0)) / span, np.nan)
+    cagr = np.expm1(log_growth) * 100
+    log_growth = log_growth * 100
+
+    # annualised log change between each observation and the previous one in its row
+    pos = np.where(valid, np.arange(n_years), -1)
+    prev = np.maximum.accumulate(pos, axis=1)
+    prev = np.concatenate([np.full((n_rows, 1), -1), prev[:, :-1]], axis=1)
+    prev_ok = valid & (prev >= 0)
+    prev_idx = np.where(prev_ok, prev, 0)
+    prev_val = values[rows[:, None], prev_idx]
+    step_ok = prev_ok & (values > 0) & (prev_val > 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        steps = np.log(np.where(step_ok, values / np.where(step_ok, prev_val, 1.0), 1.0))
+        steps = steps / np.where(step_ok, years[None, :] - years[prev_idx], 1.0) * 100
+    volatility, _ = _row_std(steps, step_ok)
+
+    return {"n_obs": n_obs, "first_year": first_year, "first_value": first_value,
+            "last_year": last_year, "last_value": last_value, "mean": mean, "std": std,
+            "cagr": cagr, "log_growth": log_growth, "volatility": volatility}
+
+
+def growth_stats(panel, series=None, countries=None, dropna=True):
+    """One row per (country, series) of `panel` (wdi.panel.Panel) with the
+    STAT_COLS statistics; pairs without any observation are dropped unless
+    `dropna` is False."""
+    ci = panel._countries(countries)
+    si = list(range(len(panel.series_codes))) if series is None else [panel._s(s) for s in series]
+    cube = panel.values[np.ix_(ci, si)]
+    stats = growth_matrix(cube.reshape(len(ci) * len(si), -1), panel.years)
+
+    c_pos = np.repeat(ci, len(si))
+    s_pos = np.tile(si, len(ci))
+    out = pd.DataFrame({
+        "Country Name": [panel.country_names[i] for i in c_pos],
+        "Country Code": [panel.country_codes[i] for i in c_pos],
+        "Series Name": [panel.series_names[i] for i in s_pos],
+        "Series Code": [panel.series_codes[i] for i in s_pos],
+        **stats,
+    })
+    for col in ("first_year", "last_year"):
+        out[col] = out[col].astype("Int64")
+    if dropna:
+        out = out[out["n_obs"] > 0].reset_index(drop=True)
+    return out
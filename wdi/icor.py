@@ -0,0 +1,97 @@
+"""
+icor.py
+ICOR for every country and year of a panel, as whole-array operations.
+
+Inputs are year x country frames (the layout of Panel.by_series), all
+aligned on the same years and countries. Three definitions are computed:
+
+    ICOR_growth       GFCF growth / GDP growth                     (Buoi_1)
+    ICOR_ratio        (I/Y) / g, GCF % of GDP over GDP growth      (Buoi_2, safe_icor)
+    ICOR_incremental  Δ(I/Y) / Δg, year-on-year changes in % points (incremental_icor)
+
+Divisions by a denominator within ICOR_EPS of zero, or with a missing side,
+give NaN (the masked helpers in wdi.periods). With `window` = w > 1 each
+year t uses the w years t-w+1 .. t: mean growth for the ratio (I/Y at t),
+summed changes for the incremental ICOR and summed growth rates (years
+with both rates) for the growth ratio. The sums come from prefix sums along
+the year axis, so a rolling variant costs the same as the annual one. The
+first w-1 years have no full window and are NaN.
+"""
+
+import numpy as np
+import pandas as pd
+
+from wdi.periods import incremental_icor, safe_icor
+
+ICOR_COLS = ["ICOR_growth", "ICOR_ratio", "ICOR_incremental"]
+
+
+def _window_sums(x, window):
+    """(sum of non-missing values, count) over the trailing `window` columns."""
+    valid = np.isfinite(x)
+    zeros = np.zeros((x.shape[0], 1))
+    P = np.concatenate([zeros, np.cumsum(np.where(valid, x, 0.0), axis=1)], axis=1)
+    C = np.concatenate([zeros, np.cumsum(valid, axis=1)], axis=1)
+    hi = np.arange(1, x.shape[1] + 1)
+    lo = np.maximum(hi - window, 0)
+    s, n = P[:, hi] - P[:, lo], C[:, hi] - C[:, lo]
+    s[:, :window - 1] = np.nan
+    return np.where(n > 0, s, np.nan), n
+
+
+def _diff(x):
+    return np.concatenate([np.full((x.shape[0], 1), np.nan), np.diff(x, axis=1)], axis=1)
+
+
+def icor_matrices(gdp_growth, gcf_pct=None, gfcf_growth=None, window=1):
+    """{ICOR column: (countries x years) array} from (countries x years)
+    arrays; a definition whose input is None is left out."""
+    g = np.asarray(gdp_growth, dtype=float)
+    out = {}
+    if gfcf_growth is not None:
+        gf = np.asarray(gfcf_growth, dtype=float)
+        both = np.isfinite(g) & np.isfinite(gf)
+        num, _ = _window_sums(np.where(both, gf, np.nan), window)
+        den, _ = _window_sums(np.where(both, g, np.nan), window)
+        out["ICOR_growth"] = safe_icor(num, den)
+    if gcf_pct is not None:
+        iy = np.asarray(gcf_pct, dtype=float)
+        g_sum, g_cnt = _window_sums(g, window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            g_mean = g_sum / g_cnt
+        out["ICOR_ratio"] = safe_icor(iy, g_mean)
+        # each change summed on its own (as in wdi.periods.summarize_periods)
+        out["ICOR_incremental"] = incremental_icor(_window_sums(_diff(iy), window)[0],
+                                                   _window_sums(_diff(g), window)[0])
+    return out
+
+
+def icor_table(gdp_growth, gcf_pct=None, gfcf_growth=None, window=1, country_col="Country"):
+    """Long frame (country, Year, ICOR columns) from year x country frames.
+    The other frames are aligned on the GDP-growth frame's years and countries."""
+    years, countries = gdp_growth.index, gdp_growth.columns
+
+    def align(frame):
+        return None if frame is None else frame.reindex(index=years, columns=countries).to_numpy(dtype=float).T
+
+    mats = icor_matrices(align(gdp_growth), align(gcf_pct), align(gfcf_growth), window=window)
+    out = pd.DataFrame({country_col: np.repeat(np.asarray(countries, dtype=object), len(years)),
+                        "Year": np.tile(np.asarray(years), len(countries))})
+    for col in ICOR_COLS:
+        if col in mats:
+            out[col] = mats[col].reshape(-1)
+    return out
+
+
+def icor_panel(panel, gdp_growth, gcf_pct=None, gfcf_growth=None, window=1, countries=None):
+    """icor_table over series codes (or names) of a wdi.panel.Panel; rows are
+    keyed by Country Code. Series missing from the panel are skipped."""
+    def frame(series):
+        if series is None or not panel.has(series=series):
+            return None
+        return panel.by_series(series, countries=countries, names=False)
+
+    gdp = frame(gdp_growth)
+    if gdp is None:
+        raise KeyError(f"Không có chỉ số '{gdp_growth}' trong panel")
+    return icor_table(gdp, frame(gcf_pct), frame(gfcf_growth), window=window, country_col="Country Code")
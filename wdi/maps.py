@@ -0,0 +1,239 @@
+"""
+maps.py
+Offline world choropleths from cached, projected Natural Earth geometries.
+
+Buoi_2 used to draw its ICOR map from `gpd.datasets` (removed in geopandas 1.0)
+and then download the Natural Earth countries zip from the web on every run.
+Instead, the 1:110m Natural Earth countries shapefile is bundled with the
+package (wdi/data/naturalearth_lowres, public domain) and read once:
+
+- every country is simplified (in degrees) and projected to Equal Earth with a
+  closed-form numpy projection, so no pyproj / network is needed;
+- all rings are flattened into one float32 vertex array with ring / country
+  offsets, plus the ISO3 key of each country ('-99' codes in the shapefile,
+  e.g. France and Norway, are resolved by name through wdi.countries), and
+  saved as `.wdi_store/maps/<shapefile>.<sha256[:16]>.npz` next to the
+  shapefile (wherever the script runs from), the digest covering the shapefile
+  bytes and the simplification / projection settings;
+- later runs only np.load that file (no geopandas import) and build one
+  matplotlib Path per country; a map is a single PathCollection whose face
+  colours come from the metric values, drawn on a Figure/Agg canvas.
+
+    world = load_world()
+    world.choropleth(latest["ICOR_ratio"], OUTPUT_DIR / "map_icor.png", title="ICOR")
+
+Values may be keyed by country code or by any name the alias index knows.
+For one map per period, choropleth_frames() builds the figure once and only
+swaps the face colours between frames (PNG sequence, shared colour scale).
+"""
+
+import hashlib
+import re
+from pathlib import Path
+
+import numpy as np
+
+from wdi.countries import COUNTRIES
+from wdi.store import _remove_old_versions, store_dir_for
+
+NE_LOWRES = Path(__file__).resolve().parent / "data" / "naturalearth_lowres" / "naturalearth_lowres.shp"
+SIMPLIFY_DEG = 0.05  # sai số đơn giản hoá hình học (độ)
+MAP_VERSION = 1      # bump after changing _build
+
+# Equal Earth (Šavrič, Patterson & Jenny 2018) polynomial coefficients
+_A1, _A2, _A3, _A4 = 1.340264, -0.081106, 0.000893, 0.003796
+_M = np.sqrt(3.0) / 2.0
+
+
+def equal_earth(lon, lat):
+    """Equal Earth x, y (unit sphere) of lon/lat arrays in degrees."""
+    lam = np.radians(lon)
+    theta = np.arcsin(_M * np.sin(np.radians(lat)))
+    t2 = theta * theta
+    t6 = t2 * t2 * t2
+    x = lam * np.cos(theta) / (_M * (_A1 + 3 * _A2 * t2 + t6 * (7 * _A3 + 9 * _A4 * t2)))
+    y = theta * (_A1 + _A2 * t2 + t6 * (_A3 + _A4 * t2))
+    return x, y
+
+
+def _shapefile_digest(shp, tolerance):
+    h = hashlib.sha256(repr((MAP_VERSION, float(tolerance), "equal_earth")).encode("utf-8"))
+    for ext in (".shp", ".shx", ".dbf"):
+        h.update(Path(shp).with_suffix(ext).read_bytes())
+    return h.hexdigest()
+
+
+def _iso3(code, name):
+    code = str(code).upper()
+    if len(code) == 3 and code.isalpha():
+        return code
+    return COUNTRIES.get(name, code)
+
+
+def _build(shp, tolerance):
+    """Read the shapefile and flatten its simplified, projected rings into arrays."""
+    import geopandas as gpd
+    import shapely
+
+    world = gpd.read_file(shp)
+    geoms = world.geometry.simplify(tolerance, preserve_topology=True).to_numpy()
+    geom_type, coords, (ring_offsets, poly_offsets, multi_offsets) = shapely.to_ragged_array(
+        shapely.multipolygons(shapely.get_parts(geoms), indices=np.repeat(
+            np.arange(len(geoms)), shapely.get_num_geometries(geoms))))
+    x, y = equal_earth(coords[:, 0], coords[:, 1])
+    return {
+        "coords": np.column_stack([x, y]).astype(np.float32),
+        "ring_offsets": ring_offsets.astype(np.int32),
+        # rings of country i: feature_offsets[i] .. feature_offsets[i + 1]
+        "feature_offsets": poly_offsets[multi_offsets].astype(np.int32),
+        "iso3": np.array([_iso3(c, n) for c, n in zip(world["iso_a3"], world["name"])], dtype=str),
+        "names": world["name"].to_numpy(dtype=str),
+    }
+
+
+def load_world(shp=NE_LOWRES, tolerance=SIMPLIFY_DEG, cache_dir=None, refresh=False):
+    """WorldMap of `shp`, read from the .npz geometry cache (in
+    `.wdi_store/maps` next to the shapefile by default) when it is current."""
+    shp = Path(shp)
+    cdir = Path(cache_dir) if cache_dir is not None else store_dir_for(shp) / "maps"
+    path = cdir / f"{shp.stem}.{_shapefile_digest(shp, tolerance)[:16]}.npz"
+    if path.exists() and not refresh:
+        with np.load(path) as data:
+            return WorldMap(**{k: data[k] for k in data.files})
+    arrays = _build(shp, tolerance)
+    cdir.mkdir(parents=True, exist_ok=True)
+    np.savez(path, **arrays)
+    _remove_old_versions(cdir, f"{shp.stem}.", ".npz", keep=path)
+    return WorldMap(**arrays)
+
+
+class WorldMap:
+    """Projected country outlines (one compound Path per country) keyed by ISO3."""
+
+    def __init__(self, coords, ring_offsets, feature_offsets, iso3, names):
+        self.coords = coords
+        self.ring_offsets = ring_offsets
+        self.feature_offsets = feature_offsets
+        self.iso3 = [str(k) for k in iso3]
+        self.names = [str(n) for n in names]
+        self.index = {k: i for i, k in enumerate(self.iso3)}
+        self._paths = None
+
+    def __len__(self):
+        return len(self.iso3)
+
+    def paths(self):
+        """matplotlib Paths, one per country (built once per WorldMap)."""
+        if self._paths is None:
+            from matplotlib.path import Path as MplPath
+
+            codes = np.full(len(self.coords), MplPath.LINETO, dtype=MplPath.code_type)
+            codes[self.ring_offsets[:-1]] = MplPath.MOVETO
+            codes[self.ring_offsets[1:] - 1] = MplPath.CLOSEPOLY
+            starts = self.ring_offsets[self.feature_offsets]
+            self._paths = [MplPath(self.coords[a:b], codes[a:b]) for a, b in zip(starts[:-1], starts[1:])]
+        return self._paths
+
+    def align(self, values):
+        """Float array (one entry per map country, NaN = no data) from a Series /
+        dict keyed by country codes or names; keys that are not on the map
+        (aggregates such as World) are ignored."""
+        out = np.full(len(self), np.nan)
+        for label, value in dict(values).items():
+            pos = self.index.get(COUNTRIES.get(label, str(label).upper()))
+            if pos is not None and value is not None:
+                out[pos] = value
+        return out
+
+    def collection(self, values=None, cmap="RdYlBu", missing_color="lightgrey", vmin=None, vmax=None,
+                   edgecolor="0.6", linewidth=0.3, subset=None):
+        """PathCollection of all countries (or of the positions in `subset`),
+        coloured by `values` (see align); countries without a value are drawn
+        in `missing_color`."""
+        import matplotlib
+        from matplotlib.collections import PathCollection
+        from matplotlib.colors import Normalize
+
+        idx = np.arange(len(self)) if subset is None else np.asarray(subset, dtype=np.int64)
+        paths = self.paths()
+        coll = PathCollection([paths[i] for i in idx],
+                              cmap=matplotlib.colormaps[cmap].with_extremes(bad=missing_color),
+                              norm=Normalize(vmin=vmin, vmax=vmax), edgecolors=edgecolor, linewidths=linewidth)
+        arr = self.align(values) if values is not None else np.full(len(self), np.nan)
+        coll.set_array(np.ma.masked_invalid(arr[idx]))
+        return coll
+
+    def _figure(self, colls, title, label, figsize, colorbar, dpi=100):
+        """Figure with `colls` on one equal-aspect, axis-less axes; the colour
+        bar follows the last collection."""
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=figsize, dpi=dpi)
+        ax = fig.add_subplot()
+        for coll in colls:
+            ax.add_collection(coll)
+        ax.autoscale_view()
+        ax.set_aspect("equal")
+        ax.axis("off")
+        if colorbar:
+            fig.colorbar(colls[-1], ax=ax, shrink=0.7, label=label)
+        ax.set_title(title or "")
+        fig.tight_layout()
+        return fig, ax
+
+    def choropleth(self, values, path, title=None, label=None, cmap="RdYlBu", missing_color="lightgrey",
+                   figsize=(12, 6), dpi=100):
+        """Draw one choropleth of `values` to `path` (Figure/Agg, no pyplot)."""
+        coll = self.collection(values, cmap=cmap, missing_color=missing_color)
+        fig, _ = self._figure([coll], title, label, figsize, colorbar=np.ma.count(coll.get_array()) > 0)
+        fig.savefig(path, dpi=dpi)
+        return path
+
+    def choropleth_frames(self, frames, out_dir, prefix="frame", title=None, label=None, cmap="RdYlBu",
+                          missing_color="lightgrey", figsize=(12, 6), dpi=100):
+        """One PNG per entry of `frames` ({frame label: values}), e.g. one map per
+        period: `<out_dir>/<prefix>_<nn>_<label>.png`.
+
+        The map is rendered once as a background: every country without a value
+        in any frame, the axes and the colour bar (one colour scale shared by
+        all frames, so colours are comparable between periods). Each frame then
+        restores that pixel buffer, recolours the collection of countries that
+        do have data, draws it and the title on top and writes the buffer, so N
+        frames cost N small redraws instead of N full renders. `title` may
+        contain '{label}'."""
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.image import imsave
+
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        arrays = {name: self.align(values) for name, values in frames.items()}
+        stacked = np.vstack(list(arrays.values())) if arrays else np.full((1, len(self)), np.nan)
+        has_data = np.isfinite(stacked).any(axis=0)
+        finite = stacked[np.isfinite(stacked)]
+        vmin, vmax = (finite.min(), finite.max()) if finite.size else (None, None)
+
+        base = self.collection(None, cmap=cmap, missing_color=missing_color, subset=np.flatnonzero(~has_data))
+        live_idx = np.flatnonzero(has_data)
+        live = self.collection(None, cmap=cmap, missing_color=missing_color, vmin=vmin, vmax=vmax, subset=live_idx)
+        fig, ax = self._figure([base, live], None, label, figsize, colorbar=finite.size > 0, dpi=dpi)
+        canvas = FigureCanvasAgg(fig)
+        live.set_visible(False)
+        canvas.draw()
+        background = canvas.copy_from_bbox(fig.bbox)
+        live.set_visible(True)
+
+        paths = []
+        for i, (name, arr) in enumerate(arrays.items()):
+            canvas.restore_region(background)
+            live.set_array(np.ma.masked_invalid(arr[live_idx]))
+            ax.title.set_text((title or "{label}").format(label=name))
+            fig.draw_artist(live)
+            fig.draw_artist(ax.title)
+            path = out_dir / f"{prefix}_{i:02d}_{_slug(name)}.png"
+            imsave(path, np.asarray(canvas.buffer_rgba()), dpi=dpi)
+            paths.append(path)
+        return paths
+
+
+def _slug(text):
+    return re.sub(r"[^0-9A-Za-z]+", "_", str(text)).strip("_") or "frame"
@@ -0,0 +1,114 @@
+"""
+metadata.py
+Combined WDI data + series-metadata exports, split in one pass.
+
+A DataBank download with "Include metadata" is one CSV: the wide data table,
+a few blank rows, then a second table that starts with the header
+'Code,License Type,Indicator Name,Long definition,Source,...'. Metadata fields
+are quoted and often span several lines, so the split is done with a csv
+reader over the file stream (no readlines, no temporary files): data rows are
+collected into the wide frame, metadata rows are kept as raw records.
+
+MetadataIndex hashes every record by series code and by normalised indicator
+name and only turns a record into a dict when it is asked for; `attach` maps
+the distinct series codes of a frame to the requested fields instead of
+merging the whole metadata table. Joining by code also covers series whose
+metadata name differs from the data's Series Name (WDI 'GDP growth
+(annual %)' is 'GDP (annual % growth)' in the metadata).
+"""
+
+import csv
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from wdi.store import typed_wide
+
+META_FIRST_COLS = ["Code", "License Type"]
+DEFAULT_FIELDS = ["Long definition", "Source", "Periodicity"]
+
+
+def _norm(name):
+    return re.sub(r"\s+", " ", str(name)).strip().casefold()
+
+
+class MetadataIndex:
+    """Series metadata records addressed by code or indicator name."""
+
+    def __init__(self, header, records):
+        self.header = list(header)
+        self.records = records
+        self._by_code = {}
+        self._by_name = {}
+        code_i = self.header.index("Code")
+        name_i = self.header.index("Indicator Name") if "Indicator Name" in self.header else None
+        for pos, rec in enumerate(records):
+            self._by_code.setdefault(rec[code_i], pos)
+            if name_i is not None:
+                self._by_name.setdefault(_norm(rec[name_i]), pos)
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, key):
+        return self._pos(key) is not None
+
+    def _pos(self, key):
+        pos = self._by_code.get(key)
+        return pos if pos is not None else self._by_name.get(_norm(key))
+
+    def get(self, key, default=None):
+        """Metadata dict of a series code or indicator name (`default` if unknown)."""
+        pos = self._pos(key)
+        if pos is None:
+            return default
+        if pos not in self._cache:
+            self._cache[pos] = dict(zip(self.header, self.records[pos]))
+        return self._cache[pos]
+
+    def field(self, key, name, default=None):
+        rec = self.get(key)
+        return default if rec is None else rec.get(name, default)
+
+    def attach(self, df, fields=DEFAULT_FIELDS, key_col="Series Code", fallback_col="Series Name"):
+        """Copy of `df` with the metadata `fields` as extra columns. Rows are
+        matched by `key_col`, then by `fallback_col` (name); only the distinct
+        keys are looked up."""
+        out = df.copy()
+        keys = df[key_col].astype(object)
+        if fallback_col is not None and fallback_col in df.columns:
+            known = keys.map(lambda k: k in self)
+            keys = keys.where(known, df[fallback_col].astype(object))
+        for name in fields:
+            lookup = {k: self.field(k, name) for k in pd.unique(keys)}
+            out[name] = keys.map(lookup)
+        return out
+
+    def to_frame(self):
+        return pd.DataFrame(self.records, columns=self.header)
+
+
+def read_export(src, encoding="utf-8-sig"):
+    """(typed wide data frame, MetadataIndex) of a combined WDI export; the
+    index is empty when the file has no metadata part."""
+    data_header, data_rows = None, []
+    meta_header, meta_rows = None, []
+    with open(Path(src), newline="", encoding=encoding) as f:
+        for row in csv.reader(f):
+            if not any(cell.strip() for cell in row):
+                continue  # blank separator rows (',,,,')
+            if meta_header is None and row[:len(META_FIRST_COLS)] == META_FIRST_COLS:
+                meta_header = row
+            elif meta_header is not None:
+                meta_rows.append(row)
+            elif data_header is None:
+                data_header = row
+            else:
+                data_rows.append(row)
+
+    data = pd.DataFrame(data_rows, columns=data_header)
+    data = typed_wide(data.replace("", pd.NA))
+    meta = MetadataIndex(meta_header or META_FIRST_COLS + ["Indicator Name"], meta_rows)
+    return data, meta
@@ -0,0 +1,117 @@
+"""
+panel.py
+Dense (country x series x year) cube over a long WDI table.
+
+Scripts used to fetch one country/indicator at a time with boolean masks over
+the whole long table (`df[(df['Country Name'] == c) & (df['Series Code'] == s)]`),
+an O(rows) scan per lookup. Panel dictionary-encodes the three keys once
+(category codes -> positions) and scatters the values into a float array
+
+    values[country, series, year]   (NaN where the export has no value)
+
+so a lookup is a dict hit plus array indexing, and any axis can be sliced
+without touching the other rows. Countries can be addressed by name or code,
+series by code or name; both keep the order in which they first appear in the
+export.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _encode(df, code_col, name_col):
+    """Distinct `code_col` values in first-seen order, their names, and row codes."""
+    codes, labels = pd.factorize(df[code_col].astype(str).to_numpy())
+    names = pd.Series(df[name_col].astype(str).to_numpy()).groupby(codes, sort=True).first()
+    return list(labels), names.tolist(), codes.astype(np.int64)
+
+
+class Panel:
+    """Country x series x year cube built from a typed long table (wdi.store)."""
+
+    def __init__(self, values, country_codes, country_names, series_codes, series_names, years):
+        self.values = values
+        self.country_codes = list(country_codes)
+        self.country_names = list(country_names)
+        self.series_codes = list(series_codes)
+        self.series_names = list(series_names)
+        self.years = np.asarray(years, dtype=np.int64)
+        self.country_index = {k: i for i, k in enumerate(self.country_codes)}
+        self.country_index.update({k: i for i, k in enumerate(self.country_names)})
+        self.series_index = {k: i for i, k in enumerate(self.series_codes)}
+        self.series_index.update({k: i for i, k in enumerate(self.series_names)})
+        self.year_index = {int(y): i for i, y in enumerate(self.years)}
+
+    @classmethod
+    def from_long(cls, df_long):
+        df = df_long.dropna(subset=["Value"])
+        c_codes, c_names, ci = _encode(df, "Country Code", "Country Name")
+        s_codes, s_names, si = _encode(df, "Series Code", "Series Name")
+        years, yi = np.unique(df["Year"].to_numpy(dtype=np.int64), return_inverse=True)
+        values = np.full((len(c_codes), len(s_codes), len(years)), np.nan)
+        values[ci, si, yi] = df["Value"].to_numpy(dtype=np.float64)
+        return cls(values, c_codes, c_names, s_codes, s_names, years)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def has(self, country=None, series=None):
+        return ((country is None or country in self.country_index)
+                and (series is None or series in self.series_index))
+
+    def _c(self, country):
+        try:
+            return self.country_index[country]
+        except KeyError:
+            raise KeyError(f"Không có quốc gia '{country}' trong panel") from None
+
+    def _s(self, series):
+        try:
+            return self.series_index[series]
+        except KeyError:
+            raise KeyError(f"Không có chỉ số '{series}' trong panel") from None
+
+    def value(self, country, series, year):
+        yi = self.year_index.get(int(year))
+        return np.nan if yi is None else float(self.values[self._c(country), self._s(series), yi])
+
+    def series(self, country, series, dropna=True):
+        """Year-indexed values of one (country, series)."""
+        out = pd.Series(self.values[self._c(country), self._s(series)], index=self.years, name=series)
+        out.index.name = "Year"
+        return out.dropna() if dropna else out
+
+    def by_series(self, series, countries=None, names=True):
+        """Year x country frame for one series (columns = country names or codes)."""
+        idx = self._countries(countries)
+        labels = self.country_names if names else self.country_codes
+        frame = pd.DataFrame(self.values[idx, self._s(series)].T, index=self.years,
+                             columns=[labels[i] for i in idx])
+        frame.index.name = "Year"
+        return frame
+
+    def by_country(self, country, series=None):
+        """Year x series-code frame for one country."""
+        idx = list(range(len(self.series_codes))) if series is None else [self._s(s) for s in series]
+        frame = pd.DataFrame(self.values[self._c(country)][idx].T, index=self.years,
+                             columns=[self.series_codes[i] for i in idx])
+        frame.index.name = "Year"
+        return frame
+
+    def at_year(self, year, series):
+        """Country-indexed values of one series in one year (NaN when missing)."""
+        yi = self.year_index.get(int(year))
+        col = self.values[:, self._s(series), yi] if yi is not None else np.full(len(self.country_codes), np.nan)
+        return pd.Series(col, index=self.country_names, name=int(year))
+
+    def latest_year(self, series, min_countries=1):
+        """Most recent year with at least `min_countries` non-missing values."""
+        counts = np.isfinite(self.values[:, self._s(series)]).sum(axis=0)
+        ok = np.flatnonzero(counts >= min_countries)
+        return int(self.years[ok[-1]]) if len(ok) else None
+
+    def _countries(self, countries):
+        if countries is None:
+            return list(range(len(self.country_codes)))
+        return [self._c(c) for c in countries]
@@ -0,0 +1,152 @@
+"""
+parallel.py
+Process-pool helper shared by the forecasting / model-fitting stages.
+
+The analysis scripts run their code at module level (no `if __name__ ==
+"__main__":` guard), so worker processes are forked rather than spawned; where
+fork is unavailable (Windows) the tasks simply run in-process.
+
+A task's timeout counts from the moment it starts running, not from when the
+runner begins waiting for it: a SIGALRM timer armed around the call aborts the
+task at its deadline, in a worker as well as in-process, and the worker moves
+on to the next task. A worker stuck in C code that never returns to the
+interpreter is killed by the runner GRACE seconds past the deadline and the
+unfinished tasks are re-run on a fresh pool. Without SIGALRM (Windows), or
+in-process off the main thread, tasks have no timeout.
+"""
+
+import multiprocessing as mp
+import os
+import signal
+import threading
+import time
+
+WORKERS_ENV = "WDI_WORKERS"
+GRACE = 5.0  # seconds past a deadline before the worker itself is killed
+POLL = 0.05  # seconds between checks of the running tasks' deadlines
+
+
+class TaskTimeout(Exception):
+    """A task ran longer than its timeout."""
+
+
+class _Expired(BaseException):
+    """Raised into the task by SIGALRM; not an Exception, so a broad
+    `except Exception` inside the task cannot swallow it."""
+
+
+def default_workers(workers=None):
+    """`workers`, else $WDI_WORKERS, else the number of CPUs."""
+    if workers is None:
+        workers = int(os.environ.get(WORKERS_ENV, 0)) or os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def pool_context():
+    return mp.get_context("fork") if "fork" in mp.get_all_start_methods() else None
+
+
+def _expire(signum, frame):
+    raise _Expired
+
+
+def _timed(func, task, timeout):
+    """func(*task), raising TaskTimeout `timeout` seconds after the call starts."""
+    if (timeout is None or not hasattr(signal, "setitimer")
+            or threading.current_thread() is not threading.main_thread()):
+        return func(*task)
+    previous = signal.signal(signal.SIGALRM, _expire)
+    try:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            return func(*task)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    except _Expired:
+        raise TaskTimeout(f"{getattr(func, '__name__', func)} ran longer than {timeout} s") from None
+    finally:
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _call(func, task, timeout, fallback):
+    try:
+        return _timed(func, task, timeout)
+    except Exception:
+        if fallback is None:
+            raise
+        return fallback(*task)
+
+
+# start time of every task of the current pool, shared with its forked workers
+_started = None
+
+
+def _init_worker(started):
+    global _started
+    _started = started
+
+
+def _pool_task(i, func, task, timeout):
+    _started[i] = time.monotonic()
+    return _timed(func, task, timeout)
+
+
+def _collect(res, task, fallback):
+    try:
+        return res.get()
+    except Exception:
+        if fallback is None:
+            raise
+        return fallback(*task)
+
+
+def run_parallel(func, tasks, workers=None, timeout=None, fallback=None):
+    """[func(*task) for task in tasks], fanned out over a process pool.
+
+    Results come back in task order whatever order the workers finish in. A
+    task that raises, or runs longer than `timeout` seconds from its own
+    start, is replaced by `fallback(*task)` (without a fallback the error, or
+    TaskTimeout, is re-raised).
+    """
+    tasks = [tuple(t) for t in tasks]
+    workers = min(default_workers(workers), len(tasks))
+    ctx = pool_context()
+    if workers <= 1 or ctx is None:
+        return [_call(func, t, timeout, fallback) for t in tasks]
+
+    results = [None] * len(tasks)
+    started = ctx.Array("d", len(tasks), lock=False)  # 0 = not started yet
+    todo = list(range(len(tasks)))
+    while todo:
+        pool = ctx.Pool(processes=min(workers, len(todo)), initializer=_init_worker, initargs=(started,))
+        pending, stuck, done = {}, [], False
+        try:
+            for i in todo:
+                started[i] = 0.0
+                pending[i] = pool.apply_async(_pool_task, (i, func, tasks[i], timeout))
+            while pending:
+                for i in [i for i, res in pending.items() if res.ready()]:
+                    results[i] = _collect(pending.pop(i), tasks[i], fallback)
+                if timeout is not None:
+                    now = time.monotonic()
+                    stuck = [i for i in pending if started[i] and now - started[i] > timeout + GRACE]
+                    if stuck:
+                        break
+                if pending:
+                    next(iter(pending.values())).wait(POLL)
+            done = True
+        finally:
+            if stuck or not done:
+                pool.terminate()
+            else:
+                pool.close()
+            pool.join()
+        # the stuck tasks fall back; the others the killed pool was still
+        # running, or had not started, are run again on a new pool
+        for i in stuck:
+            if fallback is None:
+                raise TaskTimeout(f"{getattr(func, '__name__', func)} ran longer than {timeout} s")
+            results[i] = fallback(*tasks[i])
+            del pending[i]
+        todo = list(pending)
+    return results
@@ -0,0 +1,200 @@
+"""
+periods.py
+Period metrics on an annual country panel (used by Buoi_2/main.py).
+
+Input: one row per country-year with GDP_growth, GCF_percent, Delta_GCF_pct and
+Delta_GDP_growth (the yearly diffs computed per country). Per period:
+    gM                mean GDP growth (skipna)
+    gT, (I/Y)_T       GDP growth and GCF (% GDP) in the latest year of the period
+    gM_minus_gT
+    ICOR_ratio        ((I/Y)_T / 100) / (gM / 100), NaN when |gM| < 1e-6
+    ICOR_incremental  sum(ΔGCF%) / sum(ΔGDP growth), NaN when |sum Δ| <= 1e-6
+    n_obs             number of distinct years
+
+Everything is grouped aggregations and array ops; there is no Python call per
+group.
+
+`summarize_periods` evaluates several bucketing schemes (fixed width, rolling
+windows, explicit breakpoints such as the Đổi Mới phases) in one pass: the panel
+is sorted once, prefix sums of every summed column are built once, and each
+(country, window) pair is then two `searchsorted` lookups and a difference of
+prefix sums, so an extra scheme costs almost nothing.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+ICOR_EPS = 1e-6
+METRIC_COLS = ["gM", "gT", "(I/Y)_T", "gM_minus_gT", "ICOR_ratio", "ICOR_incremental", "n_obs"]
+
+
+def period_labels(years, width=5):
+    """Fixed buckets: 1987 -> '1985-1989' for width=5 (vectorised period_5yr)."""
+    years = pd.Series(years)
+    start = (years.astype(int) // width) * width
+    return start.astype(str) + "-" + (start + width - 1).astype(str)
+
+
+def safe_icor(i_y_pct, g_pct):
+    """Array form of ICOR ≈ (I/Y) / g with both in %; NaN when invalid or |g| < 1e-6."""
+    i_y_pct = np.asarray(i_y_pct, dtype=float)
+    g_pct = np.asarray(g_pct, dtype=float)
+    ok = ~np.isnan(i_y_pct) & ~np.isnan(g_pct) & (np.abs(g_pct) >= ICOR_EPS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(ok, (i_y_pct / 100.0) / (g_pct / 100.0), np.nan)
+
+
+def incremental_icor(delta_i, delta_y):
+    """Σ ΔGCF% / Σ ΔGDP growth (both in % points); NaN when |Σ ΔY| <= 1e-6."""
+    delta_i = np.asarray(delta_i, dtype=float)
+    delta_y = np.asarray(delta_y, dtype=float)
+    ok = ~np.isnan(delta_i) & ~np.isnan(delta_y) & (np.abs(delta_y) > ICOR_EPS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(ok, (delta_i / 100.0) / (delta_y / 100.0), np.nan)
+
+
+def period_metrics(df_ann, keys=("Country", "Country Code", "Period")):
+    """One row per `keys` group with METRIC_COLS, sorted by `keys`."""
+    keys = list(keys)
+    df = df_ann.dropna(subset=keys)
+    g = df.groupby(keys, sort=True)
+
+    gM = g["GDP_growth"].mean()
+    sums = g[["Delta_GCF_pct", "Delta_GDP_growth"]].sum()
+    n_obs = g["Year"].nunique()
+    # row of the latest year in each group (what idxmax picked per group)
+    latest = (df.sort_values(keys + ["Year"], kind="mergesort")
+                .drop_duplicates(keys, keep="last")
+                .set_index(keys)
+                .reindex(gM.index))
+
+    gT = latest["GDP_growth"].to_numpy(dtype=float)
+    iy_t = latest["GCF_percent"].to_numpy(dtype=float)
+    out = pd.DataFrame({
+        "gM": gM.to_numpy(dtype=float),
+        "gT": gT,
+        "(I/Y)_T": iy_t,
+        "gM_minus_gT": gM.to_numpy(dtype=float) - gT,
+        "ICOR_ratio": safe_icor(iy_t, gM.to_numpy(dtype=float)),
+        "ICOR_incremental": incremental_icor(sums["Delta_GCF_pct"], sums["Delta_GDP_growth"]),
+        "n_obs": n_obs.to_numpy(dtype=float),  # float, as in the original period_summary_5yr.csv
+    }, index=gM.index)
+    return out.reset_index()
+
+
+# -------------------------
+# Bucketing schemes
+# -------------------------
+@dataclass(frozen=True)
+class FixedBuckets:
+    """Non-overlapping buckets of `width` years aligned on `origin` (5 -> 1985-1989, 1990-1994, ...)."""
+    width: int = 5
+    origin: int = 0
+
+    @property
+    def name(self):
+        return f"{self.width}yr"
+
+    def windows(self, first, last):
+        start = first - (first - self.origin) % self.width
+        starts = np.arange(start, last + 1, self.width)
+        return starts, starts + self.width - 1, [f"{s}-{s + self.width - 1}" for s in starts]
+
+
+@dataclass(frozen=True)
+class RollingBuckets:
+    """Overlapping windows of `window` years, a new one every `step` years."""
+    window: int = 10
+    step: int = 1
+
+    @property
+    def name(self):
+        return f"rolling{self.window}yr" + (f"_step{self.step}" if self.step != 1 else "")
+
+    def windows(self, first, last):
+        starts = np.arange(first, last - self.window + 2, self.step)
+        return starts, starts + self.window - 1, [f"{s}-{s + self.window - 1}" for s in starts]
+
+
+@dataclass(frozen=True)
+class Breakpoints:
+    """Explicit phases: each edge starts a period that runs until the next edge
+    (the last one until the end of the data)."""
+    edges: tuple
+    labels: tuple = None
+    name: str = "custom"
+
+    def windows(self, first, last):
+        starts = np.asarray(self.edges, dtype=np.int64)
+        ends = np.append(starts[1:] - 1, max(last, starts[-1]))
+        labels = list(self.labels) if self.labels else [f"{s}-{e}" for s, e in zip(starts, ends)]
+        return starts, ends, labels
+
+
+# -------------------------
+# One-pass engine
+# -------------------------
+def _prefix(x):
+    """Prefix sums with a leading 0 so sum(x[lo:hi]) == P[hi] - P[lo] (NaN counts as 0)."""
+    return np.concatenate([[0.0], np.cumsum(np.nan_to_num(x, nan=0.0))])
+
+
+def summarize_periods(df_ann, schemes, keys=("Country", "Country Code")):
+    """{scheme.name: summary} for every scheme, sharing one sort and one set of prefix sums.
+
+    Each summary has `keys`, 'Period' and METRIC_COLS (same definitions as
+    period_metrics), one row per non-empty (country, window), ordered by
+    `keys` then window start.
+    """
+    keys = list(keys)
+    df = df_ann.dropna(subset=keys).sort_values(keys + ["Year"], kind="mergesort")
+    if df.empty:
+        return {sc.name: pd.DataFrame(columns=keys + ["Period"] + METRIC_COLS) for sc in schemes}
+
+    grp = df.groupby(keys, sort=True).ngroup().to_numpy(dtype=np.int64)
+    year = df["Year"].to_numpy(dtype=np.int64)
+    span = 10_000  # years are < 10000, so grp * span + year is sorted
+    pos_key = grp * span + year
+    groups = df[keys].drop_duplicates().reset_index(drop=True)
+
+    gdp = df["GDP_growth"].to_numpy(dtype=float)
+    gcf = df["GCF_percent"].to_numpy(dtype=float)
+    P_gdp = _prefix(gdp)
+    P_cnt = np.concatenate([[0], np.cumsum(~np.isnan(gdp))])
+    P_di = _prefix(df["Delta_GCF_pct"].to_numpy(dtype=float))
+    P_dy = _prefix(df["Delta_GDP_growth"].to_numpy(dtype=float))
+    P_new = np.concatenate([[0], np.cumsum(np.r_[True, pos_key[1:] != pos_key[:-1]])])
+
+    first, last = int(year.min()), int(year.max())
+    n_groups = len(groups)
+    out = {}
+    for scheme in schemes:
+        starts, ends, labels = scheme.windows(first, last)
+        n_win = len(starts)
+        gi = np.repeat(np.arange(n_groups), n_win)
+        wi = np.tile(np.arange(n_win), n_groups)
+        lo = np.searchsorted(pos_key, gi * span + np.asarray(starts)[wi], side="left")
+        hi = np.searchsorted(pos_key, gi * span + np.asarray(ends)[wi], side="right")
+        keep = hi > lo
+        gi, wi, lo, hi = gi[keep], wi[keep], lo[keep], hi[keep]
+
+        cnt = P_cnt[hi] - P_cnt[lo]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gM = np.where(cnt > 0, (P_gdp[hi] - P_gdp[lo]) / cnt, np.nan)
+        # first row of the latest year in the window (what idxmax picks)
+        latest = np.searchsorted(pos_key, pos_key[hi - 1], side="left")
+        gT, iy_t = gdp[latest], gcf[latest]
+
+        res = groups.iloc[gi].reset_index(drop=True)
+        res["Period"] = np.asarray(labels, dtype=object)[wi]
+        res["gM"] = gM
+        res["gT"] = gT
+        res["(I/Y)_T"] = iy_t
+        res["gM_minus_gT"] = gM - gT
+        res["ICOR_ratio"] = safe_icor(iy_t, gM)
+        res["ICOR_incremental"] = incremental_icor(P_di[hi] - P_di[lo], P_dy[hi] - P_dy[lo])
+        res["n_obs"] = (P_new[hi] - P_new[lo]).astype(float)
+        out[scheme.name] = res
+    return out
@@ -0,0 +1,183 @@
+"""
+pipeline.py
+Minimal dependency-graph runner for the analysis scripts.
+
+Each Stage is one script plus the files it reads and writes. A stage depends
+on every stage that writes one of its inputs (or that it names in `after`),
+which gives the DAG; the runner then
+
+- skips a stage when the hash of its script, its inputs and the shared files
+  (helpers it imports) matches the manifest from the last successful run and
+  all its outputs exist;
+- starts every stage as soon as the stages it depends on are done, up to
+  `workers` scripts at a time (each script is its own `python` process, so
+  threads are enough to drive them); the process pool size inside each script
+  is divided between the concurrent stages via $WDI_WORKERS;
+- stops the dependents of a failed stage, keeps each stage's output in
+  `.wdi_store/logs/<stage>.log` and prints per-stage timings;
+- with `trace`, has every script write its spans (wdi/trace.py) and merges
+  them into one Chrome trace of the whole run.
+
+    Pipeline([Stage("data", "code.py", inputs=[RAW], outputs=["long.csv"]),
+              Stage("chart", "chart.py", inputs=["long.csv"], outputs=["c.png"])],
+             workdir=HERE).run()
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from wdi.parallel import WORKERS_ENV, default_workers
+from wdi.plotting import load_manifest, save_manifest
+from wdi.store import file_digest, source_digest
+from wdi.trace import TRACE_ENV, merge_traces
+
+DEFAULT_MANIFEST = Path(".wdi_store") / "pipeline_manifest.json"
+LOG_DIR = Path(".wdi_store") / "logs"
+TRACE_DIR = Path(".wdi_store") / "traces"  # per-script traces of the last traced run
+
+
+class Stage:
+    """One script with the files it reads (`inputs`) and writes (`outputs`)."""
+
+    def __init__(self, name, script, inputs=(), outputs=(), after=()):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.after = list(after)
+
+
+class Pipeline:
+    """Stages run from `workdir`; relative paths are taken from there."""
+
+    def __init__(self, stages, workdir=".", shared=(), manifest=None):
+        self.stages = {s.name: s for s in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Tên stage bị trùng")
+        self.workdir = Path(workdir)
+        self.shared = list(shared)
+        self.manifest = Path(manifest) if manifest is not None else self.workdir / DEFAULT_MANIFEST
+        self.deps = self._dependencies()
+
+    def _path(self, p):
+        return self.workdir / p
+
+    def _dependencies(self):
+        writer = {}
+        for s in self.stages.values():
+            for out in s.outputs:
+                writer[self._path(out).resolve()] = s.name
+        deps = {}
+        for s in self.stages.values():
+            d = {writer[self._path(i).resolve()] for i in s.inputs if self._path(i).resolve() in writer}
+            unknown = [a for a in s.after if a not in self.stages]
+            if unknown:
+                raise KeyError(f"Stage '{s.name}' phụ thuộc stage không tồn tại: {unknown}")
+            deps[s.name] = (d | set(s.after)) - {s.name}
+        self._check_acyclic(deps)
+        return deps
+
+    @staticmethod
+    def _check_acyclic(deps):
+        state = {}
+
+        def visit(name, trail):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "open":
+                raise ValueError(f"Vòng phụ thuộc giữa các stage: {' -> '.join(trail + [name])}")
+            state[name] = "open"
+            for d in deps[name]:
+                visit(d, trail + [name])
+            state[name] = "done"
+
+        for name in deps:
+            visit(name, [])
+
+    def digest(self, stage):
+        """sha256 over the script, the shared files and the stage inputs (data
+        inputs use the memoised source digest, see wdi.store.source_digest)."""
+        h = hashlib.sha256()
+        for p, hasher in ([(p, file_digest) for p in [stage.script] + self.shared]
+                          + [(p, source_digest) for p in stage.inputs]):
+            path = self._path(p)
+            h.update(str(p).encode("utf-8") + b"\0")
+            h.update((hasher(path) if path.is_file() else "missing").encode() + b"\0")
+        return h.hexdigest()
+
+    def _execute(self, stage, env):
+        log_dir = self.workdir / LOG_DIR
+        log_dir.mkdir(parents=True, exist_ok=True)
+        t0 = time.perf_counter()
+        with open(log_dir / f"{stage.name}.log", "w", encoding="utf-8") as log:
+            proc = subprocess.run([sys.executable, stage.script], cwd=self.workdir, env=env,
+                                  stdout=log, stderr=subprocess.STDOUT)
+        return proc.returncode, time.perf_counter() - t0
+
+    def run(self, workers=None, force=False, trace=None):
+        """Run the stages that are out of date; returns {stage: (status, seconds)}
+        with status 'ran', 'skipped', 'failed' or 'blocked'. `trace` = path of
+        the merged Chrome trace of the stages that ran."""
+        workers = default_workers(workers)
+        env = dict(os.environ, MPLBACKEND="Agg")
+        if trace is not None:
+            trace_dir = self.workdir / TRACE_DIR
+            shutil.rmtree(trace_dir, ignore_errors=True)
+            env[TRACE_ENV] = str(trace_dir.resolve())
+        env[WORKERS_ENV] = str(max(1, default_workers() // min(workers, len(self.stages) or 1)))
+        entries = load_manifest(self.manifest)
+        report, digests = {}, {}
+        remaining = dict(self.deps)
+        t_start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            running = {}
+            while remaining or running:
+                for name in [n for n, d in remaining.items() if d <= set(report)]:
+                    del remaining[name]
+                    stage = self.stages[name]
+                    if any(report[d][0] in ("failed", "blocked") for d in self.deps[name]):
+                        report[name] = ("blocked", 0.0)
+                        continue
+                    digests[name] = self.digest(stage)
+                    fresh = (entries.get(name) == digests[name]
+                             and all(self._path(o).exists() for o in stage.outputs))
+                    if fresh and not force:
+                        report[name] = ("skipped", 0.0)
+                        continue
+                    running[pool.submit(self._execute, stage, env)] = name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    name = running.pop(fut)
+                    code, seconds = fut.result()
+                    report[name] = ("ran" if code == 0 else "failed", seconds)
+                    if code == 0:
+                        entries[name] = digests[name]
+                    else:
+                        entries.pop(name, None)
+                    save_manifest(entries, self.manifest)
+
+        self.print_report(report, time.perf_counter() - t_start)
+        if trace is not None:
+            parts = sorted(trace_dir.glob("*.json"))
+            if parts:
+                print(f"  Trace: {merge_traces(parts, self._path(trace))} (gộp từ {len(parts)} script)")
+        return report
+
+    def print_report(self, report, total):
+        labels = {"ran": "đã chạy", "skipped": "bỏ qua (không đổi)", "failed": "LỖI", "blocked": "dừng (stage trước lỗi)"}
+        width = max(len(n) for n in report) if report else 0
+        print("\nPipeline:")
+        for name in self.stages:
+            status, seconds = report[name]
+            extra = f"  -> xem {LOG_DIR / (name + '.log')}" if status == "failed" else ""
+            print(f"  {name:<{width}}  {labels[status]:<22} {seconds:7.2f}s{extra}")
+        print(f"  Tổng thời gian: {total:.2f}s")
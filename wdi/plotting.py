@@ -0,0 +1,184 @@
+"""
+plotting.py
+Deferred, incremental figure rendering.
+
+Scripts describe each chart as a FigureSpec instead of drawing it straight
+away: axes calls (plot, bar, set_title, legend, ...) are recorded with their
+data, and figure-level calls (tight_layout, suptitle) are recorded separately.
+render_all() then hashes every spec (output path, size, savefig options and
+every recorded call including the data arrays) and compares it with the hash
+stored in the plot manifest from the last run: only charts that changed, or
+whose PNG is missing, are drawn. The manifest sits with the PNGs it records
+(`.wdi_store/plot_manifest.json` in each output directory) and a spec's hash
+uses its resolved output path, so the answer does not depend on the directory
+a script is started from or on how it spells the path. The drawing is fanned
+out over the process pool (wdi/parallel.py) and uses matplotlib's Figure/Agg
+canvas directly, never pyplot, so no GUI backend is involved.
+
+A recorded call must name an Axes method (or a Figure method listed in
+FIGURE_METHODS); typos fail when the call is recorded, not in a worker.
+
+    fig = FigureSpec(OUTPUT_DIR / "vn.png", figsize=(10, 6), dpi=300)
+    fig.plot(years, values, marker="o", label="GDP growth")
+    fig.set_title("Viet Nam")
+    fig.tight_layout()
+    render_all([fig])
+
+show_figures() opens the rendered PNGs in pyplot windows afterwards, for
+interactive runs that used to end with plt.show().
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from wdi.parallel import run_parallel
+from wdi.store import file_lock
+
+MANIFEST_NAME = Path(".wdi_store") / "plot_manifest.json"
+SPEC_VERSION = 1  # bump to force a full re-render after changing _draw
+FIGURE_METHODS = {"tight_layout", "suptitle", "subplots_adjust", "autofmt_xdate"}
+
+
+class FigureSpec:
+    """Declarative single-axes figure written to `path` by render_all()."""
+
+    def __init__(self, path, figsize=(10, 6), **savefig_kw):
+        self.path = Path(path)
+        self.figsize = tuple(figsize)
+        self.savefig_kw = savefig_kw
+        self.calls = []
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name not in _methods(name in FIGURE_METHODS):
+            raise AttributeError(f"FigureSpec: matplotlib {'Figure' if name in FIGURE_METHODS else 'Axes'} "
+                                 f"không có phương thức '{name}'")
+
+        def record(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return record
+
+    def digest(self):
+        h = hashlib.sha256()
+        _feed(h, (SPEC_VERSION, str(self.path.resolve()), self.figsize, self.savefig_kw, self.calls))
+        return h.hexdigest()
+
+
+@lru_cache(maxsize=2)
+def _methods(figure):
+    """Public callables of matplotlib's Figure (figure=True) or Axes."""
+    if figure:
+        from matplotlib.figure import Figure as cls
+    else:
+        from matplotlib.axes import Axes as cls
+    return frozenset(n for n in dir(cls) if not n.startswith("_") and callable(getattr(cls, n, None)))
+
+
+def _feed(h, obj):
+    """Stable, content-based hash of nested call arguments (arrays by bytes)."""
+    if isinstance(obj, (pd.Series, pd.Index)):
+        h.update(b"S")
+        _feed(h, np.asarray(obj.index) if isinstance(obj, pd.Series) else None)
+        _feed(h, np.asarray(obj))
+    elif isinstance(obj, np.ndarray):
+        h.update(f"A{obj.dtype.str}{obj.shape}".encode())
+        if obj.dtype == object:
+            h.update(repr(obj.tolist()).encode("utf-8"))
+        else:
+            h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"L{len(obj)}".encode())
+        for item in obj:
+            _feed(h, item)
+    elif isinstance(obj, dict):
+        h.update(f"D{len(obj)}".encode())
+        for key in sorted(obj, key=repr):
+            _feed(h, key)
+            _feed(h, obj[key])
+    else:
+        h.update(repr(obj).encode("utf-8"))
+    h.update(b"\0")
+
+
+def _draw(spec):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=spec.figsize)
+    ax = fig.add_subplot()
+    for name, args, kwargs in spec.calls:
+        target = fig if name in FIGURE_METHODS else ax
+        getattr(target, name)(*args, **kwargs)
+    spec.path.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(spec.path, **spec.savefig_kw)
+    return str(spec.path)
+
+
+def manifest_for(path):
+    """Manifest of the figures written to `path`'s directory."""
+    return Path(path).resolve().parent / MANIFEST_NAME
+
+
+def load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def render_all(specs, manifest=None, workers=None, force=False):
+    """Render the specs whose hash differs from the manifest (or whose file is
+    missing); returns the list of paths actually drawn. Each spec is checked
+    against the manifest of its output directory unless one `manifest` path
+    is given for all."""
+    entries = {}
+    todo = []
+    for spec in specs:
+        path = Path(manifest) if manifest is not None else manifest_for(spec.path)
+        if path not in entries:
+            entries[path] = load_manifest(path)
+        key = str(spec.path.resolve())
+        digest = spec.digest()
+        if force or entries[path].get(key) != digest or not spec.path.exists():
+            todo.append((path, key, digest, spec))
+
+    drawn = run_parallel(_draw, [(spec,) for *_, spec in todo], workers=workers)
+    for path in dict.fromkeys(p for p, *_ in todo):
+        # re-read under the lock: other scripts (pipeline stages) may update the manifest too
+        with file_lock(path):
+            current = load_manifest(path)
+            current.update({key: digest for p, key, digest, _ in todo if p == path})
+            save_manifest(current, path)
+    print(f"Biểu đồ: vẽ {len(drawn)}, giữ nguyên {len(specs) - len(drawn)} (không đổi).")
+    return drawn
+
+
+def show_figures(specs):
+    """Open the rendered PNG of every spec in a pyplot window; blocks until
+    the windows are closed, like plt.show()."""
+    import matplotlib.image as mpimg
+    import matplotlib.pyplot as plt
+
+    for spec in specs:
+        fig = plt.figure(figsize=spec.figsize)
+        ax = fig.add_axes([0, 0, 1, 1])
+        ax.imshow(mpimg.imread(spec.path))
+        ax.set_axis_off()
+    plt.show()
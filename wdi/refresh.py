@@ -0,0 +1,202 @@
+"""
+refresh.py
+Incremental refresh of a WDI export: cell-level deltas and stale outputs.
+
+Every year the World Bank adds a year column and revises recent years, and
+the scripts used to reprocess the whole history. `refresh()` instead compares
+a new export with the snapshot accepted last time (one Feather file per
+source in the store folder):
+
+- cells are matched on (Country Code, Series Code, Year); a cell is in the
+  delta when it appears (NaN -> value), disappears (value -> NaN) or is revised
+  (values differ beyond float32 rounding). Cells that are missing on both sides
+  are not changes;
+- the delta is written as `<source name>.delta.<sha256[:16]>.feather` (old and
+  new value + kind per cell) and the snapshot is replaced by the new export;
+- outputs registered in the source's Artefacts file (`record()`, called by the
+  script that wrote the output, with the countries / series / years it reads)
+  are marked stale when a changed cell falls inside their scope.
+
+Model fits and charts are already cached by content (wdi.cache,
+wdi.plotting), so re-running a stale output only recomputes the series whose
+numbers changed; the artefact list says which scripts need to be re-run.
+
+    delta = refresh(DATA_FILE)
+    print(delta.summary())
+    print(artefacts_for(DATA_FILE).stale())
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from wdi.store import file_lock, load_long, read_store, source_digest, store_dir_for, write_store
+
+KEY_COLS = ["Country Code", "Series Code", "Year"]
+DELTA_COLS = KEY_COLS + ["old", "new", "kind"]
+KINDS = ("added", "removed", "revised")
+
+
+def _cells(df_long):
+    """Key columns as plain strings / int16 plus float32 values."""
+    return pd.DataFrame({
+        "Country Code": df_long["Country Code"].astype(str).to_numpy(),
+        "Series Code": df_long["Series Code"].astype(str).to_numpy(),
+        "Year": df_long["Year"].to_numpy(dtype=np.int16),
+        "Value": df_long["Value"].to_numpy(dtype=np.float32),
+    })
+
+
+def diff_cells(old_long, new_long):
+    """Cells that differ between two typed long tables (DELTA_COLS)."""
+    old = _cells(old_long).dropna(subset=["Value"])
+    new = _cells(new_long).dropna(subset=["Value"])
+    merged = old.merge(new, on=KEY_COLS, how="outer", suffixes=("_old", "_new"))
+    a = merged["Value_old"].to_numpy(dtype=np.float32)
+    b = merged["Value_new"].to_numpy(dtype=np.float32)
+    kind = np.select([np.isnan(a), np.isnan(b), a != b], KINDS, default="")
+    out = merged.loc[kind != "", KEY_COLS].copy()
+    out["old"] = a[kind != ""]
+    out["new"] = b[kind != ""]
+    out["kind"] = pd.Categorical(kind[kind != ""], categories=KINDS)
+    return out.sort_values(KEY_COLS, kind="stable").reset_index(drop=True)
+
+
+class Delta:
+    """Result of one refresh: the changed cells plus the outputs they made stale."""
+
+    def __init__(self, cells, digest, path=None, baseline=False, stale=()):
+        self.cells = cells
+        self.digest = digest
+        self.path = path
+        self.baseline = baseline
+        self.stale = list(stale)
+
+    def __len__(self):
+        return len(self.cells)
+
+    @property
+    def empty(self):
+        return self.cells.empty
+
+    def summary(self):
+        """Changed cells per series and kind."""
+        return (self.cells.groupby(["Series Code", "kind"], observed=True).size()
+                .unstack(fill_value=0).reindex(columns=list(KINDS), fill_value=0))
+
+
+class Artefacts:
+    """Outputs derived from one source, their scope and whether they are stale.
+
+    Stored as JSON: {name: {"countries": [...] | null, "series": [...] | null,
+    "years": [first, last] | null, "digest": <source sha256>, "stale": bool}};
+    null means the whole axis.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = self._read()
+
+    def _read(self):
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.entries, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def record(self, name, digest, countries=None, series=None, years=None):
+        """Mark `name` as rebuilt from source version `digest` (fresh). Several
+        scripts may record concurrently, so the file is re-read and rewritten
+        under its lock."""
+        with file_lock(self.path):
+            self.entries = self._read()
+            self.entries[str(name)] = {
+                "countries": None if countries is None else sorted(map(str, countries)),
+                "series": None if series is None else sorted(map(str, series)),
+                "years": None if years is None else list(years),
+                "digest": digest,
+                "stale": False,
+            }
+            self.save()
+
+    def affected(self, cells):
+        """Names whose scope contains at least one of the changed `cells`."""
+        names = []
+        for name, entry in self.entries.items():
+            mask = np.ones(len(cells), dtype=bool)
+            if entry["countries"] is not None:
+                mask &= cells["Country Code"].isin(entry["countries"]).to_numpy()
+            if entry["series"] is not None:
+                mask &= cells["Series Code"].isin(entry["series"]).to_numpy()
+            if entry["years"] is not None:
+                lo, hi = entry["years"]
+                year = cells["Year"].to_numpy()
+                if lo is not None:
+                    mask &= year >= lo
+                if hi is not None:
+                    mask &= year <= hi
+            if mask.any():
+                names.append(name)
+        return names
+
+    def invalidate(self, cells, digest):
+        """Mark the outputs touched by `cells` stale unless they were already
+        rebuilt from version `digest`; returns all stale names."""
+        with file_lock(self.path):
+            self.entries = self._read()
+            for name in self.affected(cells):
+                if self.entries[name]["digest"] != digest:
+                    self.entries[name]["stale"] = True
+            self.save()
+        return self.stale()
+
+    def stale(self):
+        return [name for name, entry in self.entries.items() if entry["stale"]]
+
+
+def artefacts_for(src, store_dir=None):
+    src = Path(src)
+    return Artefacts(store_dir_for(src, store_dir) / f"{src.name}.artefacts.json")
+
+
+def refresh(src, sheet_name="Data", store_dir=None):
+    """Diff the current content of `src` against the last accepted snapshot.
+
+    The first call only stores the snapshot (baseline, empty delta). Later
+    calls write the delta file, invalidate affected artefacts and move the
+    snapshot forward; refreshing an unchanged file is a no-op.
+    """
+    src = Path(src)
+    sdir = store_dir_for(src, store_dir)
+    snapshot = sdir / f"{src.name}.snapshot.feather"
+    meta = sdir / f"{src.name}.snapshot.json"
+    digest = source_digest(src, store_dir)
+    try:
+        previous = json.loads(meta.read_text(encoding="utf-8"))["sha256"]
+    except (OSError, ValueError, KeyError):
+        previous = None
+    if previous == digest and snapshot.exists():
+        return Delta(pd.DataFrame(columns=DELTA_COLS), digest, stale=artefacts_for(src, store_dir).stale())
+
+    new_long = load_long(src, sheet_name=sheet_name, store_dir=store_dir)
+    new_cells = _cells(new_long)
+    if previous is None or not snapshot.exists():
+        delta = Delta(pd.DataFrame(columns=DELTA_COLS), digest, baseline=True)
+    else:
+        cells = diff_cells(read_store(snapshot), new_cells)
+        path = sdir / f"{src.name}.delta.{digest[:16]}.feather"
+        write_store(cells, path)
+        stale = artefacts_for(src, store_dir).invalidate(cells, digest)
+        delta = Delta(cells, digest, path=path, stale=stale)
+
+    write_store(new_cells, snapshot)
+    meta.write_text(json.dumps({"sha256": digest}), encoding="utf-8")
+    return delta
@@ -0,0 +1,83 @@
+"""
+reports.py
+Country comparison bar charts for a list of indicators (chuong3.2 / 3.3).
+
+Each indicator is drawn for the most recent year that at least
+`min_countries` countries report (the latest year with any data when no year
+qualifies), sorted by value, with the highlighted country in red, the mean of
+the plotted countries as a dashed line and the value written on every bar.
+
+The two chapter scripts used to carry their own copy of plot_comparison_bar,
+which re-filtered the long table and recounted countries per year for each
+indicator. comparison_bars() does the counting for all indicators in one
+groupby, selects every plot table with a single mask and returns the
+FigureSpecs, so the bars are drawn by render_all (in parallel, and only when
+they changed).
+
+    specs = [BarSpec("GE.EST", "So sánh Hiệu quả Chính phủ (GE)", "Estimate (±2.5)",
+                     "gov_effectiveness_comparison.png")]
+    render_all(comparison_bars(df_long, specs))
+"""
+
+from dataclasses import dataclass
+
+from wdi.plotting import FigureSpec
+
+
+@dataclass
+class BarSpec:
+    code: str
+    title: str
+    ylabel: str
+    filename: str
+    ymin: float = None
+    ymax: float = None
+    ascending: bool = False  # False: highest first
+
+
+def coverage_years(df_long, codes, min_countries=3):
+    """Series Code -> latest year with >= `min_countries` values (else latest year with any)."""
+    valid = df_long[df_long["Series Code"].isin(codes)].dropna(subset=["Value"])
+    counts = valid.groupby(["Series Code", "Year"], observed=True)["Country Name"].count().reset_index()
+    latest = counts.groupby("Series Code", observed=True)["Year"].max()
+    covered = counts[counts["Country Name"] >= min_countries].groupby("Series Code", observed=True)["Year"].max()
+    return covered.reindex(latest.index).fillna(latest).astype(int)
+
+
+def comparison_bars(df_long, specs, highlight="Viet Nam", min_countries=3, mean_label="Trung bình ASEAN"):
+    """FigureSpecs of the comparison bars in `specs` (indicators without data
+    are skipped); the table behind each chart is printed as markdown."""
+    years = coverage_years(df_long, [s.code for s in specs], min_countries)
+    valid = df_long[df_long["Series Code"].isin(years.index)].dropna(subset=["Value"])
+    codes = valid["Series Code"].astype(str)
+    tables = dict(tuple(valid[valid["Year"].to_numpy() == codes.map(years).to_numpy()]
+                        .groupby(codes, sort=False)))
+
+    figures = []
+    for spec in specs:
+        if spec.code not in tables:
+            continue
+        latest_year = years[spec.code]
+        df_plot = tables[spec.code].sort_values(by="Value", ascending=spec.ascending)
+        mean_value = df_plot["Value"].mean()
+
+        fig = FigureSpec(spec.filename, figsize=(10, 6))
+        fig.bar(df_plot["Country Name"], df_plot["Value"],
+                color=["red" if c == highlight else "skyblue" for c in df_plot["Country Name"]])
+        fig.axhline(mean_value, color="gray", linestyle="--", linewidth=1, label=f"{mean_label} ({mean_value:.2f})")
+        for country, yval in zip(df_plot["Country Name"], df_plot["Value"]):
+            fig.text(country, yval + (spec.ymax * 0.01 if spec.ymax else 0.01), f"{yval:.2f}", ha="center", va="bottom")
+        fig.set_title(f"{spec.title} (Năm {latest_year})", fontsize=14)
+        fig.set_xlabel("Quốc gia", fontsize=12)
+        fig.set_ylabel(spec.ylabel, fontsize=12)
+        if spec.ymin is not None and spec.ymax is not None:
+            fig.set_ylim(spec.ymin, spec.ymax)
+        fig.tick_params(axis="x", labelrotation=0)
+        fig.legend()
+        fig.grid(axis="y", linestyle="--", alpha=0.7)
+        fig.tight_layout()
+        figures.append(fig)
+
+        print(f"\n--- Thống kê {spec.code} (Năm {latest_year}) ---")
+        print(df_plot[["Country Name", "Value"]].to_markdown(index=False, numalign="left", stralign="left"))
+    return figures
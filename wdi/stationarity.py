@@ -0,0 +1,112 @@
+"""
+stationarity.py
+ADF / KPSS tests for every (country, series) pair of a long WDI panel.
+
+The panel is sorted once and cut into per-series arrays at the group
+boundaries; series shorter than MIN_OBS are reported as "too_short" straight
+away, without a cache lookup or a pool task. Results of the tested series are
+cached per series content (DiskCache "stationarity"), only the uncached ones
+are tested, in chunks spread over a process pool
+(wdi/parallel.py), and everything comes back as one tidy table:
+
+    Country Name, Country Code, Series Name, Series Code, n_obs,
+    adf_stat, adf_p, kpss_stat, kpss_p, status, d_suggested
+
+status: "stationary" (ADF rejects a unit root and KPSS does not reject
+stationarity), "unit_root" (the opposite), "inconclusive" (the tests disagree),
+"too_short" or "error" (e.g. a constant series). d_suggested is the smallest
+differencing order wdi.arima_select.candidate_d would try.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.stattools import adfuller, kpss
+
+from wdi.arima_select import ALPHA, candidate_d
+from wdi.cache import DiskCache, series_digest
+from wdi.parallel import default_workers, run_parallel
+from wdi.store import ID_COLS
+
+MIN_OBS = 8
+TEST_SPEC = ("adf", "c", "AIC", "kpss", "c", "auto")  # part of the cache key
+RESULT_COLS = ["n_obs", "adf_stat", "adf_p", "kpss_stat", "kpss_p", "status", "d_suggested"]
+
+
+def classify(adf_p, kpss_p):
+    if np.isnan(adf_p) or np.isnan(kpss_p):
+        return "error"
+    adf_stationary = adf_p < ALPHA
+    kpss_stationary = kpss_p >= ALPHA
+    if adf_stationary and kpss_stationary:
+        return "stationary"
+    if not adf_stationary and not kpss_stationary:
+        return "unit_root"
+    return "inconclusive"
+
+
+def stationarity_tests(values, min_obs=MIN_OBS):
+    """ADF + KPSS on one clean (NaN-free) series -> dict with RESULT_COLS."""
+    values = np.asarray(values, dtype=float)
+    res = {"n_obs": len(values), "adf_stat": np.nan, "adf_p": np.nan,
+           "kpss_stat": np.nan, "kpss_p": np.nan}
+    if len(values) < min_obs:
+        return {**res, "status": "too_short", "d_suggested": np.nan}
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # KPSS p-values outside the lookup table
+            adf_res = adfuller(values)
+            kpss_res = kpss(values, nlags="auto")
+        res.update(adf_stat=float(adf_res[0]), adf_p=float(adf_res[1]),
+                   kpss_stat=float(kpss_res[0]), kpss_p=float(kpss_res[1]))
+    except (ValueError, np.linalg.LinAlgError):
+        pass
+    status = classify(res["adf_p"], res["kpss_p"])
+    d = min(candidate_d(res["adf_p"], res["kpss_p"])) if status != "error" else np.nan
+    return {**res, "status": status, "d_suggested": d}
+
+
+def _test_chunk(chunk, min_obs):
+    return [stationarity_tests(v, min_obs) for v in chunk]
+
+
+def split_series(df_long, keys=ID_COLS):
+    """(key frame, [values array per series]) with NaNs dropped, years ascending."""
+    df = df_long.dropna(subset=["Value"]).sort_values(list(keys) + ["Year"], kind="mergesort")
+    codes = df.groupby(list(keys), sort=False, observed=True).ngroup().to_numpy()
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], int)
+    key_frame = df.iloc[starts][list(keys)].reset_index(drop=True)
+    values = np.split(df["Value"].to_numpy(dtype=float), starts[1:])
+    return key_frame, values if len(codes) else []
+
+
+def panel_stationarity(df_long, min_obs=MIN_OBS, keys=ID_COLS, workers=None, cache=None):
+    """Tidy ADF/KPSS table for every series of a long panel.
+
+    `cache` is a DiskCache (None = the default "stationarity" cache; pass False
+    to disable). Series without any non-missing value do not appear.
+    """
+    if cache is None:
+        cache = DiskCache("stationarity")
+    key_frame, series = split_series(df_long, keys)
+    results = [None] * len(series)
+    digests = {}
+    for i, v in enumerate(series):
+        if len(v) < min_obs:
+            results[i] = stationarity_tests(v, min_obs)  # too_short, nothing to test
+        else:
+            digests[i] = series_digest(v, min_obs, *TEST_SPEC)
+            results[i] = cache.get(digests[i]) if cache else None
+    todo = [i for i, r in enumerate(results) if r is None]
+    n_chunks = max(1, min(len(todo), 4 * default_workers(workers)))
+    chunks = [c for c in np.array_split(np.asarray(todo, dtype=int), n_chunks) if len(c)]
+    fitted = run_parallel(_test_chunk, [([series[i] for i in c], min_obs) for c in chunks], workers=workers)
+    for c, chunk_res in zip(chunks, fitted):
+        for i, res in zip(c, chunk_res):
+            results[i] = res
+            if cache:
+                cache.put(digests[i], res)
+
+    table = pd.DataFrame(results, columns=RESULT_COLS)
+    return pd.concat([key_frame, table], axis=1)
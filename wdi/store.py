@@ -0,0 +1,350 @@
+"""
+store.py
+Columnar store for World Development Indicators (WDI) exports.
+
+A WDI export (CSV, or the "Data" sheet of an Excel download) is parsed once into
+a typed long table
+
+    Country Name, Country Code, Series Name, Series Code  -> category
+    Year                                                  -> int16
+    Value                                                 -> float32
+
+and persisted as Feather in a `.wdi_store` folder next to the source file, keyed
+by the source's content hash. Later runs memory-map the Feather file instead of
+re-reading and re-melting the export.
+
+`load_wide` does the same for code that works on the wide sheet itself (the
+Buoi_4 scripts): the parsed sheet, with year columns already numeric, is cached
+as Feather so re-runs never go through openpyxl.
+
+For bulk downloads (the multi-GB WDIData.csv) `ingest_chunked` streams the wide
+CSV in row chunks, filters by series/country codes before melting and appends
+each long batch to a Parquet store, so peak memory is bounded by the chunk size
+rather than the file size.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+ID_COLS = ["Country Name", "Country Code", "Series Name", "Series Code"]
+MISSING = ".."  # World Bank missing marker
+STORE_DIRNAME = ".wdi_store"
+CHUNK_ROWS = 20_000  # wide rows per chunk (x ~60 year columns once melted)
+LOCK_TIMEOUT = 30.0  # seconds; an older lock file was left behind by a killed process
+
+# On-disk schema of streamed batches; Parquet dictionary-encodes the strings
+# and they come back as categoricals (see read_store).
+LONG_SCHEMA = pa.schema([(c, pa.string()) for c in ID_COLS]
+                        + [("Year", pa.int16()), ("Value", pa.float32())])
+
+_YEAR_RE = re.compile(r"(\d{4})")
+
+
+# -------------------------
+# Helpers
+# -------------------------
+def year_columns(columns):
+    """Return the WDI year columns ('2015 [YR2015]', ...) in column order."""
+    return [c for c in columns if "[YR" in str(c)]
+
+
+def column_year(col):
+    """'2015 [YR2015]' -> 2015 (None when the name has no 4-digit year)."""
+    m = _YEAR_RE.search(str(col))
+    return int(m.group(1)) if m else None
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """sha256 of the file content, read in 1 MiB blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def store_dir_for(src, store_dir=None):
+    return Path(store_dir) if store_dir is not None else Path(src).parent / STORE_DIRNAME
+
+
+def source_digest(src, store_dir=None):
+    """Content hash of `src`, memoised in a sidecar keyed by file size + mtime
+    so unchanged multi-GB exports are not re-hashed on every run."""
+    src = Path(src)
+    st = src.stat()
+    sidecar = store_dir_for(src, store_dir) / f"{src.name}.digest.json"
+    try:
+        memo = json.loads(sidecar.read_text(encoding="utf-8"))
+        if memo["size"] == st.st_size and memo["mtime_ns"] == st.st_mtime_ns:
+            return memo["sha256"]
+    except (OSError, ValueError, KeyError):
+        pass
+    digest = file_digest(src)
+    sidecar.parent.mkdir(parents=True, exist_ok=True)
+    sidecar.write_text(json.dumps({"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}),
+                       encoding="utf-8")
+    return digest
+
+
+def read_wide(src, sheet_name="Data"):
+    """Read a WDI export in its original wide layout (CSV or Excel)."""
+    src = Path(src)
+    if src.suffix.lower() in (".xlsx", ".xls"):
+        return pd.read_excel(src, sheet_name=sheet_name)
+    return pd.read_csv(src)
+
+
+# -------------------------
+# Wide -> long
+# -------------------------
+def tidy_long(df_wide, years=None, dtype=np.float32):
+    """Melt a wide WDI frame into the typed long layout.
+
+    Rows missing any id code (the footer lines of a WDI download) are dropped,
+    '..' becomes NaN. `years` = (first, last) keeps only that range (either end
+    may be None). Row order matches `pd.melt(..., value_vars=year_columns)`.
+    Value is float32 as in the store; dtype=np.float64 keeps the source numbers.
+    """
+    df = df_wide.dropna(subset=["Series Code", "Country Code", "Country Name"])
+    ycols = year_columns(df.columns)
+    yr = np.array([column_year(c) for c in ycols], dtype=np.int16)
+    if years is not None:
+        lo, hi = years
+        keep = np.ones(len(yr), dtype=bool)
+        if lo is not None:
+            keep &= yr >= lo
+        if hi is not None:
+            keep &= yr <= hi
+        ycols = [c for c, k in zip(ycols, keep) if k]
+        yr = yr[keep]
+
+    n, k = len(df), len(ycols)
+    # numeric conversion runs once per year column on the small wide frame
+    values = df[ycols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=dtype)
+
+    out = {}
+    for col in ID_COLS:
+        cat = pd.Categorical(df[col].astype(str))
+        out[col] = pd.Categorical.from_codes(np.tile(cat.codes, k), cat.categories)
+    out["Year"] = np.repeat(yr, n)
+    out["Value"] = values.T.reshape(-1)
+    return pd.DataFrame(out)
+
+
+# -------------------------
+# Store
+# -------------------------
+def read_store(path, columns=None):
+    """Load a store file (Feather is memory-mapped, Parquet keeps ids as categoricals)."""
+    if Path(path).suffix == ".parquet":
+        cats = [c for c in ID_COLS if columns is None or c in columns]
+        return pq.read_table(path, columns=columns, read_dictionary=cats, memory_map=True).to_pandas()
+    return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+def write_store(df_long, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")  # stages of a pipeline may write concurrently
+    feather.write_feather(df_long.reset_index(drop=True), tmp, compression="uncompressed")
+    tmp.replace(path)
+
+
+@contextmanager
+def file_lock(path, timeout=LOCK_TIMEOUT, poll=0.01):
+    """Hold an exclusive `<path>.lock` around a read-modify-write of `path`.
+
+    The lock file is created with O_CREAT | O_EXCL, which is atomic on every
+    platform (fcntl does not exist on Windows); a lock older than `timeout`
+    seconds is taken over.
+    """
+    lock = Path(f"{path}.lock")
+    lock.parent.mkdir(parents=True, exist_ok=True)
+    while True:
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock.stat().st_mtime > timeout:
+                    lock.unlink(missing_ok=True)
+                    continue
+            except OSError:
+                continue  # released meanwhile
+            time.sleep(poll)
+    os.close(fd)
+    try:
+        yield
+    finally:
+        lock.unlink(missing_ok=True)
+
+
+def load_long(src, sheet_name="Data", store_dir=None, refresh=False, columns=None):
+    """Typed long table for a WDI export, parsed at most once per file content.
+
+    The Feather file is named `<source name>.<sha256[:16]>.feather`; older
+    versions of the same source are removed when a new one is written.
+    """
+    src = Path(src)
+    sdir = store_dir_for(src, store_dir)
+    digest = source_digest(src, store_dir)
+    path = sdir / f"{src.name}.{digest[:16]}.feather"
+    if path.exists() and not refresh:
+        return read_store(path, columns=columns)
+
+    df_long = tidy_long(read_wide(src, sheet_name=sheet_name))
+    write_store(df_long, path)
+    _remove_old_versions(sdir, f"{src.name}.", ".feather", keep=path)
+    return df_long if columns is None else df_long[columns]
+
+
+def _remove_old_versions(sdir, prefix, suffix, keep):
+    """Delete `<prefix><sha16><suffix>` files other than `keep`."""
+    pattern = re.compile(re.escape(prefix) + r"[0-9a-f]{16}" + re.escape(suffix) + "$")
+    for old in sdir.iterdir():
+        if old != keep and pattern.match(old.name):
+            old.unlink()
+
+
+# -------------------------
+# Wide sheet cache
+# -------------------------
+def typed_wide(df_wide):
+    """Year columns -> float64 ('..' and other text -> NaN), other columns -> str
+    (missing stays missing), so the frame round-trips through Feather."""
+    df = df_wide.copy()
+    ycols = year_columns(df.columns)
+    df[ycols] = df[ycols].apply(pd.to_numeric, errors="coerce").astype(np.float64)
+    for col in df.columns.difference(ycols, sort=False):
+        if df[col].dtype == object:
+            df[col] = df[col].map(lambda v: v if pd.isna(v) else str(v))
+    df.columns = [str(c) for c in df.columns]
+    return df
+
+
+def load_wide(src, sheet_name="Data", store_dir=None, refresh=False):
+    """The wide sheet of a WDI export, parsed at most once per file content.
+
+    Cached as `<source name>.<sheet>.wide.<sha256[:16]>.feather` in the store
+    folder (file size/mtime are checked first, see source_digest).
+    """
+    src = Path(src)
+    sdir = store_dir_for(src, store_dir)
+    digest = source_digest(src, store_dir)
+    prefix = f"{src.name}.{re.sub(r'[^0-9A-Za-z_-]', '_', str(sheet_name))}.wide."
+    path = sdir / f"{prefix}{digest[:16]}.feather"
+    if path.exists() and not refresh:
+        return read_store(path)
+
+    df = typed_wide(read_wide(src, sheet_name=sheet_name))
+    write_store(df, path)
+    _remove_old_versions(sdir, prefix, ".feather", keep=path)
+    return df
+
+
+def source_values(src, df_long, sheet_name="Data", store_dir=None):
+    """float64 Value of each (Country Code, Series Code, Year) row of `df_long`,
+    read back from the cached wide sheet of `src` (NaN where the cell is missing).
+
+    The long store keeps float32, which is plenty for analysis but prints as
+    679.4459 instead of the 679.445924... in the source; exports that should
+    reproduce the source numbers take their values from here.
+    """
+    keys = ["Country Code", "Series Code", "Year"]
+    exact = tidy_long(load_wide(src, sheet_name=sheet_name, store_dir=store_dir), dtype=np.float64)
+    exact = exact[keys + ["Value"]].astype({"Country Code": str, "Series Code": str})
+    rows = df_long[keys].astype({"Country Code": str, "Series Code": str, "Year": exact["Year"].dtype})
+    return rows.merge(exact, on=keys, how="left")["Value"].to_numpy()
+
+
+def sheet_names(src, store_dir=None):
+    """Sheet names of an Excel workbook, cached alongside the source digest."""
+    src = Path(src)
+    digest = source_digest(src, store_dir)
+    sidecar = store_dir_for(src, store_dir) / f"{src.name}.sheets.json"
+    try:
+        memo = json.loads(sidecar.read_text(encoding="utf-8"))
+        if memo["sha256"] == digest:
+            return memo["sheets"]
+    except (OSError, ValueError, KeyError):
+        pass
+    with pd.ExcelFile(src) as xls:
+        sheets = list(xls.sheet_names)
+    sidecar.write_text(json.dumps({"sha256": digest, "sheets": sheets}, ensure_ascii=False), encoding="utf-8")
+    return sheets
+
+
+# -------------------------
+# Streaming ingestion
+# -------------------------
+def _filter_key(series_codes, country_codes, years):
+    spec = json.dumps([None if series_codes is None else sorted(series_codes),
+                       None if country_codes is None else sorted(country_codes),
+                       None if years is None else list(years)])
+    return hashlib.sha256(spec.encode("utf-8")).hexdigest()[:8]
+
+
+def ingest_chunked(src, series_codes=None, country_codes=None, years=None,
+                   chunksize=CHUNK_ROWS, store_dir=None, refresh=False):
+    """Stream a wide WDI CSV into a filtered long Parquet store; return its path.
+
+    Only rows whose 'Series Code' / 'Country Code' are in the requested sets
+    (None = keep all) and year columns inside `years` = (first, last) are
+    melted. Each chunk is written as its own row group, so memory use does not
+    grow with the size of the CSV. The file name carries the source hash and
+    the filter, so re-running with the same arguments is a no-op.
+    """
+    src = Path(src)
+    sdir = store_dir_for(src, store_dir)
+    digest = source_digest(src, store_dir)
+    prefix = f"{src.name}.{_filter_key(series_codes, country_codes, years)}."
+    path = sdir / f"{prefix}{digest[:16]}.parquet"
+    if path.exists() and not refresh:
+        return path
+
+    header = pd.read_csv(src, nrows=0).columns
+    ycols = year_columns(header)
+    if years is not None:
+        lo, hi = years
+        ycols = [c for c in ycols
+                 if (lo is None or column_year(c) >= lo) and (hi is None or column_year(c) <= hi)]
+    usecols = ID_COLS + ycols
+    series_codes = set(series_codes) if series_codes is not None else None
+    country_codes = set(country_codes) if country_codes is not None else None
+
+    sdir.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with pq.ParquetWriter(tmp, LONG_SCHEMA) as writer:
+        reader = pd.read_csv(src, usecols=usecols, chunksize=chunksize,
+                             dtype={c: str for c in ID_COLS}, na_values=[MISSING])
+        for chunk in reader:
+            if series_codes is not None:
+                chunk = chunk[chunk["Series Code"].isin(series_codes)]
+            if country_codes is not None:
+                chunk = chunk[chunk["Country Code"].isin(country_codes)]
+            if chunk.empty:
+                continue
+            batch = tidy_long(chunk[usecols])
+            if batch.empty:
+                continue
+            batch[ID_COLS] = batch[ID_COLS].astype(str)
+            writer.write_table(pa.Table.from_pandas(batch, schema=LONG_SCHEMA, preserve_index=False))
+    tmp.replace(path)
+    _remove_old_versions(sdir, prefix, ".parquet", keep=path)
+    return path
+
+
+def load_filtered(src, **kwargs):
+    """`ingest_chunked` + `read_store`: the filtered long table as a DataFrame."""
+    return read_store(ingest_chunked(src, **kwargs))
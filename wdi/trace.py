@@ -0,0 +1,260 @@
+"""
+trace.py
+Per-stage timing and memory spans for the analysis scripts, exported as a Chrome trace.
+
+A span records wall time, CPU time of the process and of the child processes
+it waited for (pool workers), resident memory at entry and its peak during
+the span, and an optional row count. Spans nest and can be opened three ways:
+
+    with span("melt") as sp:          # context manager
+        df_long = ...
+        sp.rows = len(df_long)
+
+    @traced("fit")                    # decorator
+    def fit(...): ...
+
+    stage("4) aggregate")             # flat scripts: ends the previous stage()
+    ...
+    set_rows(len(period_summary))     # row count of the innermost open span
+
+Peak memory comes from one sampling thread (RSS from /proc/self/statm every
+SAMPLE_INTERVAL s, ru_maxrss where /proc is missing, 0 on Windows where
+neither exists) that only runs while a span is open, so untraced code pays
+nothing.
+
+When $WDI_TRACE is set, the trace is written at exit in Chrome trace format
+(load it in chrome://tracing or https://ui.perfetto.dev). The value is a
+.json file name, or a directory that receives `<script>.<pid>.json`.
+merge_traces() combines the files of several processes, e.g. all stages of a
+pipeline run, into one timeline.
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+TRACE_ENV = "WDI_TRACE"
+SAMPLE_INTERVAL = 0.005  # seconds between RSS samples while a span is open
+MB = 2**20
+
+
+def rss_bytes():
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource  # Unix only
+    except ImportError:
+        return 0  # no RSS on Windows
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # KiB on Linux
+
+
+def _cpu():
+    t = os.times()
+    return t.user + t.system, t.children_user + t.children_system
+
+
+class Span:
+    """One timed region; `rows` may be set while it is open."""
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = dict(args)
+        self.rows = self.args.pop("rows", None)
+        self.tid = threading.get_ident()
+        self.start = time.perf_counter()
+        self.cpu_start, self.child_start = _cpu()
+        self.rss_start = self.rss_peak = rss_bytes()
+        self.wall = self.cpu = self.child_cpu = None
+
+    def close(self):
+        cpu, child = _cpu()
+        self.wall = time.perf_counter() - self.start
+        self.cpu = cpu - self.cpu_start
+        self.child_cpu = child - self.child_start
+        self.rss_peak = max(self.rss_peak, rss_bytes())
+
+    def record(self):
+        return {"name": self.name, "cat": self.cat, "wall_s": self.wall, "cpu_s": self.cpu,
+                "child_cpu_s": self.child_cpu, "rss_start_mb": self.rss_start / MB,
+                "rss_peak_mb": self.rss_peak / MB, "peak_delta_mb": (self.rss_peak - self.rss_start) / MB,
+                "rows": self.rows, **self.args}
+
+
+class Tracer:
+    """Collects the spans of one process."""
+
+    def __init__(self, name=None):
+        self.name = name or Path(sys.argv[0] or "python").stem
+        self.spans = []
+        self.epoch = time.time() - time.perf_counter()  # perf_counter -> wall clock, for merged traces
+        self._open = []
+        self._stage = None
+        self._lock = threading.Lock()
+        self._sampling = threading.Event()
+        self._sampler = None
+
+    # -- sampling -------------------------------------------------------
+    def _sample(self):
+        while True:
+            self._sampling.wait()
+            time.sleep(SAMPLE_INTERVAL)
+            rss = rss_bytes()
+            with self._lock:
+                for sp in self._open:
+                    sp.rss_peak = max(sp.rss_peak, rss)
+
+    def _push(self, sp):
+        with self._lock:
+            self._open.append(sp)
+            self._sampling.set()
+        if self._sampler is None:
+            self._sampler = threading.Thread(target=self._sample, name="wdi-trace", daemon=True)
+            self._sampler.start()
+
+    def _pop(self, sp):
+        sp.close()
+        with self._lock:
+            self._open.remove(sp)
+            if not self._open:
+                self._sampling.clear()
+            self.spans.append(sp)
+
+    # -- spans ----------------------------------------------------------
+    def begin(self, name, cat="stage", **args):
+        """Open a span; close it with end(span). Prefer span() / stage()."""
+        sp = Span(name, cat, args)
+        self._push(sp)
+        return sp
+
+    def end(self, sp):
+        if sp in self._open:
+            self._pop(sp)
+        return sp
+
+    @contextmanager
+    def span(self, name, cat="stage", **args):
+        sp = self.begin(name, cat, **args)
+        try:
+            yield sp
+        finally:
+            self.end(sp)
+
+    def traced(self, name=None, cat="function"):
+        """Decorator: every call of the function is a span."""
+        def wrap(func):
+            @wraps(func)
+            def inner(*a, **kw):
+                with self.span(name or func.__qualname__, cat):
+                    return func(*a, **kw)
+            return inner
+        return wrap
+
+    def stage(self, name, **args):
+        """End the current stage (if any) and start `name`; for scripts
+        without functions, where a with-block would re-indent every section."""
+        self.end_stage()
+        self._stage = self.begin(name, "stage", **args)
+        return self._stage
+
+    def end_stage(self):
+        if self._stage is not None:
+            self.end(self._stage)
+            self._stage = None
+
+    def set_rows(self, n):
+        """Row count of the innermost span opened by this thread."""
+        tid = threading.get_ident()
+        with self._lock:
+            mine = [sp for sp in self._open if sp.tid == tid]
+        if mine:
+            mine[-1].rows = int(n)
+
+    # -- output ---------------------------------------------------------
+    def records(self):
+        return [sp.record() for sp in sorted(self.spans, key=lambda s: s.start)]
+
+    def chrome_events(self):
+        """Complete ('X') events, an RSS counter track and the process name."""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.name}}]
+        for sp in sorted(self.spans, key=lambda s: s.start):
+            ts = (self.epoch + sp.start) * 1e6
+            rec = sp.record()
+            args = {k: (round(v, 4) if isinstance(v, float) else v) for k, v in rec.items()
+                    if k not in ("name", "cat") and v is not None}
+            events.append({"name": sp.name, "cat": sp.cat, "ph": "X", "ts": ts, "dur": sp.wall * 1e6,
+                           "pid": pid, "tid": sp.tid, "args": args})
+            events.append({"name": "RSS (MB)", "ph": "C", "ts": ts, "pid": pid,
+                           "args": {"rss": round(sp.rss_start / MB, 1)}})
+            events.append({"name": "RSS (MB)", "ph": "C", "ts": ts + sp.wall * 1e6, "pid": pid,
+                           "args": {"rss": round(sp.rss_peak / MB, 1)}})
+        return events
+
+    def export(self, path):
+        """Write the Chrome trace; a directory gets `<name>.<pid>.json`."""
+        path = Path(path)
+        if path.suffix != ".json":
+            path = path / f"{self.name}.{os.getpid()}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"traceEvents": self.chrome_events(), "displayTimeUnit": "ms"}),
+                        encoding="utf-8")
+        return path
+
+    def print_report(self, cat="stage", file=None):
+        """Table of the spans of category `cat` (all spans for None); ends
+        the current stage."""
+        self.end_stage()
+        recs = [r for r in self.records() if cat is None or r["cat"] == cat]
+        if not recs:
+            return
+        width = max(len(r["name"]) for r in recs)
+        print(f"\nTiming ({self.name}):", file=file)
+        print(f"  {'stage':<{width}}  {'wall s':>8} {'cpu s':>8} {'child s':>8} {'peak MB':>8} {'+MB':>7} {'rows':>10}",
+              file=file)
+        for r in recs:
+            rows = "" if r["rows"] is None else f"{r['rows']:,}"
+            print(f"  {r['name']:<{width}}  {r['wall_s']:8.2f} {r['cpu_s']:8.2f} {r['child_cpu_s']:8.2f} "
+                  f"{r['rss_peak_mb']:8.0f} {r['peak_delta_mb']:7.0f} {rows:>10}", file=file)
+        print(f"  {'total':<{width}}  {sum(r['wall_s'] for r in recs):8.2f}", file=file)
+
+
+def merge_traces(paths, out):
+    """One Chrome trace from the trace files in `paths` (each process keeps its pid)."""
+    events = []
+    for p in paths:
+        events += json.loads(Path(p).read_text(encoding="utf-8"))["traceEvents"]
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}), encoding="utf-8")
+    return out
+
+
+# -------------------------
+# Process-wide tracer
+# -------------------------
+TRACER = Tracer()
+span = TRACER.span
+traced = TRACER.traced
+stage = TRACER.stage
+end_stage = TRACER.end_stage
+set_rows = TRACER.set_rows
+print_report = TRACER.print_report
+
+
+@atexit.register
+def _export_at_exit():
+    TRACER.end_stage()
+    target = os.environ.get(TRACE_ENV)
+    if target and TRACER.spans:
+        TRACER.export(target)